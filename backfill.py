@@ -0,0 +1,153 @@
+"""Backfill: reprocessa um intervalo de dias do arquivo Parquet da bronze até a gold.
+
+A DAG roda com catchup=False e tudo é chaveado no dia da coleta
+(DATE(dt_ingest)), então refazer um mês à mão é refazer cada etapa dia a dia.
+Aqui, para um intervalo de datas:
+
+1. cada dia pendente é lido da sua partição do arquivo (dt=AAAA-MM-DD) num
+   processo próprio, em paralelo, e vai para um banco temporário do dia;
+2. os bancos dos dias entram na raw numa transação só (juntar_shards), com
+   upsert na chave natural;
+3. silver e gold rodam uma vez para o intervalo, pelo dbtRunner, com
+   --vars backfill_desde/backfill_ate (macro janela_incremental): só os dias
+   do intervalo são refeitos, e o unique_key dos modelos substitui as linhas;
+4. os dias processados ficam em backfill_dias e não são refeitos numa
+   próxima chamada (a não ser com --refazer).
+
+    python backfill.py --desde 2026-03-01 --ate 2026-03-31 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+# o pipeline_em_processo põe bronze/transform no sys.path
+from pipeline_em_processo import DBT_DIR, DBT_PROFILES_DIR, dbt_runner, rodar_dbt
+
+from arquivo_bronze import ARQUIVO_DIR, reconstruir_raw
+from instrumentacao import registrar_dbt, registrar_metricas, run_id_atual
+from juntar_shards import juntar_shards
+from raw_db import DB_PATH, TAMANHO_LOTE, conectar
+
+BACKFILL_TABLE = "backfill_dias"
+
+
+def garantir_schema_backfill(conn):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {BACKFILL_TABLE} ("
+        "dia TEXT PRIMARY KEY, "
+        "linhas INTEGER, "
+        "run_id TEXT, "
+        "processado_em TEXT)"
+    )
+
+
+def dias_pendentes(desde: date, ate: date, base_dir=ARQUIVO_DIR, db_path=DB_PATH, refazer=False) -> list:
+    """Dias do intervalo com partição no arquivo e ainda não processados."""
+    dias = [(desde + timedelta(days=i)).isoformat() for i in range((ate - desde).days + 1)]
+    dias = [dia for dia in dias if (Path(base_dir) / f"dt={dia}").is_dir()]
+    if refazer:
+        return dias
+
+    conn = conectar(db_path)
+    try:
+        with conn:
+            garantir_schema_backfill(conn)
+        feitos = {row[0] for row in conn.execute(f"SELECT dia FROM {BACKFILL_TABLE}")}
+    finally:
+        conn.close()
+    return [dia for dia in dias if dia not in feitos]
+
+
+def _preparar_dia(dia: str, base_dir: Path, pasta: Path, tamanho_lote: int):
+    # roda num processo do pool: lê a partição do dia para um banco só dele
+    d = date.fromisoformat(dia)
+    linhas = reconstruir_raw(d, d, base_dir=base_dir, db_path=pasta / f"dia_{dia}.db", tamanho_lote=tamanho_lote)
+    return dia, linhas
+
+
+def marcar_dias(linhas_por_dia: dict, run_id: str, db_path=DB_PATH):
+    agora = datetime.now(timezone.utc).isoformat()
+    conn = conectar(db_path)
+    try:
+        with conn:
+            garantir_schema_backfill(conn)
+            conn.executemany(
+                f"INSERT INTO {BACKFILL_TABLE} (dia, linhas, run_id, processado_em) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (dia) DO UPDATE SET "
+                "linhas = excluded.linhas, run_id = excluded.run_id, processado_em = excluded.processado_em",
+                [(dia, linhas, run_id, agora) for dia, linhas in linhas_por_dia.items()],
+            )
+    finally:
+        conn.close()
+
+
+def backfill(desde: date, ate: date, workers: int = None, refazer=False, base_dir=ARQUIVO_DIR, db_path=DB_PATH,
+             profiles_dir=DBT_PROFILES_DIR, project_dir=DBT_DIR, tamanho_lote=TAMANHO_LOTE) -> dict:
+    """Reprocessa os dias pendentes de [desde, ate]; devolve as métricas do backfill."""
+    run_id = run_id_atual()
+    dias = dias_pendentes(desde, ate, base_dir, db_path, refazer)
+    if not dias:
+        print(f"✅ Nada a fazer: {desde} a {ate} já processado (ou sem partições no arquivo)")
+        return {}
+
+    print(f"🔁 Backfill de {len(dias)} dias ({dias[0]} a {dias[-1]})")
+    t0 = time.perf_counter()
+
+    # 1-2. um processo por dia (até `workers`), depois um upsert só na raw
+    with tempfile.TemporaryDirectory(prefix="backfill_") as tmp:
+        pasta = Path(tmp)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            linhas_por_dia = dict(pool.map(
+                _preparar_dia, dias, [Path(base_dir)] * len(dias), [pasta] * len(dias), [tamanho_lote] * len(dias),
+            ))
+        segundos_raw = time.perf_counter() - t0
+        linhas = juntar_shards(pasta, db_path, tamanho_lote, apagar=True, padrao="dia_*.db")
+
+    # 3. silver e gold só nos dias do intervalo
+    inicio = time.perf_counter()
+    variaveis = {"backfill_desde": dias[0], "backfill_ate": dias[-1]}
+    runner = dbt_runner(profiles_dir, project_dir)
+    for camada in ("silver", "gold"):
+        rodar_dbt(runner, f"climatempo.{camada}", profiles_dir, project_dir, variaveis)
+        registrar_dbt(f"backfill_dbt_{camada}", Path(project_dir) / "target" / "run_results.json", run_id, db_path)
+    segundos_dbt = time.perf_counter() - inicio
+
+    # 4. só marca depois do dbt: um backfill que falhou no meio é refeito inteiro
+    marcar_dias(linhas_por_dia, run_id, db_path)
+
+    segundos = time.perf_counter() - t0
+    metricas = {
+        "dias": len(dias),
+        "linhas": linhas,
+        "segundos": segundos,
+        "segundos_raw": segundos_raw,
+        "segundos_dbt": segundos_dbt,
+        "dias_por_min": len(dias) / segundos * 60,
+    }
+    registrar_metricas("backfill", metricas, {"linhas": linhas_por_dia}, run_id, db_path)
+    print(f"⏱️  {len(dias)} dias em {segundos:.1f}s (raw {segundos_raw:.1f}s, dbt {segundos_dbt:.1f}s): "
+          f"{metricas['dias_por_min']:.1f} dias/min")
+    return metricas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desde", type=date.fromisoformat, required=True, help="primeiro dia de coleta (YYYY-MM-DD)")
+    parser.add_argument("--ate", type=date.fromisoformat, required=True, help="último dia de coleta (YYYY-MM-DD)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processos lendo o arquivo em paralelo")
+    parser.add_argument("--refazer", action="store_true", help="reprocessa também os dias já feitos")
+    parser.add_argument("--arquivo", type=Path, default=ARQUIVO_DIR, help="diretório do arquivo Parquet")
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="banco SQLite (o do profile do dbt)")
+    parser.add_argument("--dbt-profiles-dir", type=Path, default=DBT_PROFILES_DIR)
+    parser.add_argument("--dbt-project-dir", type=Path, default=DBT_DIR)
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas por lote")
+    args = parser.parse_args()
+
+    if args.ate < args.desde:
+        parser.error("--ate antes de --desde")
+    backfill(args.desde, args.ate, args.workers, args.refazer, args.arquivo, args.db,
+             args.dbt_profiles_dir, args.dbt_project_dir, args.lote)
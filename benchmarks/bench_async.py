@@ -0,0 +1,93 @@
+"""Benchmark da coleta: scrapy crawl previsao x coleta_async.py, contra o mock.
+
+Os dois rodam num processo filho, com o mesmo catálogo sintético, os mesmos
+limites (concorrência total e por host, sem delay) e banco próprio. Mede
+páginas/s, CPU por página, pico de memória (RSS), conexões TCP abertas no
+servidor e as linhas que chegaram na raw. Com --falhas, o mock devolve 503
+numa fração das requisições, para os retries entrarem na conta.
+
+    python benchmarks/bench_async.py --cidades 500 2000 --concorrencia 16
+    python benchmarks/bench_async.py --cidades 500 --falhas 0.05
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+COLETA_DIR = RAIZ / "bronze" / "coleta"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_climatempo import escrever_catalogo, servidor_mock  # noqa: E402
+
+
+def comando_scrapy(catalogo, base_url, pasta, concorrencia):
+    settings = {
+        "CLIMATEMPO_BASE_URL": base_url,
+        "RAW_DB_PATH": pasta / "raw.db",
+        "ARQUIVO_PARQUET_ENABLED": False,
+        "HTTPCACHE_ENABLED": False,
+        "CONTEUDO_HASH_ENABLED": False,
+        "ROBOTSTXT_OBEY": False,
+        "AUTOTHROTTLE_ENABLED": False,
+        "DOWNLOAD_DELAY": 0,
+        "CONCURRENT_REQUESTS": concorrencia,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": concorrencia,
+        "LOG_LEVEL": "WARNING",
+    }
+    s = [arg for nome, valor in settings.items() for arg in ("-s", f"{nome}={valor}")]
+    return [sys.executable, "-m", "scrapy", "crawl", "previsao", "-a", f"catalogo={catalogo}", *s]
+
+
+def comando_async(catalogo, base_url, pasta, concorrencia):
+    return [
+        sys.executable, "coleta_async.py", "--catalogo", str(catalogo), "--base-url", base_url,
+        "--db", str(pasta / "raw.db"), "--sem-arquivo", "--ignorar-robots", "--taxa", "0",
+        "--concorrencia", str(concorrencia), "--por-host", str(concorrencia),
+    ]
+
+
+def rodar(comando) -> tuple:
+    """(segundos, CPU em s, pico RSS em MB) do processo filho."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(comando, cwd=COLETA_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, uso = os.wait4(proc.pid, 0)
+    segundos = time.perf_counter() - t0
+    if status != 0:
+        raise RuntimeError(f"{comando[1:3]} terminou com status {status}")
+    return segundos, uso.ru_utime + uso.ru_stime, uso.ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, nargs="+", default=[200, 1000])
+    parser.add_argument("--concorrencia", type=int, default=16, help="requisições simultâneas (total = por host)")
+    parser.add_argument("--latencia", type=float, default=0.05, help="latência simulada do mock (s)")
+    parser.add_argument("--falhas", type=float, default=0.0, help="fração de 503 no mock")
+    args = parser.parse_args()
+
+    print(f"{'coletor':<8} {'cidades':>8} {'linhas':>8} {'segundos':>9} {'páginas/s':>10} "
+          f"{'CPU ms/pág':>11} {'RSS MB':>7} {'conexões':>9} {'503s':>5}")
+    with tempfile.TemporaryDirectory() as tmp, servidor_mock(args.latencia, args.falhas) as (base_url, contador):
+        for n in args.cidades:
+            catalogo = escrever_catalogo(Path(tmp) / f"cidades_{n}.csv", n)
+            for nome, montar in (("scrapy", comando_scrapy), ("async", comando_async)):
+                pasta = Path(tmp) / f"{nome}_{n}"
+                pasta.mkdir()
+                with contador["lock"]:
+                    antes = {chave: contador[chave] for chave in ("conexoes", "falhas")}
+                segundos, cpu, rss = rodar(montar(catalogo, base_url, pasta, args.concorrencia))
+                with sqlite3.connect(pasta / "raw.db") as conn:
+                    linhas = conn.execute("SELECT COUNT(*) FROM raw_climatempo_previsao").fetchone()[0]
+                print(f"{nome:<8} {n:>8} {linhas:>8} {segundos:>9.2f} {n / segundos:>10.1f} "
+                      f"{cpu / n * 1000:>11.2f} {rss:>7.0f} {contador['conexoes'] - antes['conexoes']:>9} "
+                      f"{contador['falhas'] - antes['falhas']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark do backfill (backfill.py): dias/min e idempotência.
+
+Gera um arquivo Parquet sintético (N dias x M cidades, 15 leads por coleta) e
+roda, num banco e numa cópia do projeto dbt temporários:
+
+1. o backfill do intervalo inteiro, com `--workers` processos;
+2. o mesmo intervalo de novo (deve pular tudo);
+3. o intervalo com --refazer (as contagens da raw/silver/gold não podem mudar).
+
+    python benchmarks/bench_backfill.py --dias 30 --cidades 200 --workers 4
+"""
+import argparse
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+from itertools import groupby
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+DBT_DIR = RAIZ / "silver-gold" / "projeto_clima"
+
+sys.path.insert(0, str(RAIZ / "bronze" / "transform"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from arquivo_bronze import escrever_particoes  # noqa: E402
+from bench_em_processo import PROFILE  # noqa: E402
+from dados_sinteticos import linhas_raw, registros  # noqa: E402
+from raw_db import COLUNAS_RAW  # noqa: E402
+
+DT_INGEST = COLUNAS_RAW.index("dt_ingest")
+
+TABELAS = [
+    "raw_climatempo_previsao",
+    "silver_climatempo_previsao",
+    "gold_climatempo_previsoes",
+    "gold_climatempo_verificacao",
+    "gold_climatempo_verificacao_janelas",
+]
+
+
+def escrever_arquivo(base_dir: Path, inicio: date, n_dias: int, n_cidades: int, seed: int = 42) -> int:
+    """Uma coleta por cidade e dia (dados_sinteticos.py), um lote do arquivo por dia."""
+    itens = registros(n_cidades, n_dias, inicio=inicio, seed=seed)
+    total = 0
+    for dia, linhas in groupby(linhas_raw(itens), key=lambda linha: linha[DT_INGEST][:10]):
+        total += escrever_particoes(linhas, base_dir, prefixo=f"sintetico-{dia}")
+    return total
+
+
+def contar(db_path: Path) -> dict:
+    with sqlite3.connect(db_path) as conn:
+        return {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] for tabela in TABELAS}
+
+
+def rodar_backfill(pasta: Path, desde: date, ate: date, workers: int, *extra) -> str:
+    comando = [
+        sys.executable, str(RAIZ / "backfill.py"), "--desde", desde.isoformat(), "--ate", ate.isoformat(),
+        "--workers", str(workers), "--arquivo", str(pasta / "arquivo"), "--db", str(pasta / "dataset_climatempo.db"),
+        "--dbt-profiles-dir", str(pasta), "--dbt-project-dir", str(pasta / "projeto_clima"), *extra,
+    ]
+    saida = subprocess.run(comando, cwd=RAIZ, check=True, capture_output=True, text=True).stdout
+    return [linha for linha in saida.splitlines() if linha.startswith(("⏱️", "✅ Nada"))][-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dias", type=int, default=30)
+    parser.add_argument("--cidades", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    desde = date(2026, 1, 1)
+    ate = desde + timedelta(days=args.dias - 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp)
+        db_path = pasta / "dataset_climatempo.db"
+        shutil.copytree(DBT_DIR, pasta / "projeto_clima", ignore=shutil.ignore_patterns("target", "logs"))
+        (pasta / "profiles.yml").write_text(PROFILE.format(db=db_path, pasta=pasta), encoding="utf-8")
+
+        linhas = escrever_arquivo(pasta / "arquivo", desde, args.dias, args.cidades)
+        print(f"🗄️  Arquivo sintético: {args.dias} dias x {args.cidades} cidades = {linhas} linhas")
+
+        print(f"1. backfill ({args.workers} workers): {rodar_backfill(pasta, desde, ate, args.workers)}")
+        contagens = contar(db_path)
+        print("   " + " | ".join(f"{t}: {n}" for t, n in contagens.items()))
+
+        print(f"2. de novo: {rodar_backfill(pasta, desde, ate, args.workers)}")
+
+        print(f"3. --refazer: {rodar_backfill(pasta, desde, ate, args.workers, '--refazer')}")
+        iguais = contar(db_path) == contagens
+        print(f"   {'✅ contagens iguais' if iguais else '❌ contagens mudaram: ' + str(contar(db_path))}")
+
+
+if __name__ == "__main__":
+    main()
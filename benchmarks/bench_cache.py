@@ -0,0 +1,123 @@
+"""Benchmark da coleta condicional: quanto o cache HTTP e o hash do bloco economizam.
+
+Roda o PrevisaoSpider duas vezes seguidas contra o mock (mock_climatempo.py),
+como duas coletas no mesmo dia, e mede a segunda:
+
+* sem cache: baixa e parseia tudo de novo
+* cache + ETag, página igual: o servidor responde 304, o corpo vem do cache
+* cache + hash, página igual: 304 e o bloco com o mesmo hash, nem parseia
+* cache + hash, só o entorno mudou: ETag novo (200 com corpo), mas o bloco
+  de previsão tem o mesmo hash e a página é descartada antes do parse
+
+    python benchmarks/bench_cache.py --cidades 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+COLETA_DIR = RAIZ / "bronze" / "coleta"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(COLETA_DIR))
+os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "coleta.settings")
+
+from mock_climatempo import escrever_catalogo, servidor_mock  # noqa: E402
+
+# nome: (cache HTTP, hash do bloco, muda o entorno da página entre as coletas)
+CENARIOS = {
+    "sem cache": (False, False, False),
+    "cache + ETag, página igual": (True, False, False),
+    "cache + hash, página igual": (True, True, False),
+    "cache + hash, só o entorno mudou": (True, True, True),
+}
+
+
+def rodar(n_cidades, latencia):
+    from scrapy.crawler import CrawlerRunner
+    from scrapy.utils.log import configure_logging
+    from scrapy.utils.project import get_project_settings
+    from scrapy.utils.reactor import install_reactor
+
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+    from twisted.internet import defer, reactor
+
+    from coleta.spiders.previsao import PrevisaoSpider
+
+    configure_logging({"LOG_LEVEL": "WARNING"})
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as tmp, servidor_mock(latencia) as (base_url, contador):
+        catalogo = escrever_catalogo(Path(tmp) / "cidades.csv", n_cidades)
+
+        @defer.inlineCallbacks
+        def coletar(pasta: Path, cache: bool, hash_: bool):
+            settings = get_project_settings()
+            settings.set("CIDADES_CATALOGO", str(catalogo))
+            settings.set("CLIMATEMPO_BASE_URL", base_url)
+            settings.set("RAW_DB_PATH", str(pasta / "bench.db"))
+            settings.set("ARQUIVO_PARQUET_DIR", str(pasta / "arquivo"))
+            settings.set("HTTPCACHE_DIR", str(pasta / "httpcache"))
+            settings.set("HTTPCACHE_ENABLED", cache)
+            settings.set("CONTEUDO_HASH_ENABLED", hash_)
+            # a segunda coleta do dia precisa buscar tudo de novo
+            settings.set("CHECKPOINT_ENABLED", False)
+            settings.set("ROBOTSTXT_OBEY", False)
+            settings.set("AUTOTHROTTLE_ENABLED", False)
+            settings.set("DOWNLOAD_DELAY", 0)
+            settings.set("CONCURRENT_REQUESTS_PER_DOMAIN", 16)
+            settings.set("LOG_LEVEL", "WARNING")
+
+            antes = (contador["requisicoes"], contador["bytes"], contador["nao_modificadas"])
+            runner = CrawlerRunner(settings)
+            crawler = runner.create_crawler(PrevisaoSpider)
+            yield runner.crawl(crawler)
+
+            stats = crawler.stats.get_stats()
+            return {
+                "requisicoes": contador["requisicoes"] - antes[0],
+                "bytes": contador["bytes"] - antes[1],
+                "304": contador["nao_modificadas"] - antes[2],
+                "itens": stats.get("item_scraped_count", 0),
+                "inalteradas": stats.get("coleta/paginas_inalteradas", 0),
+                "segundos": stats.get("elapsed_time_seconds") or 0.0,
+            }
+
+        @defer.inlineCallbacks
+        def sequencia():
+            for nome, (cache, hash_, muda_entorno) in CENARIOS.items():
+                pasta = Path(tmp) / f"cenario{len(resultados)}"
+                pasta.mkdir()
+                contador["rodada"] = 0
+                yield coletar(pasta, cache, hash_)
+                if muda_entorno:
+                    contador["rodada"] += 1
+                segunda = yield coletar(pasta, cache, hash_)
+                resultados.append((nome, segunda))
+            reactor.stop()
+
+        reactor.callWhenRunning(sequencia)
+        reactor.run()
+
+    print(f"🏗️  {n_cidades} cidades | medindo a 2ª coleta do dia")
+    print(f"{'cenário':<34} {'requisições':>11} {'KB baixados':>11} {'304':>5} {'itens':>6} "
+          f"{'inalteradas':>11} {'segundos':>9}")
+    for nome, r in resultados:
+        print(f"{nome:<34} {r['requisicoes']:>11} {r['bytes'] / 1024:>11.0f} {r['304']:>5} {r['itens']:>6} "
+              f"{r['inalteradas']:>11} {r['segundos']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=200)
+    parser.add_argument("--latencia", type=float, default=0.05, help="latência simulada do mock (s)")
+    args = parser.parse_args()
+
+    os.chdir(COLETA_DIR)
+    rodar(args.cidades, args.latencia)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark do checkpoint da coleta: crawl morto no meio e retomado.
+
+Contra o mock, com um catálogo de N cidades:
+
+1. crawl completo num banco novo (referência de tempo);
+2. outro crawl num banco novo, morto com SIGKILL quando o servidor já
+   atendeu `--morrer-em` das páginas (como um worker que cai);
+3. o mesmo crawl de novo, no mesmo job: só as cidades fora do checkpoint.
+
+No fim confere que toda cidade do catálogo tem os 15 lead_times na raw e
+que nenhuma cidade do checkpoint ficou com linhas faltando.
+
+    python benchmarks/bench_checkpoint.py --cidades 400 --morrer-em 0.7
+"""
+import argparse
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+COLETA_DIR = RAIZ / "bronze" / "coleta"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_climatempo import escrever_catalogo, servidor_mock  # noqa: E402
+
+
+def comando(catalogo, base_url, db_path):
+    settings = {
+        "CLIMATEMPO_BASE_URL": base_url,
+        "RAW_DB_PATH": db_path,
+        "CHECKPOINT_JOB": "bench",
+        "ARQUIVO_PARQUET_ENABLED": False,
+        "HTTPCACHE_ENABLED": False,
+        "CONTEUDO_HASH_ENABLED": False,
+        "METRICAS_ENABLED": False,
+        "ROBOTSTXT_OBEY": False,
+        "AUTOTHROTTLE_ENABLED": False,
+        "DOWNLOAD_DELAY": 0.01,
+        "LOG_LEVEL": "WARNING",
+    }
+    s = [arg for nome, valor in settings.items() for arg in ("-s", f"{nome}={valor}")]
+    return [sys.executable, "-m", "scrapy", "crawl", "previsao", "-a", f"catalogo={catalogo}", *s]
+
+
+def rodar(cmd, contador, parar_em=None) -> tuple:
+    """(segundos, páginas servidas); com `parar_em`, mata o processo nessa contagem."""
+    inicio_req = contador["requisicoes"]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=COLETA_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while proc.poll() is None:
+        if parar_em is not None and contador["requisicoes"] - inicio_req >= parar_em:
+            proc.send_signal(signal.SIGKILL)
+            proc.wait()
+            break
+        time.sleep(0.01)
+    return time.perf_counter() - t0, contador["requisicoes"] - inicio_req
+
+
+def estado(db_path: Path) -> dict:
+    with sqlite3.connect(db_path) as conn:
+        feitas = {row[0] for row in conn.execute("SELECT cidade FROM coleta_checkpoint WHERE job = 'bench'")}
+        leads = dict(conn.execute(
+            "SELECT cidade, COUNT(DISTINCT lead_time) FROM raw_climatempo_previsao GROUP BY cidade"
+        ))
+    return {"feitas": feitas, "leads": leads}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=400)
+    parser.add_argument("--morrer-em", type=float, default=0.7, help="fração das páginas antes do SIGKILL")
+    parser.add_argument("--latencia", type=float, default=0.02, help="latência simulada do mock (s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, servidor_mock(args.latencia) as (base_url, contador):
+        pasta = Path(tmp)
+        catalogo = escrever_catalogo(pasta / "cidades.csv", args.cidades)
+
+        s_completo, p_completo = rodar(comando(catalogo, base_url, pasta / "completo.db"), contador)
+        print(f"1. crawl completo:  {p_completo:>6} páginas em {s_completo:6.1f}s")
+
+        db_path = pasta / "retomado.db"
+        s_morto, p_morto = rodar(comando(catalogo, base_url, db_path), contador, int(args.cidades * args.morrer_em))
+        antes = estado(db_path)
+        incompletas = [c for c in antes["feitas"] if antes["leads"].get(c) != 15]
+        print(f"2. SIGKILL:         {p_morto:>6} páginas em {s_morto:6.1f}s | {len(antes['feitas'])} cidades no "
+              f"checkpoint, {len(incompletas)} delas com linhas faltando")
+
+        s_retomado, p_retomado = rodar(comando(catalogo, base_url, db_path), contador)
+        depois = estado(db_path)
+        print(f"3. retomado:        {p_retomado:>6} páginas em {s_retomado:6.1f}s "
+              f"({s_retomado / s_completo:.0%} do tempo do crawl completo)")
+
+        completas = sum(1 for n in depois["leads"].values() if n == 15)
+        ok = completas == args.cidades and len(depois["feitas"]) == args.cidades and not incompletas
+        print(f"{'✅' if ok else '❌'} {completas}/{args.cidades} cidades com os 15 lead_times, "
+              f"{len(depois['feitas'])} no checkpoint")
+
+
+if __name__ == "__main__":
+    main()
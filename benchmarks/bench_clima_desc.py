@@ -0,0 +1,105 @@
+"""Benchmark da descrição do clima: texto repetido x id inteiro (silver_clima_desc).
+
+Monta duas vezes as tabelas de fatos da gold (dadosdia + previsões D+1..D+14)
+com N cidades x D dias, num banco temporário cada:
+
+* texto: clima_desc com a frase inteira em toda linha (como era)
+* ids: clima_desc_id inteiro + a dimensão silver_clima_desc
+
+Mede o tamanho do arquivo e o tempo da consulta de acerto da descrição que a
+gold_climatempo_verificacao faz (join previsão x real e comparação), e confere
+que os dois dão a mesma contagem de acertos.
+
+    python benchmarks/bench_clima_desc.py --cidades 1000 --dias 60
+"""
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+MANHA = ["Sol com algumas nuvens", "Sol com muitas nuvens", "Sol e aumento de nuvens de manhã",
+         "Sol com muitas nuvens a nublado com chuva de manhã", "Sol, com chuva de manhã"]
+RESTO = ["Não chove.", "Pancadas de chuva à tarde e à noite.", "Tarde e noite com temporal.",
+         "Chove rápido durante o dia e à noite.", "Noite com muitas nuvens.",
+         "À noite, muitas nuvens mas com tempo firme.", "Noite com pancadas de chuva."]
+DESCRICOES = [f"{m}. {r}" for m in MANHA for r in RESTO]
+
+
+def linhas_fatos(n_cidades: int, n_dias: int, seed: int = 42):
+    """(tabela, cidade_id, lead_time, data_coleta, data_previsao, descrição)."""
+    rnd = random.Random(seed)
+    inicio = date(2025, 1, 1)
+    for dia in range(n_dias):
+        coleta = inicio + timedelta(days=dia)
+        for i in range(n_cidades):
+            cidade = f"CIDADE{i}-SP"
+            yield "dadosdia", cidade, 0, coleta.isoformat(), coleta.isoformat(), rnd.choice(DESCRICOES)
+            for lead in range(1, 15):
+                alvo = (coleta + timedelta(days=lead)).isoformat()
+                yield "previsoes", cidade, lead, coleta.isoformat(), alvo, rnd.choice(DESCRICOES)
+
+
+def montar(db_path: Path, linhas, modo: str):
+    coluna = "clima_desc TEXT" if modo == "texto" else "clima_desc_id INTEGER"
+    ids = {texto: i for i, texto in enumerate(DESCRICOES, start=1)}
+    with sqlite3.connect(db_path) as conn:
+        for tabela in ("dadosdia", "previsoes"):
+            conn.execute(
+                f"CREATE TABLE gold_{tabela} (cidade_id TEXT, lead_time INTEGER, data_coleta TEXT, "
+                f"data_previsao TEXT, temp_min INTEGER, temp_max INTEGER, chuva_mm REAL, {coluna})"
+            )
+        if modo == "ids":
+            conn.execute("CREATE TABLE silver_clima_desc (clima_desc_id INTEGER PRIMARY KEY, clima_desc TEXT)")
+            conn.executemany("INSERT INTO silver_clima_desc VALUES (?, ?)", [(i, t) for t, i in ids.items()])
+        for tabela, cidade, lead, coleta, alvo, texto in linhas:
+            valor = texto if modo == "texto" else ids[texto]
+            conn.execute(f"INSERT INTO gold_{tabela} VALUES (?, ?, ?, ?, 18, 27, 2.4, ?)",
+                         (cidade, lead, coleta, alvo, valor))
+        conn.execute("CREATE INDEX ix_real ON gold_dadosdia (cidade_id, data_coleta)")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("VACUUM")
+
+
+def acertos(db_path: Path, modo: str) -> tuple:
+    """(acertos, total, segundos) da comparação previsão x real."""
+    if modo == "texto":
+        match = "COALESCE(p.clima_desc, '') = COALESCE(r.clima_desc, '')"
+    else:
+        match = "COALESCE(p.clima_desc_id, 0) = COALESCE(r.clima_desc_id, 0)"
+    with sqlite3.connect(db_path) as conn:
+        t0 = time.perf_counter()
+        n_match, n = conn.execute(
+            f"SELECT SUM({match}), COUNT(*) FROM gold_previsoes p "
+            "JOIN gold_dadosdia r ON r.cidade_id = p.cidade_id AND r.data_coleta = p.data_previsao"
+        ).fetchone()
+        return n_match, n, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=500)
+    parser.add_argument("--dias", type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{'modo':<6} {'linhas':>9} {'MB':>8} {'bytes/linha':>12} {'acertos':>8} {'pares':>9} {'consulta s':>11}")
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for modo in ("texto", "ids"):
+            db_path = Path(tmp) / f"{modo}.db"
+            montar(db_path, linhas_fatos(args.cidades, args.dias), modo)
+            n_linhas = args.cidades * args.dias * 15
+            tamanho = db_path.stat().st_size
+            n_match, n, segundos = acertos(db_path, modo)
+            resultados[modo] = (n_match, n)
+            print(f"{modo:<6} {n_linhas:>9} {tamanho / 1e6:>8.1f} {tamanho / n_linhas:>12.1f} "
+                  f"{n_match:>8} {n:>9} {segundos:>11.3f}")
+
+    ok = resultados["texto"] == resultados["ids"]
+    print(f"{'✅' if ok else '❌'} mesma contagem de acertos nos dois modos")
+
+
+if __name__ == "__main__":
+    main()
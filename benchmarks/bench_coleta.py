@@ -0,0 +1,91 @@
+"""Benchmark da coleta: páginas/s do PrevisaoSpider conforme o catálogo cresce.
+
+Sobe o mock local (mock_climatempo.py), gera catálogos sintéticos de N cidades
+e roda o spider com o perfil de settings.py apontado para o mock.
+
+    python benchmarks/bench_coleta.py --cidades 10 50 200 --latencia 0.2
+    python benchmarks/bench_coleta.py --sem-throttle   # capacidade bruta, sem politeness
+"""
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+COLETA_DIR = RAIZ / "bronze" / "coleta"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(COLETA_DIR))
+os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "coleta.settings")
+
+from mock_climatempo import escrever_catalogo, servidor_mock  # noqa: E402
+
+
+def rodar(tamanhos, latencia, sem_throttle):
+    from scrapy.crawler import CrawlerRunner
+    from scrapy.utils.log import configure_logging
+    from scrapy.utils.project import get_project_settings
+    from scrapy.utils.reactor import install_reactor
+
+    install_reactor("twisted.internet.asyncioreactor.AsyncioSelectorReactor")
+    from twisted.internet import defer, reactor
+
+    from coleta.spiders.previsao import PrevisaoSpider
+
+    configure_logging({"LOG_LEVEL": "WARNING"})
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as tmp, servidor_mock(latencia) as (base_url, contador):
+
+        @defer.inlineCallbacks
+        def sequencia():
+            for n in tamanhos:
+                settings = get_project_settings()
+                settings.set("CIDADES_CATALOGO", str(escrever_catalogo(Path(tmp) / f"cidades_{n}.csv", n)))
+                settings.set("CLIMATEMPO_BASE_URL", base_url)
+                settings.set("RAW_DB_PATH", str(Path(tmp) / "bench.db"))
+                settings.set("ARQUIVO_PARQUET_DIR", str(Path(tmp) / "arquivo"))
+                # cada tamanho repete as mesmas cidades: sem cache nem hash, mede a coleta cheia
+                settings.set("HTTPCACHE_ENABLED", False)
+                settings.set("CONTEUDO_HASH_ENABLED", False)
+                settings.set("CHECKPOINT_ENABLED", False)
+                settings.set("ROBOTSTXT_OBEY", False)
+                settings.set("LOG_LEVEL", "WARNING")
+                if sem_throttle:
+                    settings.set("AUTOTHROTTLE_ENABLED", False)
+                    settings.set("DOWNLOAD_DELAY", 0)
+                    settings.set("CONCURRENT_REQUESTS_PER_DOMAIN", 16)
+
+                runner = CrawlerRunner(settings)
+                crawler = runner.create_crawler(PrevisaoSpider)
+                yield runner.crawl(crawler)
+
+                stats = crawler.stats.get_stats()
+                paginas = stats.get("response_received_count", 0)
+                segundos = stats.get("elapsed_time_seconds") or 0.0
+                resultados.append((n, paginas, stats.get("item_scraped_count", 0), segundos))
+            reactor.stop()
+
+        reactor.callWhenRunning(sequencia)
+        reactor.run()
+
+    print(f"{'cidades':>8} {'páginas':>8} {'itens':>8} {'segundos':>9} {'páginas/s':>10}")
+    for n, paginas, itens, segundos in resultados:
+        taxa = paginas / segundos if segundos else 0.0
+        print(f"{n:>8} {paginas:>8} {itens:>8} {segundos:>9.2f} {taxa:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--latencia", type=float, default=0.1, help="latência simulada do mock (s)")
+    parser.add_argument("--sem-throttle", action="store_true", help="desliga delay/AutoThrottle")
+    args = parser.parse_args()
+
+    os.chdir(COLETA_DIR)
+    rodar(args.cidades, args.latencia, args.sem_throttle)
+
+
+if __name__ == "__main__":
+    main()
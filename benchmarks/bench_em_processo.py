@@ -0,0 +1,140 @@
+"""Benchmark da execução diária: BashOperators encadeados x pipeline num processo só.
+
+Contra o mock (mock_climatempo.py) e um banco temporário por modo:
+
+* shells: o que a DAG faz, um processo por etapa
+  (scrapy crawl, dbt run da silver, dbt run da gold)
+* em processo: python pipeline_em_processo.py, com CrawlerProcess e dbtRunner
+  (projeto dbt parseado uma vez)
+
+Cada modo usa uma cópia limpa do projeto dbt (sem target/ nem partial parse).
+
+    python benchmarks/bench_em_processo.py --cidades 50
+"""
+import argparse
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+COLETA_DIR = RAIZ / "bronze" / "coleta"
+DBT_DIR = RAIZ / "silver-gold" / "projeto_clima"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_climatempo import escrever_catalogo, servidor_mock  # noqa: E402
+
+PROFILE = """projeto_clima:
+  target: dev
+  outputs:
+    dev:
+      type: sqlite
+      threads: 1
+      database: database
+      schema: main
+      schemas_and_paths:
+        main: {db}
+      schema_directory: {pasta}
+"""
+
+
+def preparar(pasta: Path):
+    """Banco vazio, cópia limpa do projeto dbt e profile apontando para o banco."""
+    pasta.mkdir()
+    db_path = pasta / "dataset_climatempo.db"
+    projeto = pasta / "projeto_clima"
+    shutil.copytree(DBT_DIR, projeto, ignore=shutil.ignore_patterns("target", "logs"))
+    (pasta / "profiles.yml").write_text(PROFILE.format(db=db_path, pasta=pasta), encoding="utf-8")
+    return db_path, projeto
+
+
+def settings_coleta(base_url: str, pasta: Path, db_path: Path) -> list:
+    return [
+        f"CLIMATEMPO_BASE_URL={base_url}",
+        f"RAW_DB_PATH={db_path}",
+        f"ARQUIVO_PARQUET_DIR={pasta / 'arquivo'}",
+        "HTTPCACHE_ENABLED=False",
+        "ROBOTSTXT_OBEY=False",
+        "AUTOTHROTTLE_ENABLED=False",
+        "DOWNLOAD_DELAY=0",
+        "LOG_LEVEL=WARNING",
+    ]
+
+
+def cronometrar(comando, cwd) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(comando, cwd=cwd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def modo_shells(catalogo, base_url, pasta):
+    db_path, projeto = preparar(pasta)
+    s = [arg for setting in settings_coleta(base_url, pasta, db_path) for arg in ("-s", setting)]
+    dbt = [sys.executable, "-m", "dbt.cli.main", "run", "--project-dir", str(projeto), "--profiles-dir", str(pasta)]
+    tempos = {
+        "coleta": cronometrar([sys.executable, "-m", "scrapy", "crawl", "previsao", "-a", f"catalogo={catalogo}", *s],
+                              COLETA_DIR),
+        "dbt silver": cronometrar([*dbt, "--select", "climatempo.silver"], projeto),
+        "dbt gold": cronometrar([*dbt, "--select", "climatempo.gold"], projeto),
+    }
+    tempos["total"] = sum(tempos.values())
+    return db_path, tempos
+
+
+def modo_em_processo(catalogo, base_url, pasta):
+    db_path, projeto = preparar(pasta)
+    s = [arg for setting in settings_coleta(base_url, pasta, db_path) for arg in ("-s", setting)]
+    total = cronometrar([
+        sys.executable, str(RAIZ / "pipeline_em_processo.py"), "--catalogo", str(catalogo),
+        "--dbt-project-dir", str(projeto), "--dbt-profiles-dir", str(pasta), *s,
+    ], RAIZ)
+
+    # tempos por etapa medidos lá dentro (pipeline_run_metrics)
+    with sqlite3.connect(db_path) as conn:
+        internos = dict(conn.execute(
+            "SELECT metrica, valor FROM pipeline_run_metrics WHERE etapa = 'pipeline_em_processo' AND chave = ''"
+        ))
+    tempos = {
+        "coleta": internos["segundos_coleta"],
+        "dbt parse": internos["segundos_dbt_parse"],
+        "dbt silver": internos["segundos_dbt_silver"],
+        "dbt gold": internos["segundos_dbt_gold"],
+        "total": total,
+    }
+    return db_path, tempos
+
+
+def main():
+    # `python -m dbt.cli.main` precisa do entrypoint; confere antes de medir
+    from dbt.cli.main import dbtRunner  # noqa: F401
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=50)
+    parser.add_argument("--latencia", type=float, default=0.05, help="latência simulada do mock (s)")
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp, servidor_mock(args.latencia) as (base_url, _):
+        catalogo = escrever_catalogo(Path(tmp) / "cidades.csv", args.cidades)
+        for nome, modo in (("shells", modo_shells), ("em processo", modo_em_processo)):
+            db_path, tempos = modo(catalogo, base_url, Path(tmp) / nome.replace(" ", "_"))
+            with sqlite3.connect(db_path) as conn:
+                tempos["linhas gold"] = conn.execute("SELECT COUNT(*) FROM gold_climatempo_previsoes").fetchone()[0]
+            resultados[nome] = tempos
+
+    etapas = ["coleta", "dbt parse", "dbt silver", "dbt gold", "total"]
+    print(f"🏗️  {args.cidades} cidades, banco vazio por modo (segundos de parede)")
+    print(f"{'modo':<12} " + " ".join(f"{e:>10}" for e in etapas) + f" {'linhas gold':>12}")
+    for nome, tempos in resultados.items():
+        colunas = " ".join(f"{tempos[e]:>10.2f}" if e in tempos else f"{'-':>10}" for e in etapas)
+        print(f"{nome:<12} {colunas} {tempos['linhas gold']:>12}")
+    economia = resultados["shells"]["total"] - resultados["em processo"]["total"]
+    print(f"💡 economia por execução: {economia:.1f}s ({economia / resultados['shells']['total']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
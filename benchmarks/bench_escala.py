@@ -0,0 +1,283 @@
+"""Suíte de benchmark ponta a ponta em escala, com relatório JSON.
+
+Gera N cidades x D dias com dados_sinteticos.py e mede cada etapa num banco e
+numa cópia limpa do projeto dbt temporários:
+
+1. gerar: JSONL no formato do spider;
+2. transform: transform.main_streaming do JSONL inteiro para a raw;
+3. dbt: parse + run da silver e da gold pelo dbtRunner. O tempo de cada
+   modelo sai do resultado do dbt (silver_climatempo_previsao = dedup da
+   silver, gold_climatempo_verificacao = join D-1 -> D);
+4. dashboard: as leituras do app.py sem o Streamlit, pelo PoolLeitura
+   (somas D-1 -> D, métricas gerais, ranking por cidade, pares e tabela de uma
+   cidade, janelas móveis pelo janelas.py), melhor de 3;
+5. incremental: mais um dia no JSONL (como o `-o` da DAG), transform
+   incremental e dbt run das duas camadas.
+
+O relatório (etapas com segundos, linhas/s e pico de memória, contagem das
+tabelas, commit e ambiente) vai para --saida, por padrão
+benchmarks/resultados/. Com --comparar, cada etapa é comparada com a do
+relatório anterior. O script sai com código 1 se alguma ficou mais lenta que
+--tolerancia (e acima de --piso segundos, para o ruído das etapas curtas não
+contar).
+
+    python benchmarks/bench_escala.py --cidades 1000 --dias 90
+    python benchmarks/bench_escala.py --cidades 1000 --dias 90 --comparar benchmarks/resultados/base.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+RESULTADOS_DIR = Path(__file__).resolve().parent / "resultados"
+
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / "dashboard"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_em_processo import preparar  # noqa: E402
+from dados_sinteticos import escrever_jsonl, registros  # noqa: E402
+from pipeline_em_processo import dbt_runner, rodar_dbt  # noqa: E402
+
+from instrumentacao import pico_memoria_mb  # noqa: E402
+from janelas import metricas_janela, ranking_janela  # noqa: E402
+from metricas import metricas, metricas_totais  # noqa: E402
+from pool_leitura import PoolLeitura  # noqa: E402
+
+TABELAS = [
+    "raw_climatempo_previsao",
+    "silver_clima_desc",
+    "silver_climatempo_previsao",
+    "gold_climatempo_dadosdia",
+    "gold_climatempo_previsoes",
+    "gold_climatempo_verificacao",
+    "gold_climatempo_verificacao_cidade_dia",
+    "gold_climatempo_verificacao_janelas",
+]
+
+LEAD_D1 = 1
+
+# só os erros do dbt no terminal; o tempo de cada modelo vem do resultado
+os.environ.setdefault("DBT_QUIET", "true")
+
+
+@contextmanager
+def cronometro(etapas: list, nome: str):
+    """Mede o bloco e acrescenta a etapa ao relatório (como instrumentacao.medir_etapa).
+
+        with cronometro(etapas, "transform") as m:
+            m["linhas"] = main_streaming(...)
+    """
+    registro = {"etapa": nome}
+    t0 = time.perf_counter()
+    yield registro
+    registro.setdefault("segundos", time.perf_counter() - t0)
+    anotar(etapas, registro)
+
+
+def anotar(etapas: list, registro: dict):
+    if registro.get("linhas") and registro["segundos"] > 0:
+        registro["linhas_por_s"] = registro["linhas"] / registro["segundos"]
+    registro["pico_memoria_mb"] = pico_memoria_mb()
+    etapas.append(registro)
+    por_s = f"{registro['linhas_por_s']:>12.0f}" if "linhas_por_s" in registro else f"{'':>12}"
+    print(f"{registro['etapa']:<56} {registro['segundos']:>9.3f} {registro.get('linhas', ''):>10} {por_s}")
+
+
+def melhor_de(vezes: int, funcao, *args):
+    melhor, resultado = float("inf"), None
+    for _ in range(vezes):
+        t0 = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor, resultado
+
+
+def rodar_dbt_camadas(etapas: list, runner, pasta: Path, projeto: Path, prefixo: str):
+    """silver e gold; cada modelo vira uma etapa com o tempo medido pelo próprio dbt."""
+    for camada in ("silver", "gold"):
+        with cronometro(etapas, f"{prefixo}/{camada}"):
+            resultado = rodar_dbt(runner, f"climatempo.{camada}", pasta, projeto)
+        for modelo in resultado.result.results:
+            if modelo.node.resource_type != "model":
+                continue  # o on-run-start entra no tempo da camada
+            anotar(etapas, {"etapa": f"{prefixo}/{modelo.node.name}", "segundos": modelo.execution_time})
+
+
+def leituras_dashboard(etapas: list, db_path: Path, vezes: int = 3):
+    """As consultas do dashboard/app.py, sem Streamlit nem cache."""
+    import pandas as pd
+
+    pool = PoolLeitura(db_path, tamanho=1)
+
+    def ler(sql, params=()):
+        with pool.conexao() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    with pool.conexao() as conn:
+        colunas = [row[1] for row in conn.execute('PRAGMA table_info("gold_climatempo_verificacao_cidade_dia")')]
+        cidade = conn.execute("SELECT MIN(cidade_id) FROM gold_climatempo_dadosdia").fetchone()[0]
+    somas = [c for c in colunas if c == "n" or c.startswith(("n_", "soma_"))]
+    cols_somas = ", ".join(f'SUM("{c}") AS "{c}"' for c in somas)
+
+    # como o app.py: o SQLite soma por cidade, o dashboard recebe uma linha por cidade
+    segundos, df_cidades = melhor_de(vezes, lambda: ler(
+        f"SELECT cidade_id, MIN(dia_real) AS primeiro_dia, MAX(dia_real) AS ultimo_dia, {cols_somas} "
+        "FROM gold_climatempo_verificacao_cidade_dia WHERE lead_time = ? GROUP BY cidade_id", (LEAD_D1,)
+    ))
+    df_cidades = df_cidades.set_index("cidade_id")
+    anotar(etapas, {"etapa": "dashboard/somas D-1->D por cidade", "segundos": segundos, "linhas": len(df_cidades)})
+
+    segundos, _ = melhor_de(vezes, lambda: metricas_totais(df_cidades[somas]))
+    anotar(etapas, {"etapa": "dashboard/métricas gerais", "segundos": segundos, "linhas": len(df_cidades)})
+
+    segundos, ranking = melhor_de(vezes, lambda: metricas(df_cidades[somas])
+                                  .sort_values("score_final", ascending=False))
+    anotar(etapas, {"etapa": "dashboard/ranking por cidade", "segundos": segundos, "linhas": len(ranking)})
+
+    segundos, pares = melhor_de(vezes, lambda: ler(
+        "SELECT * FROM gold_climatempo_verificacao WHERE lead_time = ? AND cidade_id = ? ORDER BY dia_real",
+        (LEAD_D1, cidade),
+    ))
+    anotar(etapas, {"etapa": "dashboard/pares D-1->D (1 cidade)", "segundos": segundos, "linhas": len(pares)})
+
+    segundos, tabela = melhor_de(vezes, lambda: ler(
+        "SELECT * FROM gold_climatempo_previsoes WHERE cidade_id = ? AND lead_time = ? ORDER BY data_coleta",
+        (cidade, LEAD_D1),
+    ))
+    anotar(etapas, {"etapa": "dashboard/tabela previsões (1 cidade)", "segundos": segundos, "linhas": len(tabela)})
+
+    with pool.conexao() as conn:
+        segundos, ranking = melhor_de(vezes, lambda: ranking_janela(conn, LEAD_D1, 30))
+        anotar(etapas, {"etapa": "dashboard/janelas 30d (todas as cidades)", "segundos": segundos,
+                        "linhas": len(ranking)})
+        segundos, _ = melhor_de(vezes, lambda: metricas_janela(conn, cidade, LEAD_D1, 30))
+        anotar(etapas, {"etapa": "dashboard/janelas 30d (1 cidade)", "segundos": segundos, "linhas": 1})
+    pool.fechar()
+
+
+def contar(db_path: Path) -> dict:
+    with sqlite3.connect(db_path) as conn:
+        return {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] for tabela in TABELAS}
+
+
+def commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def executar(n_cidades: int, n_dias: int, coletas_por_dia: int, seed: int) -> dict:
+    from transform import main_incremental, main_streaming
+
+    relatorio = {
+        "benchmark": "bench_escala",
+        "quando": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "parametros": {"cidades": n_cidades, "dias": n_dias, "coletas_por_dia": coletas_por_dia, "seed": seed},
+        "ambiente": {
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+        },
+        "etapas": [],
+    }
+    etapas = relatorio["etapas"]
+
+    print(f"{'etapa':<56} {'segundos':>9} {'linhas':>10} {'linhas/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp) / "escala"
+        db_path, projeto = preparar(pasta)
+        jsonl = pasta / "data.jsonl"
+
+        # um dia a mais no gerador: fica para a etapa incremental
+        itens = registros(n_cidades, n_dias + 1, coletas_por_dia=coletas_por_dia, seed=seed)
+        with cronometro(etapas, "gerar/jsonl") as m:
+            m["linhas"] = escrever_jsonl(jsonl, islice(itens, n_cidades * n_dias * coletas_por_dia * 15))
+        relatorio["jsonl_mb"] = jsonl.stat().st_size / 1e6
+
+        with cronometro(etapas, "transform/jsonl -> raw") as m:
+            m["linhas"] = main_streaming(jsonl, db_path, salvar_csv=False)
+
+        with cronometro(etapas, "dbt/parse"):
+            runner = dbt_runner(pasta, projeto)
+        rodar_dbt_camadas(etapas, runner, pasta, projeto, "dbt")
+
+        leituras_dashboard(etapas, db_path)
+
+        escrever_jsonl(jsonl, itens, modo="a")
+        with cronometro(etapas, "incremental/transform") as m:
+            m["linhas"] = main_incremental(jsonl, db_path, salvar_csv=False)
+        rodar_dbt_camadas(etapas, runner, pasta, projeto, "incremental/dbt")
+
+        relatorio["tabelas"] = contar(db_path)
+        relatorio["db_mb"] = db_path.stat().st_size / 1e6
+    return relatorio
+
+
+def comparar(atual: dict, base: dict, tolerancia: float, piso: float) -> list:
+    """Etapas mais lentas que a base além da tolerância (e do piso em segundos)."""
+    anteriores = {e["etapa"]: e["segundos"] for e in base["etapas"]}
+    regressoes = []
+    print(f"\n📊 Comparação com {base.get('commit') or '?'} ({base.get('quando', '?')})")
+    print(f"{'etapa':<56} {'base':>9} {'atual':>9} {'variação':>9}")
+    for etapa in atual["etapas"]:
+        antes = anteriores.get(etapa["etapa"])
+        if antes is None:
+            continue
+        agora = etapa["segundos"]
+        variacao = agora / antes - 1 if antes > 0 else 0.0
+        regrediu = variacao > tolerancia and agora - antes > piso
+        if regrediu:
+            regressoes.append(etapa["etapa"])
+        print(f"{etapa['etapa']:<56} {antes:>9.3f} {agora:>9.3f} {variacao:>+9.0%}{'  ❌' if regrediu else ''}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=500)
+    parser.add_argument("--dias", type=int, default=60)
+    parser.add_argument("--coletas-por-dia", type=int, default=1, help="> 1 gera duplicatas para a silver deduplicar")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", type=Path, help="relatório JSON (padrão: benchmarks/resultados/)")
+    parser.add_argument("--comparar", type=Path, help="relatório anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="aumento relativo tolerado por etapa")
+    parser.add_argument("--piso", type=float, default=0.05, help="diferença mínima (s) para contar regressão")
+    args = parser.parse_args()
+
+    relatorio = executar(args.cidades, args.dias, args.coletas_por_dia, args.seed)
+
+    saida = args.saida or RESULTADOS_DIR / (
+        f"escala_{args.cidades}x{args.dias}_{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.json"
+    )
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n📝 Relatório: {saida}")
+    print("   " + " | ".join(f"{t}: {n}" for t, n in relatorio["tabelas"].items()))
+
+    if args.comparar:
+        base = json.loads(args.comparar.read_text(encoding="utf-8"))
+        if base.get("parametros") != relatorio["parametros"]:
+            print(f"⚠️  Parâmetros diferentes da base: {base.get('parametros')}")
+        regressoes = comparar(relatorio, base, args.tolerancia, args.piso)
+        if regressoes:
+            print(f"❌ {len(regressoes)} etapa(s) mais lentas que {args.tolerancia:.0%}: {', '.join(regressoes)}")
+            sys.exit(1)
+        print("✅ Nenhuma regressão acima da tolerância")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Micro-benchmark da extração dos blocos diários sobre o HTML de fixture.
+
+Compara os motores de coleta/extracao.py em páginas/s e CPU por página,
+contando o parse do HTML (cada página é uma HtmlResponse nova, como no
+crawl). Antes de medir, confere que os dois extraem os mesmos campos.
+
+    python benchmarks/bench_extracao.py --paginas 2000
+    python benchmarks/bench_extracao.py --html pagina_salva.html
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(RAIZ / "bronze" / "coleta"))
+
+from mock_climatempo import FIXTURE_HTML  # noqa: E402
+
+
+def medir(extrair, corpo: bytes, paginas: int):
+    from scrapy.http import HtmlResponse
+
+    url = "http://localhost/previsao-do-tempo/15-dias/cidade/1/cidade-sp"
+    parede, cpu = time.perf_counter(), time.process_time()
+    for _ in range(paginas):
+        extrair(HtmlResponse(url, body=corpo, encoding="utf-8"))
+    return time.perf_counter() - parede, time.process_time() - cpu
+
+
+def main():
+    from scrapy.http import HtmlResponse
+
+    from coleta.extracao import MOTORES
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", type=int, default=2000)
+    parser.add_argument("--html", type=Path, default=FIXTURE_HTML, help="página salva do Climatempo")
+    args = parser.parse_args()
+
+    corpo = args.html.read_bytes()
+    resposta = HtmlResponse("http://localhost/x", body=corpo, encoding="utf-8")
+    referencia = MOTORES["seletores"](resposta)
+    for nome, extrair in MOTORES.items():
+        assert extrair(HtmlResponse("http://localhost/x", body=corpo, encoding="utf-8")) == referencia, nome
+    print(f"✅ {len(referencia)} dias por página, mesmos campos nos {len(MOTORES)} motores")
+
+    print(f"{'motor':<10} {'páginas/s':>10} {'CPU ms/página':>14} {'speedup':>8}")
+    base = None
+    for nome in ("seletores", "lxml"):
+        parede, cpu = medir(MOTORES[nome], corpo, args.paginas)
+        base = base or cpu
+        print(f"{nome:<10} {args.paginas / parede:>10.0f} {cpu / args.paginas * 1000:>14.3f} {base / cpu:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Benchmark dos índices do warehouse SQLite.
+
+Monta um banco sintético (raw + gold) com alguns milhões de linhas e mede,
+sem e com os índices, as duas consultas quentes do pipeline:
+
+* dedup incremental da silver (ROW_NUMBER sobre os últimos dias de DATE(dt_ingest))
+* join D-1 -> D do dashboard (previsão lead 1 x dado do dia), uma cidade e todas
+
+    python benchmarks/bench_indices.py --cidades 1000 --dias 180
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+# mesmos índices de raw_db.garantir_schema_raw e dos post_hook (criar_indice) dos modelos
+INDICES = [
+    "CREATE INDEX ix_raw_data_ingest ON raw_climatempo_previsao (DATE(dt_ingest), cidade, lead_time)",
+    "CREATE INDEX ix_dadosdia_data_coleta ON gold_climatempo_dadosdia (data_coleta)",
+    "CREATE INDEX ix_dadosdia_cidade_data_coleta ON gold_climatempo_dadosdia (cidade_id, data_coleta)",
+    "CREATE INDEX ix_previsoes_data_coleta ON gold_climatempo_previsoes (data_coleta)",
+    "CREATE INDEX ix_previsoes_cidade_data_coleta ON gold_climatempo_previsoes (cidade_id, data_coleta)",
+    "CREATE INDEX ix_previsoes_cidade_data_previsao ON gold_climatempo_previsoes (cidade_id, data_previsao, lead_time)",
+]
+
+CONSULTAS = {
+    "dedup silver (3 dias)": """
+        SELECT COUNT(*) FROM (
+            SELECT ROW_NUMBER() OVER (
+                PARTITION BY DATE(dt_ingest), lead_time, cidade
+                ORDER BY dt_ingest DESC
+            ) as rn
+            FROM raw_climatempo_previsao
+            WHERE DATE(dt_ingest) >= :desde
+        ) WHERE rn = 1
+    """,
+    "join D-1 -> D (1 cidade)": """
+        SELECT COUNT(*), AVG(p.temp_max - r.temp_max)
+        FROM gold_climatempo_previsoes p
+        JOIN gold_climatempo_dadosdia r
+          ON r.cidade_id = p.cidade_id AND r.data_coleta = p.data_previsao
+        WHERE p.cidade_id = :cidade AND p.lead_time = 1
+    """,
+    "join D-1 -> D (todas)": """
+        SELECT COUNT(*), AVG(p.temp_max - r.temp_max)
+        FROM gold_climatempo_previsoes p
+        JOIN gold_climatempo_dadosdia r
+          ON r.cidade_id = p.cidade_id AND r.data_coleta = p.data_previsao
+        WHERE p.lead_time = 1
+    """,
+}
+
+
+def montar_banco(path: Path, n_cidades: int, n_dias: int, coletas_por_dia: int):
+    conn = sqlite3.connect(path)
+    conn.executescript(f"""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=OFF;
+
+        CREATE TABLE cidades AS
+            WITH RECURSIVE c(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM c WHERE i + 1 < {n_cidades})
+            SELECT i, 'cidade' || i || '-sp' as cidade FROM c;
+        CREATE TABLE dias AS
+            WITH RECURSIVE d(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM d WHERE i + 1 < {n_dias})
+            SELECT i, DATE('2025-01-01', '+' || i || ' day') as dia FROM d;
+        CREATE TABLE leads AS
+            WITH RECURSIVE l(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM l WHERE i + 1 < 15)
+            SELECT i FROM l;
+        CREATE TABLE coletas AS
+            WITH RECURSIVE k(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM k WHERE i + 1 < {coletas_por_dia})
+            SELECT i FROM k;
+
+        CREATE TABLE raw_climatempo_previsao AS
+        SELECT
+            c.cidade,
+            CASE WHEN l.i = 0 THEN 'atual' ELSE 'previsao' END as atualouprevisao,
+            l.i as lead_time,
+            15 + ABS(RANDOM() % 10) as tmin,
+            25 + ABS(RANDOM() % 10) as tmax,
+            'Sol com muitas nuvens. Pancadas de chuva à tarde e à noite.' as descricao,
+            ABS(RANDOM() % 200) / 10.0 as chuva,
+            d.dia || 'T0' || (3 + k.i) || ':00:00+00:00' as dt_ingest
+        FROM cidades c, dias d, leads l, coletas k;
+
+        CREATE TABLE gold_climatempo_dadosdia AS
+        SELECT UPPER(c.cidade) as cidade_id, 15 + ABS(RANDOM() % 10) as temp_min,
+               25 + ABS(RANDOM() % 10) as temp_max, d.dia as data_coleta
+        FROM cidades c, dias d;
+
+        CREATE TABLE gold_climatempo_previsoes AS
+        SELECT UPPER(c.cidade) as cidade_id, l.i as lead_time, 15 + ABS(RANDOM() % 10) as temp_min,
+               25 + ABS(RANDOM() % 10) as temp_max, d.dia as data_coleta,
+               DATE(d.dia, '+' || l.i || ' day') as data_previsao
+        FROM cidades c, dias d, leads l
+        WHERE l.i >= 1;
+
+        DROP TABLE cidades; DROP TABLE dias; DROP TABLE leads; DROP TABLE coletas;
+        ANALYZE;
+    """)
+    return conn
+
+
+def medir(conn, sql, params, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=1000)
+    parser.add_argument("--dias", type=int, default=180)
+    parser.add_argument("--coletas-por-dia", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        conn = montar_banco(Path(tmp) / "bench.db", args.cidades, args.dias, args.coletas_por_dia)
+        n_raw = conn.execute("SELECT COUNT(*) FROM raw_climatempo_previsao").fetchone()[0]
+        n_prev = conn.execute("SELECT COUNT(*) FROM gold_climatempo_previsoes").fetchone()[0]
+        print(f"🏗️  banco sintético: {n_raw} linhas raw, {n_prev} previsões gold "
+              f"({time.perf_counter() - t0:.1f}s)")
+
+        desde = conn.execute("SELECT DATE(MAX(dt_ingest), '-2 day') FROM raw_climatempo_previsao").fetchone()[0]
+        params = {"desde": desde, "cidade": "CIDADE7-SP"}
+
+        sem = {nome: medir(conn, sql, params) for nome, sql in CONSULTAS.items()}
+
+        t0 = time.perf_counter()
+        for ddl in INDICES:
+            conn.execute(ddl)
+        conn.execute("ANALYZE")
+        print(f"🔧 índices criados em {time.perf_counter() - t0:.1f}s")
+
+        com = {nome: medir(conn, sql, params) for nome, sql in CONSULTAS.items()}
+        conn.close()
+
+    print(f"{'consulta':<26} {'sem índice (s)':>15} {'com índice (s)':>15} {'ganho':>8}")
+    for nome in CONSULTAS:
+        print(f"{nome:<26} {sem[nome]:>15.4f} {com[nome]:>15.4f} {sem[nome] / com[nome]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
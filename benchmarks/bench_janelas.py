@@ -0,0 +1,207 @@
+"""Benchmark do cubo de janelas móveis (gold_climatempo_verificacao_janelas).
+
+Gera N cidades x D dias com dados_sinteticos.py, roda silver e gold e depois
+entra um dia por vez (--dias-incrementais), como a DAG diária, medindo:
+
+* o modelo de janelas em cada execução incremental (só os pares do dia novo)
+  contra o --full-refresh do mesmo modelo sobre o histórico inteiro;
+* a leitura das janelas de 30 e 90 dias de uma cidade (uma linha pelo
+  índice) contra somar os dias da janela na
+  gold_climatempo_verificacao_cidade_dia, e o ranking de todas as cidades
+  pela API (janelas.ranking_janela) contra o GROUP BY na cidade_dia.
+
+E confere o cubo inteiro contra um recálculo do zero em pandas (somas
+móveis de 7/30/90 dias sobre a cidade_dia) e uma janela fora das prontas
+(--janela-livre) contra a soma direta.
+
+    python benchmarks/bench_janelas.py --cidades 200 --dias 120 --dias-incrementais 3
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / "dashboard"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_em_processo import preparar  # noqa: E402
+from dados_sinteticos import escrever_raw, registros  # noqa: E402
+from pipeline_em_processo import dbt_runner, rodar_dbt  # noqa: E402
+
+from janelas import JANELAS, SOMAS, TABELA, metricas_janela, ranking_janela  # noqa: E402
+from metricas import metricas_erro  # noqa: E402
+
+CIDADE_DIA = "gold_climatempo_verificacao_cidade_dia"
+
+os.environ.setdefault("DBT_QUIET", "true")
+
+
+def tempo_modelo(resultado, nome: str = TABELA) -> float:
+    return next(r.execution_time for r in resultado.result.results if r.node.name == nome)
+
+
+def recalcular(conn):
+    """Janelas do zero: série densa por cidade/lead e somas móveis em pandas."""
+    import pandas as pd
+
+    dia = pd.read_sql_query(f'SELECT cidade_id, lead_time, dia_real, {", ".join(SOMAS)} FROM "{CIDADE_DIA}"', conn)
+    dia["dia_real"] = pd.to_datetime(dia["dia_real"])
+    fim = dia["dia_real"].max()
+    partes = []
+    for (cidade, lead), serie in dia.groupby(["cidade_id", "lead_time"]):
+        dias = pd.date_range(serie["dia_real"].min(), fim, freq="D")
+        serie = serie.set_index("dia_real")[list(SOMAS)].reindex(dias, fill_value=0)
+        out = pd.DataFrame({"cidade_id": cidade, "lead_time": lead, "dia_real": dias.strftime("%Y-%m-%d")})
+        for w in JANELAS:
+            movel = serie.rolling(w, min_periods=1).sum()
+            for s in SOMAS:
+                out[f"{s}_{w}d"] = movel[s].to_numpy()
+        partes.append(out)
+    return pd.concat(partes, ignore_index=True)
+
+
+def conferir(conn) -> float:
+    """Maior diferença absoluta entre o cubo e o recálculo (0 = idênticos)."""
+    import pandas as pd
+
+    esperado = recalcular(conn)
+    cubo = pd.read_sql_query(f'SELECT * FROM "{TABELA}"', conn)
+    if len(cubo) != len(esperado):
+        print(f"❌ linhas: cubo {len(cubo)} x recálculo {len(esperado)}")
+        return float("inf")
+    chaves = ["cidade_id", "lead_time", "dia_real"]
+    juntos = esperado.merge(cubo, on=chaves, suffixes=("", "_cubo"))
+    colunas = [c for c in esperado.columns if c not in chaves]
+    return max(float((juntos[c] - juntos[f"{c}_cubo"]).abs().max()) for c in colunas)
+
+
+def linhas_cubo(conn) -> list:
+    # somas de ponto flutuante em ordem diferente: compara arredondado
+    return [tuple(round(v, 6) if isinstance(v, float) else v for v in linha)
+            for linha in conn.execute(f'SELECT * FROM "{TABELA}" ORDER BY 1, 2, 3')]
+
+
+def soma_direta(conn, cidade, lead, dia, janela):
+    return conn.execute(
+        f'SELECT {", ".join(f"SUM({s})" for s in SOMAS)} FROM "{CIDADE_DIA}" '
+        "WHERE cidade_id = ? AND lead_time = ? AND dia_real > DATE(?, ?) AND dia_real <= ?",
+        (cidade, lead, dia, f"-{janela} day", dia),
+    ).fetchone()
+
+
+def linha_cubo(conn, cidade, lead, dia, janela):
+    return conn.execute(
+        f'SELECT {", ".join(f"{s}_{janela}d" for s in SOMAS)} FROM "{TABELA}" '
+        "WHERE lead_time = ? AND cidade_id = ? AND dia_real = ?",
+        (lead, cidade, dia),
+    ).fetchone()
+
+
+def ranking_direto(conn, lead, dia, janela):
+    import pandas as pd
+
+    somas = pd.read_sql_query(
+        f'SELECT cidade_id, {", ".join(f"SUM({s}) AS {s}" for s in SOMAS)} FROM "{CIDADE_DIA}" '
+        "WHERE lead_time = ? AND dia_real > DATE(?, ?) AND dia_real <= ? GROUP BY cidade_id",
+        conn, params=(lead, dia, f"-{janela} day", dia),
+    )
+    return metricas_erro(somas.set_index("cidade_id"))
+
+
+def melhor_de(vezes: int, funcao):
+    melhor = float("inf")
+    for _ in range(vezes):
+        t0 = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=200)
+    parser.add_argument("--dias", type=int, default=120)
+    parser.add_argument("--dias-incrementais", type=int, default=3)
+    parser.add_argument("--janela-livre", type=int, default=14)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    por_dia = args.cidades * 15
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = Path(tmp) / "janelas"
+        db_path, projeto = preparar(pasta)
+        itens = registros(args.cidades, args.dias + args.dias_incrementais, seed=args.seed)
+
+        t0 = time.perf_counter()
+        escrever_raw(db_path, islice(itens, por_dia * args.dias))
+        runner = dbt_runner(pasta, projeto)
+        rodar_dbt(runner, "climatempo.silver", pasta, projeto)
+        resultado = rodar_dbt(runner, "climatempo.gold", pasta, projeto)
+        print(f"✅ carga inicial: {args.cidades} cidades x {args.dias} dias ({time.perf_counter() - t0:.1f}s, "
+              f"janelas {tempo_modelo(resultado):.2f}s)")
+
+        incrementais = []
+        for i in range(args.dias_incrementais):
+            escrever_raw(db_path, islice(itens, por_dia))
+            rodar_dbt(runner, "climatempo.silver", pasta, projeto)
+            resultado = rodar_dbt(runner, "climatempo.gold", pasta, projeto)
+            incrementais.append(tempo_modelo(resultado))
+            print(f"   dia incremental {i + 1}: janelas {incrementais[-1]:.2f}s")
+
+        argumentos = ["run", "--full-refresh", "--select", TABELA,
+                      "--project-dir", str(projeto), "--profiles-dir", str(pasta)]
+        with sqlite3.connect(db_path) as conn:
+            antes = linhas_cubo(conn)
+        resultado = runner.invoke(argumentos)
+        if not resultado.success:
+            raise RuntimeError(f"dbt {' '.join(argumentos)} falhou: {resultado.exception}")
+        completo = tempo_modelo(resultado)
+
+        with sqlite3.connect(db_path) as conn:
+            depois = linhas_cubo(conn)
+            n_linhas = len(depois)
+            diferenca = conferir(conn)
+
+            cidade, lead, dia = conn.execute(
+                f'SELECT cidade_id, lead_time, MAX(dia_real) FROM "{TABELA}" WHERE lead_time = 1'
+            ).fetchone()
+            leituras = []
+            for janela in (30, 90):
+                leituras.append((f"1 cidade, {janela}d: linha do cubo",
+                                 melhor_de(20, lambda: linha_cubo(conn, cidade, lead, dia, janela))[0]))
+                leituras.append((f"1 cidade, {janela}d: soma na cidade_dia",
+                                 melhor_de(20, lambda: soma_direta(conn, cidade, lead, dia, janela))[0]))
+            for janela in (30, 90):
+                leituras.append((f"ranking {janela}d: ranking_janela",
+                                 melhor_de(5, lambda: ranking_janela(conn, lead, janela, dia))[0]))
+                leituras.append((f"ranking {janela}d: GROUP BY na cidade_dia",
+                                 melhor_de(5, lambda: ranking_direto(conn, lead, dia, janela))[0]))
+            leituras.append(("1 cidade, 30d: metricas_janela (com métricas)",
+                             melhor_de(20, lambda: metricas_janela(conn, cidade, lead, 30, dia))[0]))
+
+            livre = metricas_janela(conn, cidade, lead, args.janela_livre, dia)
+            direta = dict(zip(SOMAS, soma_direta(conn, cidade, lead, dia, args.janela_livre)))
+            livre_ok = abs(livre["n"] - direta["n"]) < 1e-9 and abs(
+                livre["mae_temp_max"] - direta["soma_abs_erro_temp_max"] / direta["n"]) < 1e-9
+
+    print()
+    print(f"{'etapa':<46} {'segundos':>9}")
+    print(f"{'janelas: dia incremental (média)':<46} {sum(incrementais) / len(incrementais):>9.3f}")
+    print(f"{'janelas: --full-refresh':<46} {completo:>9.3f}")
+    for etapa, segundos in leituras:
+        print(f"{etapa:<46} {segundos:>9.5f}")
+    print()
+    print(f"{'✅' if antes == depois else '❌'} incremental dia a dia = --full-refresh ({n_linhas} linhas)")
+    print(f"{'✅' if diferenca < 1e-6 else '❌'} cubo x recálculo em pandas: maior diferença {diferenca:.2e}")
+    print(f"{'✅' if livre_ok else '❌'} janela livre de {args.janela_livre} dias = soma direta")
+
+
+if __name__ == "__main__":
+    main()
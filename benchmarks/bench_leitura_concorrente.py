@@ -0,0 +1,169 @@
+"""Teste de carga: N sessões do dashboard lendo enquanto a gold é reconstruída.
+
+Monta o banco sintético do bench_indices.py e, num processo separado, refaz
+gold_climatempo_verificacao (join D-1 -> D) várias vezes, como um
+`dbt run --full-refresh`. Enquanto isso, N threads fazem as consultas do
+dashboard e medem latência e erros em três cenários:
+
+* antigo: journal DELETE, sqlite3.connect por consulta, DROP + CREATE TABLE AS
+* pool + WAL, DROP + CREATE: leitores não travam, mas pegam "no such table"
+* pool + WAL, staging + swap (macros/materializations/incremental.sql)
+
+    python benchmarks/bench_leitura_concorrente.py --sessoes 16 --publicacoes 5
+"""
+import argparse
+import multiprocessing
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(RAIZ / "dashboard"))
+
+from bench_indices import montar_banco  # noqa: E402
+from pool_leitura import PoolLeitura  # noqa: E402
+
+TABELA = "gold_climatempo_verificacao"
+
+SELECT_VERIFICACAO = """
+    SELECT p.cidade_id, p.lead_time, p.data_coleta as dia_coleta_prev, r.data_coleta as dia_real,
+           p.temp_max as prev_temp_max, r.temp_max as real_temp_max,
+           p.temp_max - r.temp_max as erro_temp_max
+    FROM gold_climatempo_previsoes p
+    JOIN gold_climatempo_dadosdia r
+      ON r.cidade_id = p.cidade_id AND r.data_coleta = p.data_previsao
+"""
+
+INDICE = f"CREATE INDEX IF NOT EXISTS ix_{TABELA}__lead_cidade_dia ON {TABELA} (lead_time, cidade_id, dia_real)"
+
+# o que o dashboard faz numa interação: contagem, recorte de uma cidade e agregado
+CONSULTAS = [
+    (f"SELECT COUNT(*) FROM {TABELA} WHERE lead_time = ?", (1,)),
+    (f"SELECT * FROM {TABELA} WHERE lead_time = ? AND cidade_id = ? ORDER BY dia_real", (1, "CIDADE7-SP")),
+    (f"SELECT cidade_id, AVG(ABS(erro_temp_max)) FROM {TABELA} WHERE lead_time = ? GROUP BY cidade_id", (1,)),
+]
+
+CENARIOS = {
+    "antigo (DELETE, conexão nova, drop+create)": ("delete", "nova", "drop_create"),
+    "pool + WAL, drop+create": ("wal", "pool", "drop_create"),
+    "pool + WAL, staging + swap": ("wal", "pool", "swap"),
+}
+
+
+def publicar(db_path: str, modo: str, vezes: int):
+    """Processo writer: refaz a tabela `vezes` vezes, como o dbt faria."""
+    conn = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+    for _ in range(vezes):
+        if modo == "drop_create":
+            # dbt-sqlite padrão: cada comando no seu próprio commit
+            conn.execute(f"DROP TABLE IF EXISTS {TABELA}")
+            conn.execute(f"CREATE TABLE {TABELA} AS {SELECT_VERIFICACAO}")
+            conn.execute(INDICE)
+        else:
+            conn.execute(f"DROP TABLE IF EXISTS {TABELA}__dbt_novo")
+            conn.execute(f"CREATE TABLE {TABELA}__dbt_novo AS {SELECT_VERIFICACAO}")
+            conn.execute("BEGIN")
+            conn.execute(f"DROP TABLE IF EXISTS {TABELA}")
+            conn.execute(f"ALTER TABLE {TABELA}__dbt_novo RENAME TO {TABELA}")
+            conn.execute(INDICE)
+            conn.execute("COMMIT")
+    conn.close()
+
+
+def sessao(abrir, parar: threading.Event, pausa: float, latencias: list, erros: list):
+    """Uma sessão do dashboard: repete as consultas até o writer terminar."""
+    while not parar.is_set():
+        for sql, params in CONSULTAS:
+            t0 = time.perf_counter()
+            try:
+                with abrir() as conn:
+                    conn.execute(sql, params).fetchall()
+                latencias.append(time.perf_counter() - t0)
+            except (sqlite3.Error, TimeoutError) as e:
+                erros.append(str(e).split(":")[0])
+        # tempo do usuário entre uma interação e outra
+        parar.wait(pausa)
+
+
+@contextmanager
+def conexao_nova(db_path):
+    """O get_connection() antigo do dashboard: um connect por consulta."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def rodar_cenario(db_path: Path, journal: str, conexao: str, modo: str, sessoes: int, publicacoes: int,
+                  pausa: float):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"PRAGMA journal_mode={journal}")
+        conn.execute(f"DROP TABLE IF EXISTS {TABELA}")
+        conn.execute(f"CREATE TABLE {TABELA} AS {SELECT_VERIFICACAO}")
+        conn.execute(INDICE)
+
+    pool = PoolLeitura(db_path, tamanho=min(sessoes, 8)) if conexao == "pool" else None
+    abrir = pool.conexao if pool else partial(conexao_nova, str(db_path))
+
+    parar = threading.Event()
+    latencias, erros = [], []
+    threads = [threading.Thread(target=sessao, args=(abrir, parar, pausa, latencias, erros)) for _ in range(sessoes)]
+    # spawn: fork com as threads de leitura rodando pode herdar locks do sqlite
+    writer = multiprocessing.get_context("spawn").Process(target=publicar, args=(str(db_path), modo, publicacoes))
+
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    writer.start()
+    writer.join()
+    parar.set()
+    if writer.exitcode != 0:
+        erros.append("writer não terminou a publicação")
+    for t in threads:
+        t.join()
+    segundos = time.perf_counter() - t0
+
+    if pool:
+        pool.fechar()
+    return segundos, latencias, erros
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessoes", type=int, default=16, help="sessões simultâneas do dashboard")
+    parser.add_argument("--publicacoes", type=int, default=5, help="reconstruções da gold durante o teste")
+    parser.add_argument("--pausa", type=float, default=0.2, help="segundos entre interações de uma sessão")
+    parser.add_argument("--cidades", type=int, default=300)
+    parser.add_argument("--dias", type=int, default=180)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        montar_banco(db_path, args.cidades, args.dias, 1).close()
+        print(f"🏗️  {args.cidades} cidades x {args.dias} dias | {args.sessoes} sessões | "
+              f"{args.publicacoes} publicações por cenário")
+
+        print(f"{'cenário':<44} {'seg':>6} {'consultas':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} "
+              f"{'máx (ms)':>9} {'erros':>6}")
+        for nome, (journal, conexao, modo) in CENARIOS.items():
+            segundos, latencias, erros = rodar_cenario(
+                db_path, journal, conexao, modo, args.sessoes, args.publicacoes, args.pausa
+            )
+            ms = sorted(x * 1000 for x in latencias) or [0.0]
+            p95 = ms[int(len(ms) * 0.95) - 1] if len(ms) > 1 else ms[0]
+            print(f"{nome:<44} {segundos:>6.1f} {len(latencias):>10} {statistics.median(ms):>9.1f} "
+                  f"{p95:>9.1f} {ms[-1]:>9.1f} {len(erros):>6}")
+            for erro in sorted(set(erros)):
+                print(f"    ⚠️  {erros.count(erro)}x {erro}")
+
+
+if __name__ == "__main__":
+    main()
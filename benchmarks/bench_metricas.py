@@ -0,0 +1,189 @@
+"""Benchmark das métricas por cidade: agg com lambda por grupo vs dashboard/metricas.py.
+
+Gera pares previsão x real sintéticos (N cidades x D dias, mesmo formato da
+gold_climatempo_verificacao) e mede:
+
+* legado: groupby().agg com uma lambda por métrica (como o dashboard fazia)
+* vetorizado: metricas_por_grupo (um groupby().sum() das parcelas)
+* somas: metricas() direto das somas cidade/dia, como o dashboard lê da gold
+
+e confere que as três dão o mesmo resultado, inclusive MAPE, bias, acurácia
+da descrição e volume % (denominador zero -> NaN). O dashboard usa o caminho
+das somas (a gold já entrega as somas cidade/dia); o dos pares é para jobs em
+lote que partem da base de pares.
+
+    python benchmarks/bench_metricas.py --cidades 10000 --dias 365
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "dashboard"))
+
+from metricas import TEMP_CAP, W_CHUVA, W_CLIMA, W_TEMP, metricas, metricas_por_grupo, somas_por_grupo  # noqa: E402
+
+# clima_desc_id -> categoria_id, como na silver_clima_desc (NaN = sem descrição)
+DESC_IDS = np.array([1, 2, 3, 4, np.nan])
+CATEGORIAS = np.array([4, 4, 1, 6, np.nan])
+
+# inclui os casos de denominador zero (MAPE com real = 0, volume % sem chuva real)
+COLUNAS_PARIDADE = ["mae_temp_max", "rmse_temp_max", "bias_temp_max", "mape_temp_max",
+                    "mae_temp_min", "rmse_temp_min", "bias_temp_min", "mape_temp_min",
+                    "mae_chuva", "rmse_chuva", "bias_chuva",
+                    "acc_desc", "acc_chuva", "acc_pct_chuva",
+                    "mae_temp", "temp_score", "chuva_score", "clima_score", "score_final"]
+
+
+def gerar_pares(n_cidades: int, n_dias: int, seed: int = 42) -> pd.DataFrame:
+    """Pares com temperaturas inteiras, zeros de temperatura e muito dia sem chuva."""
+    rng = np.random.default_rng(seed)
+    n = n_cidades * n_dias
+    real_tmin = rng.integers(-2, 25, n)
+    real_tmax = real_tmin + rng.integers(0, 14, n)
+    real_chuva = np.where(rng.random(n) < 0.6, 0.0, rng.gamma(1.5, 6.0, n).round(1))
+    prev_chuva = np.where(rng.random(n) < 0.6, 0.0, rng.gamma(1.5, 6.0, n).round(1))
+    pares = pd.DataFrame({
+        "cidade_id": np.repeat([f"CIDADE{i}-SP" for i in range(n_cidades)], n_dias),
+        "dia_real": np.tile(pd.date_range("2025-01-01", periods=n_dias).strftime("%Y-%m-%d"), n_cidades),
+        "prev_temp_min": real_tmin + rng.integers(-3, 4, n),
+        "real_temp_min": real_tmin,
+        "prev_temp_max": real_tmax + rng.integers(-3, 4, n),
+        "real_temp_max": real_tmax,
+        "prev_chuva_mm": prev_chuva,
+        "real_chuva_mm": real_chuva,
+    })
+    for lado in ("prev", "real"):
+        sorteio = rng.integers(0, len(DESC_IDS), n)
+        pares[f"{lado}_clima_desc_id"] = DESC_IDS[sorteio]
+        pares[f"{lado}_categoria_id"] = CATEGORIAS[sorteio]
+    return pares
+
+
+# funções de métrica do dashboard antigo, aplicadas por grupo
+def mae(err: pd.Series) -> float:
+    return float(err.abs().mean())
+
+def rmse(err: pd.Series) -> float:
+    return float((err.pow(2).mean()) ** 0.5)
+
+def bias(err: pd.Series) -> float:
+    return float(err.mean())
+
+def mape(prev: pd.Series, real: pd.Series) -> float:
+    denom = real.abs().replace(0, pd.NA)
+    return float(((prev - real).abs() / denom).dropna().mean() * 100)
+
+def acc_pct_chuva(prev: pd.Series, real: pd.Series) -> float:
+    real = real.fillna(0).astype(float)
+    prev = prev.fillna(0).astype(float)
+    mask = real > 0
+    return float(100 - ((prev[mask] - real[mask]).abs() / real[mask]).mean() * 100)
+
+
+def legado(df_cmp: pd.DataFrame) -> pd.DataFrame:
+    """Cálculo antigo do dashboard: colunas de erro + agg com lambda por grupo."""
+    df_cmp = df_cmp.copy()
+    df_cmp["erro_temp_max"] = df_cmp["prev_temp_max"] - df_cmp["real_temp_max"]
+    df_cmp["erro_temp_min"] = df_cmp["prev_temp_min"] - df_cmp["real_temp_min"]
+    df_cmp["erro_chuva_mm"] = df_cmp["prev_chuva_mm"] - df_cmp["real_chuva_mm"]
+    df_cmp["real_choveu"] = df_cmp["real_chuva_mm"].fillna(0) > 0
+    df_cmp["prev_choveu"] = df_cmp["prev_chuva_mm"].fillna(0) > 0
+
+    df_city = (
+        df_cmp.groupby("cidade_id")
+        .agg(
+            mae_temp_max=("erro_temp_max", mae),
+            rmse_temp_max=("erro_temp_max", rmse),
+            bias_temp_max=("erro_temp_max", bias),
+            mape_temp_max=("real_temp_max", lambda s: mape(df_cmp.loc[s.index, "prev_temp_max"], s)),
+            mae_temp_min=("erro_temp_min", mae),
+            rmse_temp_min=("erro_temp_min", rmse),
+            bias_temp_min=("erro_temp_min", bias),
+            mape_temp_min=("real_temp_min", lambda s: mape(df_cmp.loc[s.index, "prev_temp_min"], s)),
+            mae_chuva=("erro_chuva_mm", mae),
+            rmse_chuva=("erro_chuva_mm", rmse),
+            bias_chuva=("erro_chuva_mm", bias),
+            acc_desc=("real_clima_desc_id", lambda s: float(
+                (s.fillna(0) == df_cmp.loc[s.index, "prev_clima_desc_id"].fillna(0)).mean() * 100)),
+            acc_chuva=("real_choveu", lambda s: float((s == df_cmp.loc[s.index, "prev_choveu"]).mean() * 100)),
+            acc_pct_chuva=("real_chuva_mm", lambda s: acc_pct_chuva(df_cmp.loc[s.index, "prev_chuva_mm"], s)),
+        )
+    )
+
+    df_cmp["abs_err_temp_media"] = (df_cmp["erro_temp_max"].abs() + df_cmp["erro_temp_min"].abs()) / 2
+    real = df_cmp["real_chuva_mm"].fillna(0).astype(float)
+    prev = df_cmp["prev_chuva_mm"].fillna(0).astype(float)
+    den = (pd.concat([real, prev], axis=1).max(axis=1)).replace(0, 1e-9)
+    df_cmp["chuva_prox"] = (1 - ((prev - real).abs() / den)).clip(lower=0, upper=1)
+    df_cmp["clima_match"] = (
+        df_cmp["real_clima_desc_id"].fillna(0) == df_cmp["prev_clima_desc_id"].fillna(0)
+    ).astype(int)
+
+    df_rank = (
+        df_cmp.groupby("cidade_id")
+        .agg(
+            mae_temp=("abs_err_temp_media", "mean"),
+            chuva_score=("chuva_prox", "mean"),
+            clima_score=("clima_match", "mean"),
+        )
+    )
+    df_rank["temp_score"] = (1 - (df_rank["mae_temp"] / TEMP_CAP)).clip(0, 1) * 100
+    df_rank["chuva_score"] = df_rank["chuva_score"] * 100
+    df_rank["clima_score"] = df_rank["clima_score"] * 100
+    df_rank["score_final"] = (
+        W_TEMP * df_rank["temp_score"] +
+        W_CHUVA * df_rank["chuva_score"] +
+        W_CLIMA * df_rank["clima_score"]
+    )
+    return df_city.join(df_rank)
+
+
+def medir(func, *args):
+    t0 = time.perf_counter()
+    resultado = func(*args)
+    return resultado, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=10_000)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--sem-legado", action="store_true", help="pula o cálculo com lambda (lento)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    pares = gerar_pares(args.cidades, args.dias)
+    print(f"🏗️  {len(pares)} pares ({args.cidades} cidades x {args.dias} dias) em {time.perf_counter() - t0:.1f}s")
+
+    # o que a gold_climatempo_verificacao_cidade_dia entrega: somas por cidade/dia
+    somas_dia = somas_por_grupo(pares, ["cidade_id", "dia_real"])
+
+    tempos = {}
+    vetorizado, tempos["vetorizado (pares)"] = medir(metricas_por_grupo, pares, "cidade_id")
+    por_somas, tempos["somas cidade/dia"] = medir(
+        lambda s: metricas(s.groupby(level="cidade_id").sum()), somas_dia
+    )
+    if not args.sem_legado:
+        antigo, tempos["legado (lambda)"] = medir(legado, pares)
+
+    print(f"{'modo':<22} {'segundos':>9} {'pares/s':>13}")
+    for nome, segundos in tempos.items():
+        print(f"{nome:<22} {segundos:>9.3f} {len(pares) / segundos:>13.0f}")
+
+    # paridade: mesmo resultado em todos os modos
+    referencia = antigo if not args.sem_legado else vetorizado
+    for nome, df in [("vetorizado", vetorizado), ("somas", por_somas)]:
+        pd.testing.assert_frame_equal(
+            df[COLUNAS_PARIDADE], referencia[COLUNAS_PARIDADE],
+            check_exact=False, rtol=1e-9, check_names=False, check_dtype=False,
+        )
+    print("✅ mesmas métricas em todos os modos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Benchmark da coleta em shards: 1 processo x N processos sobre o mesmo catálogo.
+
+Sobe o mock (mock_climatempo.py), roda `scrapy crawl previsao -a shard=i
+-a shards=N` em N processos, como as tasks mapeadas da DAG, e junta os bancos
+com bronze/transform/juntar_shards.py. Mede o tempo, o ritmo visto pelo
+servidor e o pico de requisições simultâneas: com o perfil de politeness de
+settings.py dividido entre os shards, o ritmo somado fica no do crawl único.
+Confere que a raw final tem todas as cidades uma vez só.
+
+    python benchmarks/bench_shards.py --cidades 200 --shards 1 2 4
+"""
+import argparse
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+COLETA_DIR = RAIZ / "bronze" / "coleta"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(RAIZ / "bronze" / "transform"))
+
+from juntar_shards import juntar_shards  # noqa: E402
+from mock_climatempo import escrever_catalogo, servidor_mock  # noqa: E402
+
+
+def coletar(n_shards: int, catalogo: Path, base_url: str, pasta: Path):
+    comandos = []
+    for shard in range(n_shards):
+        comandos.append([
+            sys.executable, "-m", "scrapy", "crawl", "previsao",
+            "-a", f"catalogo={catalogo}", "-a", f"shard={shard}", "-a", f"shards={n_shards}",
+            "-s", f"CLIMATEMPO_BASE_URL={base_url}",
+            "-s", f"RAW_DB_PATH={pasta / f'shard_{shard}.db'}",
+            "-s", f"ARQUIVO_PARQUET_DIR={pasta / 'arquivo'}",
+            "-s", "HTTPCACHE_ENABLED=False",
+            "-s", "CONTEUDO_HASH_ENABLED=False",
+            "-s", "ROBOTSTXT_OBEY=False",
+            "-s", "LOG_LEVEL=WARNING",
+        ])
+
+    processos = [subprocess.Popen(c, cwd=COLETA_DIR, stderr=subprocess.DEVNULL) for c in comandos]
+    falhas = sum(p.wait() != 0 for p in processos)
+    if falhas:
+        raise RuntimeError(f"{falhas} shards falharam")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=200)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latencia", type=float, default=0.1, help="latência simulada do mock (s)")
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as tmp, servidor_mock(args.latencia) as (base_url, contador):
+        catalogo = escrever_catalogo(Path(tmp) / "cidades.csv", args.cidades)
+        for n_shards in args.shards:
+            pasta = Path(tmp) / f"shards_{n_shards}"
+            pasta.mkdir()
+            db_path = Path(tmp) / f"raw_{n_shards}.db"
+            requisicoes = contador["requisicoes"]
+            contador["max_em_voo"] = 0
+
+            t0 = time.perf_counter()
+            coletar(n_shards, catalogo, base_url, pasta)
+            t_coleta = time.perf_counter() - t0
+            juntar_shards(pasta, db_path, apagar=True)
+            t_total = time.perf_counter() - t0
+
+            with sqlite3.connect(db_path) as conn:
+                linhas, cidades = conn.execute(
+                    "SELECT COUNT(*), COUNT(DISTINCT cidade) FROM raw_climatempo_previsao"
+                ).fetchone()
+            paginas = contador["requisicoes"] - requisicoes
+            resultados.append((n_shards, paginas, linhas, cidades, t_coleta, t_total, contador["max_em_voo"]))
+
+    print(f"\n{'shards':>6} {'páginas':>8} {'linhas':>7} {'cidades':>8} {'coleta (s)':>11} "
+          f"{'+ join (s)':>11} {'páginas/s':>10} {'pico em voo':>12}")
+    for n_shards, paginas, linhas, cidades, t_coleta, t_total, pico in resultados:
+        print(f"{n_shards:>6} {paginas:>8} {linhas:>7} {cidades:>8} {t_coleta:>11.2f} {t_total:>11.2f} "
+              f"{paginas / t_coleta:>10.2f} {pico:>12}")
+        if cidades != args.cidades:
+            print(f"    ⚠️  esperado {args.cidades} cidades, a raw tem {cidades}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Benchmark do transform: main() (pandas) vs carga em streaming.
+
+Gera um JSONL sintético no formato do spider e roda cada modo num processo
+filho separado, medindo linhas/s e pico de memória (RSS) de cada um.
+
+    python benchmarks/bench_transform.py --linhas 200000 --lote 5000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+TRANSFORM_DIR = RAIZ / "bronze" / "transform"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from dados_sinteticos import escrever_jsonl, registros  # noqa: E402
+
+# cidades por coleta no JSONL; os dias saem do número de linhas pedido
+CIDADES = 5000
+
+
+def escrever_jsonl_sintetico(path: Path, n_linhas: int, seed: int = 42) -> Path:
+    """JSONL com o mesmo formato do spider (dados_sinteticos.py): 15 linhas por cidade/coleta."""
+    dias = -(-n_linhas // (CIDADES * 15))
+    escrever_jsonl(path, islice(registros(CIDADES, dias, seed=seed), n_linhas))
+    return path
+
+
+def rodar_filho(codigo: str):
+    """Roda `codigo` num python novo; devolve (segundos, pico RSS em MB)."""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", codigo],
+        cwd=TRANSFORM_DIR,
+        stdout=subprocess.DEVNULL,
+    )
+    _, status, uso = os.wait4(proc.pid, 0)
+    segundos = time.perf_counter() - t0
+    if status != 0:
+        raise RuntimeError(f"processo filho terminou com status {status}")
+    # ru_maxrss vem em KB no Linux
+    return segundos, uso.ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=200_000)
+    parser.add_argument("--lote", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        jsonl = escrever_jsonl_sintetico(tmp / "data.jsonl", args.linhas)
+        print(f"📄 {args.linhas} linhas | {jsonl.stat().st_size / 1e6:.1f} MB")
+
+        modos = {
+            "main() pandas": (
+                f"import transform; transform.main({str(jsonl)!r}, db_path={str(tmp / 'pandas.db')!r}, "
+                f"csv_path={str(tmp / 'pandas.csv')!r})"
+            ),
+            "streaming": (
+                f"import transform; transform.main_streaming({str(jsonl)!r}, db_path={str(tmp / 'stream.db')!r}, "
+                f"tamanho_lote={args.lote}, salvar_csv=False)"
+            ),
+            "streaming + csv": (
+                f"import transform; transform.main_streaming({str(jsonl)!r}, db_path={str(tmp / 'stream_csv.db')!r}, "
+                f"tamanho_lote={args.lote}, csv_path={str(tmp / 'stream.csv')!r})"
+            ),
+        }
+
+        print(f"{'modo':<18} {'segundos':>9} {'linhas/s':>11} {'pico RSS (MB)':>14}")
+        for nome, codigo in modos.items():
+            segundos, rss = rodar_filho(codigo)
+            print(f"{nome:<18} {segundos:>9.2f} {args.linhas / segundos:>11.0f} {rss:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
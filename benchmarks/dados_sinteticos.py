@@ -0,0 +1,191 @@
+"""Gerador de dados sintéticos no formato de saída do spider.
+
+Cidades x dias x lead_times com cara de produção, para medir o transform, o
+dbt e o dashboard em volume (o banco do repositório tem poucas dezenas de
+linhas):
+
+* o "real" de cada cidade/dia (temperatura com sazonalidade, chance de chuva
+  por cidade, volume com cauda longa) é sorteado uma vez, e a previsão de
+  um dia em D+n é esse real com um erro que cresce com o lead_time. Os pares
+  D-1 -> D da gold têm erro, acerto de chuva e ranking que fazem sentido;
+* a descrição sai das frases do Climatempo, coerente com a chuva do bloco
+  (sem chuva -> Sol/Nublado, muita chuva -> Pancadas/Temporal);
+* o item é o que o ValidaPrevisaoPipeline entrega (tmin/tmax int, chuva
+  float, data_previsao ISO), então o JSONL é igual ao do `scrapy crawl -O`;
+* com --coletas-por-dia > 1 a mesma cidade é coletada de novo mais tarde, como
+  num retry, e a silver precisa deduplicar.
+
+Tudo é gerado em streaming, dia a dia, com a mesma semente dando os mesmos
+dados.
+
+    python benchmarks/dados_sinteticos.py --cidades 500 --dias 60 --jsonl /tmp/data.jsonl
+    python benchmarks/dados_sinteticos.py --cidades 500 --dias 60 --db /tmp/dataset_climatempo.db
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / "bronze" / "transform"))
+
+from raw_db import carregar_linhas, conectar, garantir_schema_raw, normalizar_registro, registrar_versao  # noqa: E402
+
+UFS = ["sp", "rj", "mg", "pr", "sc", "rs", "ba", "pe", "ce", "go", "df", "am", "pa", "es", "mt", "ms"]
+
+# frases reais do Climatempo, pela condição do tempo (categorias da silver_clima_desc)
+DESCRICOES = {
+    "sol": [
+        "Sol com algumas nuvens. Não chove.",
+        "Sol o dia todo com poucas nuvens. Noite de céu claro.",
+    ],
+    "nublado": [
+        "Sol com muitas nuvens durante o dia e períodos de céu nublado. Noite com muitas nuvens.",
+        "Sol com muitas nuvens durante o dia. Noite com muitas nuvens.",
+    ],
+    "chuva_fraca": [
+        "Sol com algumas nuvens e chuva passageira durante o dia. À noite o tempo fica firme.",
+        "Sol com algumas nuvens e chuva passageira. À noite, muitas nuvens mas com tempo firme.",
+        "Sol com algumas nuvens. Chove rápido durante o dia e à noite.",
+    ],
+    "pancadas": [
+        "Sol com muitas nuvens. Pancadas de chuva à tarde e à noite.",
+        "Sol e aumento de nuvens de manhã. Pancadas de chuva à tarde e à noite.",
+        "Sol com muitas nuvens e pancadas de chuva à tarde. Muitas nuvens à noite, sem chuva.",
+    ],
+    "chuva": [
+        "Sol, com chuva de manhã e diminuição de nuvens à tarde. Noite com pouca nebulosidade.",
+        "Sol com muitas nuvens a nublado com chuva de manhã. Tarde com temporal e noite chuvosa.",
+    ],
+    "temporal": [
+        "Sol com muitas nuvens a nublado com chuva de manhã. Tarde e noite com temporal.",
+    ],
+}
+
+
+def nomes_cidades(n_cidades: int) -> list:
+    return [f"cidade{i}-{UFS[i % len(UFS)]}" for i in range(n_cidades)]
+
+
+def descricao(chuva: float, rnd: random.Random) -> str:
+    if chuva == 0:
+        grupo = "sol" if rnd.random() < 0.6 else "nublado"
+    elif chuva <= 2:
+        grupo = "chuva_fraca"
+    elif chuva <= 10:
+        grupo = "pancadas" if rnd.random() < 0.7 else "chuva"
+    else:
+        grupo = "temporal" if rnd.random() < 0.6 else "chuva"
+    return rnd.choice(DESCRICOES[grupo])
+
+
+def registros(n_cidades: int, n_dias: int, n_leads: int = 15, coletas_por_dia: int = 1,
+              inicio: date = date(2026, 1, 1), seed: int = 42):
+    """Itens do spider, dia a dia: cada coleta gera uma linha por cidade e lead_time (0 ... n_leads-1)."""
+    rng = np.random.default_rng(seed)
+    rnd = random.Random(seed)
+    cidades = nomes_cidades(n_cidades)
+
+    # "real" de cada cidade para todo dia que alguma coleta prevê
+    n_alvos = n_dias + n_leads
+    dia_do_ano = np.array([(inicio + timedelta(days=d)).timetuple().tm_yday for d in range(n_alvos)])
+    sazonal = 4 * np.cos(2 * np.pi * (dia_do_ano - 15) / 365)
+    real_tmin = rng.uniform(8, 22, (n_cidades, 1)) + sazonal + rng.normal(0, 1.5, (n_cidades, n_alvos))
+    real_amp = np.clip(rng.uniform(5, 12, (n_cidades, 1)) + rng.normal(0, 1.5, (n_cidades, n_alvos)), 1, None)
+    choveu = rng.random((n_cidades, n_alvos)) < rng.uniform(0.2, 0.6, (n_cidades, 1))
+    real_chuva = np.where(choveu, rng.gamma(1.2, 6.0, (n_cidades, n_alvos)), 0.0)
+
+    leads = np.arange(n_leads)
+    # o dado do dia (lead 0) é o observado; o erro da previsão cresce com o lead
+    desvio = np.where(leads == 0, 0.0, 0.4 + 0.25 * leads)
+    troca_chuva = np.where(leads == 0, 0.0, 0.08 + 0.02 * leads)
+
+    for d in range(n_dias):
+        dia = inicio + timedelta(days=d)
+        for coleta in range(coletas_por_dia):
+            # meio segundo por cidade a partir das 06:00, mais 6 h por coleta repetida
+            base = datetime(dia.year, dia.month, dia.day, 6, tzinfo=timezone.utc) + timedelta(hours=6 * coleta)
+            alvo = d + leads
+            forma = (n_cidades, n_leads)
+            tmin = np.rint(real_tmin[:, alvo] + rng.normal(0, 1, forma) * desvio).astype(int)
+            amp = np.rint(np.clip(real_amp[:, alvo] + rng.normal(0, 1, forma) * desvio, 0, None)).astype(int)
+            chuva = real_chuva[:, alvo] * np.exp(rng.normal(0, 1, forma) * desvio * 0.3)
+            trocou = rng.random(forma) < troca_chuva
+            chuva = np.where(trocou, np.where(chuva > 0, 0.0, rng.gamma(1.2, 4.0, forma)), chuva).round(1)
+
+            for i, cidade in enumerate(cidades):
+                dt_ingest = (base + timedelta(seconds=i * 0.5, microseconds=rnd.randrange(1_000_000))).isoformat()
+                for lead in range(n_leads):
+                    yield {
+                        "cidade": cidade,
+                        "atualouprevisao": "atual" if lead == 0 else "previsao",
+                        "lead_time": lead,
+                        "tmin": int(tmin[i, lead]),
+                        "tmax": int(tmin[i, lead] + amp[i, lead]),
+                        "descricao": descricao(chuva[i, lead], rnd),
+                        "chuva": float(chuva[i, lead]),
+                        "data_previsao": (dia + timedelta(days=lead)).isoformat(),
+                        "dt_ingest": dt_ingest,
+                    }
+
+
+def escrever_jsonl(path: Path, itens, modo: str = "w") -> int:
+    """Grava os itens como o feed do scrapy (`-O` com modo "w", `-o` com "a")."""
+    total = 0
+    with open(path, modo, encoding="utf-8") as f:
+        for item in itens:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            total += 1
+    return total
+
+
+def linhas_raw(itens):
+    """Itens -> tuplas na ordem de COLUNAS_RAW (para a raw ou o arquivo Parquet)."""
+    return (normalizar_registro(item) for item in itens)
+
+
+def escrever_raw(db_path: Path, itens, tamanho_lote: int = 5000) -> int:
+    """Upsert direto na raw_climatempo_previsao, como o RawSQLitePipeline."""
+    conn = conectar(db_path)
+    try:
+        with conn:
+            garantir_schema_raw(conn)
+            total = carregar_linhas(conn, linhas_raw(itens), tamanho_lote)
+            registrar_versao(conn)
+    finally:
+        conn.close()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=int, default=500)
+    parser.add_argument("--dias", type=int, default=60)
+    parser.add_argument("--leads", type=int, default=15, help="lead_times por coleta (0 ... leads-1)")
+    parser.add_argument("--coletas-por-dia", type=int, default=1)
+    parser.add_argument("--inicio", type=date.fromisoformat, default=date(2026, 1, 1))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jsonl", type=Path, help="arquivo JSONL de saída (formato do scrapy -O)")
+    parser.add_argument("--db", type=Path, help="banco SQLite: grava direto na raw_climatempo_previsao")
+    args = parser.parse_args()
+
+    if not args.jsonl and not args.db:
+        parser.error("informe --jsonl e/ou --db")
+
+    def itens():
+        return registros(args.cidades, args.dias, args.leads, args.coletas_por_dia, args.inicio, args.seed)
+
+    for destino, escrever in ((args.jsonl, escrever_jsonl), (args.db, escrever_raw)):
+        if destino:
+            t0 = time.perf_counter()
+            total = escrever(destino, itens())
+            print(f"✅ {total} linhas em {destino} ({time.perf_counter() - t0:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Servidor HTTP local que imita as páginas de 15 dias do Climatempo.
+
+Usado pelos benchmarks para medir a coleta sem bater no site de verdade.
+Qualquer caminho /previsao-do-tempo/15-dias/cidade/<id>/<slug> devolve o HTML
+de fixtures/previsao_15dias.html, com ETag e Last-Modified. Um pedido com
+If-None-Match / If-Modified-Since que ainda vale recebe 304 sem corpo.
+
+contador["rodada"] muda um comentário no fim da página (fora dos blocos de
+previsão): o ETag muda, mas a previsão continua a mesma, como no site real
+quando só anúncios e horários da página mudam.
+
+Com `falhas` > 0, essa fração das requisições recebe um 503 (com Retry-After),
+para exercitar retry/backoff. contador["conexoes"] conta as conexões TCP
+aceitas: com keep-alive fica bem abaixo do número de requisições.
+"""
+import csv
+import hashlib
+import sys
+import threading
+import time
+from email.utils import formatdate
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE_HTML = Path(__file__).resolve().parent / "fixtures" / "previsao_15dias.html"
+PREFIXO = "/previsao-do-tempo/15-dias/cidade"
+
+
+def _handler(fixture: bytes, latencia: float, contador: dict, falhas: float = 0.0):
+    inicio = time.time() - 3600
+    # a cada `intervalo_falha` requisições, uma falha (determinístico)
+    intervalo_falha = round(1 / falhas) if falhas else 0
+
+    def pagina(rodada: int):
+        corpo = fixture + f"<!-- rodada {rodada} -->".encode()
+        return corpo, f'"{hashlib.sha1(corpo).hexdigest()}"', formatdate(inicio + rodada, usegmt=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with contador["lock"]:
+                contador["conexoes"] += 1
+
+        def do_GET(self):
+            if not self.path.startswith(PREFIXO):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            with contador["lock"]:
+                contador["em_voo"] += 1
+                contador["max_em_voo"] = max(contador["max_em_voo"], contador["em_voo"])
+            try:
+                if latencia:
+                    time.sleep(latencia)
+            finally:
+                with contador["lock"]:
+                    contador["em_voo"] -= 1
+
+            with contador["lock"]:
+                contador["tentativas"] += 1
+                falhou = intervalo_falha and contador["tentativas"] % intervalo_falha == 0
+                if falhou:
+                    contador["falhas"] += 1
+            if falhou:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            corpo, etag, modificado_em = pagina(contador["rodada"])
+            # If-None-Match tem precedência sobre If-Modified-Since (RFC 7232)
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match is not None:
+                nao_modificada = if_none_match == etag
+            else:
+                nao_modificada = self.headers.get("If-Modified-Since") == modificado_em
+
+            with contador["lock"]:
+                contador["requisicoes"] += 1
+                if nao_modificada:
+                    contador["nao_modificadas"] += 1
+                else:
+                    contador["bytes"] += len(corpo)
+
+            self.send_response(304 if nao_modificada else 200)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", modificado_em)
+            if nao_modificada:
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class _Servidor(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # cliente que morreu no meio (bench_checkpoint) não é erro do mock
+        if not issubclass(sys.exc_info()[0], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+@contextmanager
+def servidor_mock(latencia: float = 0.0, falhas: float = 0.0):
+    """Sobe o mock numa porta livre e devolve (base_url, contador)."""
+    contador = {
+        "requisicoes": 0, "bytes": 0, "nao_modificadas": 0, "rodada": 0,
+        "tentativas": 0, "falhas": 0, "conexoes": 0,
+        # requisições simultâneas no servidor (agora e o pico), para conferir a politeness
+        "em_voo": 0, "max_em_voo": 0,
+        "lock": threading.Lock(),
+    }
+    server = _Servidor(("127.0.0.1", 0), _handler(FIXTURE_HTML.read_bytes(), latencia, contador, falhas))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}{PREFIXO}", contador
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def escrever_catalogo(caminho: Path, n_cidades: int) -> Path:
+    """Gera um catálogo sintético com n_cidades no mesmo formato de coleta/cidades.csv."""
+    ufs = ["SP", "PE", "RJ", "MG", "BA", "RS", "PR", "SC", "GO", "CE"]
+    with open(caminho, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["city_id", "slug", "uf"])
+        for i in range(n_cidades):
+            uf = ufs[i % len(ufs)]
+            writer.writerow([10000 + i, f"cidade{i}-{uf.lower()}", uf])
+    return caminho
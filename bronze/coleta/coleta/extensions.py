@@ -0,0 +1,100 @@
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "transform"))
+
+from instrumentacao import percentil, pico_memoria_mb, registrar_metricas  # noqa: E402
+from raw_db import DB_PATH  # noqa: E402
+
+
+def _cidade(url: str) -> str:
+    return url.rstrip("/").split("/")[-1]
+
+
+class MetricasColetaExtension:
+    """Grava as métricas do crawl em pipeline_run_metrics quando o spider fecha.
+
+    Da etapa toda: tempo, respostas/s, percentis da latência de download,
+    bytes, itens, descartes, erros de parse, páginas puladas pelo cache/hash e
+    pico de memória. Por cidade: a latência da página e os erros/descartes
+    (só as cidades com algum). Num shard a etapa vira run_scrapy[<shard>].
+    Desligado com METRICAS_ENABLED = False.
+    """
+
+    def __init__(self, db_path, stats):
+        self.db_path = db_path
+        self.stats = stats
+        self.inicio = None
+        self.latencias = {}
+        self.erros = Counter()
+        self.descartes = Counter()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("METRICAS_ENABLED"):
+            raise NotConfigured("METRICAS_ENABLED desligado")
+        db_path = settings.get("METRICAS_DB_PATH") or settings.get("RAW_DB_PATH") or DB_PATH
+        extensao = cls(db_path, crawler.stats)
+        crawler.signals.connect(extensao.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extensao.response_received, signal=signals.response_received)
+        crawler.signals.connect(extensao.spider_error, signal=signals.spider_error)
+        crawler.signals.connect(extensao.item_dropped, signal=signals.item_dropped)
+        crawler.signals.connect(extensao.spider_closed, signal=signals.spider_closed)
+        return extensao
+
+    def spider_opened(self, spider):
+        self.inicio = time.perf_counter()
+
+    def response_received(self, response, request, spider):
+        latencia = request.meta.get("download_latency")
+        if latencia is not None:
+            self.latencias[_cidade(request.url)] = latencia * 1000
+
+    def spider_error(self, failure, response, spider):
+        self.erros[_cidade(response.url)] += 1
+
+    def item_dropped(self, item, response, exception, spider):
+        self.descartes[item.get("cidade") or _cidade(response.url)] += 1
+
+    def spider_closed(self, spider, reason):
+        segundos = time.perf_counter() - self.inicio
+        stats = self.stats.get_stats()
+        respostas = stats.get("response_received_count", 0)
+        latencias = list(self.latencias.values())
+
+        shards = getattr(spider, "shards", 1)
+        etapa = f"run_scrapy[{spider.shard}]" if shards > 1 else "run_scrapy"
+        metricas = {
+            "segundos": segundos,
+            "respostas": respostas,
+            "respostas_por_s": respostas / segundos if segundos else None,
+            "bytes": stats.get("downloader/response_bytes"),
+            "latencia_p50_ms": percentil(latencias, 50),
+            "latencia_p95_ms": percentil(latencias, 95),
+            "latencia_p99_ms": percentil(latencias, 99),
+            "latencia_max_ms": max(latencias, default=None),
+            "linhas": stats.get("item_scraped_count", 0),
+            "itens_descartados": sum(self.descartes.values()),
+            "erros_parse": sum(self.erros.values()),
+            "respostas_304": stats.get("httpcache/revalidate", 0),
+            "paginas_inalteradas": stats.get("coleta/paginas_inalteradas", 0),
+            "cidades_checkpoint": stats.get("coleta/checkpoint_puladas", 0),
+            "pico_memoria_mb": pico_memoria_mb(),
+        }
+        por_cidade = {
+            "latencia_ms": self.latencias,
+            "erros_parse": dict(self.erros),
+            "itens_descartados": dict(self.descartes),
+        }
+        registrar_metricas(etapa, metricas, por_cidade, db_path=self.db_path)
+        spider.logger.info(
+            "📈 %s: %d respostas em %.1fs (%.2f/s) | latência p50 %.0f ms, p95 %.0f ms",
+            etapa, respostas, segundos, metricas["respostas_por_s"] or 0,
+            metricas["latencia_p50_ms"] or 0, metricas["latencia_p95_ms"] or 0,
+        )
@@ -0,0 +1,118 @@
+"""Extração dos 15 blocos diários da página de previsão.
+
+Dois motores, escolhidos por EXTRACAO_MOTOR em settings.py:
+
+* "lxml": parseia só o trecho do HTML com os blocos e roda uma única XPath
+  compilada que devolve, em ordem de documento, cada bloco seguido dos seus
+  campos. Uma passada por página, em vez de 1 + 4 por dia.
+* "seletores": o caminho original com response.css(), um seletor por campo.
+
+Os dois devolvem a mesma lista de dicts (tmin, tmax, descricao, chuva) com o
+texto cru; a tipagem continua no ValidaPrevisaoPipeline.
+"""
+from lxml import etree, html
+
+# marcador dos blocos diários no HTML (classe da <section>)
+MARCADOR_BLOCO = b"-daily-infos-aggregator"
+
+
+def _classe(nome: str) -> str:
+    # equivalente XPath do seletor CSS ".nome"
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {nome} ')"
+
+
+_BLOCO = f"//section[{_classe('-daily-infos-aggregator')}]"
+
+# classes do elemento pai -> campo do item
+CAMPOS = {
+    ("span", "-min"): "tmin",
+    ("span", "-max"): "tmax",
+    ("p", "agg-daily__description"): "descricao",
+    ("span", "agg-daily__rain-text"): "chuva",
+}
+
+# blocos e textos dos campos numa XPath só; o resultado vem em ordem de documento
+XPATH_DIAS = etree.XPath(" | ".join([
+    _BLOCO,
+    f"{_BLOCO}//span[{_classe('agg-daily__temp')} and {_classe('-min')}]/text()",
+    f"{_BLOCO}//span[{_classe('agg-daily__temp')} and {_classe('-max')}]/text()",
+    f"{_BLOCO}//p[{_classe('agg-daily__description')}]/text()",
+    f"{_BLOCO}//span[{_classe('agg-daily__rain-text')}]/text()",
+]))
+
+_PARSERS = {}
+
+
+def trecho_previsao(corpo: bytes):
+    """Fatia dos bytes que vai do primeiro ao último bloco diário (None se não há blocos).
+
+    Busca direta nos bytes, sem parsear: serve para o hash do
+    ConteudoInalteradoMiddleware e para o motor lxml não montar a árvore
+    da página inteira (menu, anúncios, rodapé).
+    """
+    marcador = corpo.find(MARCADOR_BLOCO)
+    if marcador < 0:
+        return None
+    inicio = max(corpo.rfind(b"<section", 0, marcador), 0)
+    fim = corpo.find(b"</section>", corpo.rfind(MARCADOR_BLOCO))
+    return corpo[inicio:fim + len(b"</section>") if fim >= 0 else len(corpo)]
+
+
+def _campo(texto):
+    pai = texto.getparent()
+    classes = (pai.get("class") or "").split()
+    for (tag, classe), campo in CAMPOS.items():
+        if pai.tag == tag and classe in classes:
+            return campo
+    return None
+
+
+def _dias_da_arvore(raiz) -> list:
+    dias = []
+    for no in XPATH_DIAS(raiz):
+        if isinstance(no, str):
+            campo = _campo(no)
+            # como o .get() do seletor: vale o primeiro texto de cada campo
+            if dias and campo and dias[-1][campo] is None:
+                dias[-1][campo] = str(no)
+        else:
+            dias.append(dict.fromkeys(CAMPOS.values()))
+    return dias
+
+
+def extrair_dias_lxml(response) -> list:
+    trecho = trecho_previsao(response.body)
+    if trecho is None:
+        return []
+
+    encoding = response.encoding
+    if encoding not in _PARSERS:
+        try:
+            _PARSERS[encoding] = html.HTMLParser(encoding=encoding)
+        except LookupError:
+            # encoding que a libxml2 não conhece: fica com a árvore do Scrapy
+            _PARSERS[encoding] = None
+
+    dias = []
+    if _PARSERS[encoding] is not None:
+        dias = _dias_da_arvore(html.fromstring(trecho, parser=_PARSERS[encoding]))
+    # sem parser, ou marcador fora de uma <section> (script, CSS): usa a página inteira
+    return dias or _dias_da_arvore(response.selector.root)
+
+
+def extrair_dias_seletores(response) -> list:
+    return [
+        {
+            "tmin": dia.css("span.agg-daily__temp.-min::text").get(),
+            "tmax": dia.css("span.agg-daily__temp.-max::text").get(),
+            "descricao": dia.css("p.agg-daily__description::text").get(),
+            "chuva": dia.css("span.agg-daily__rain-text::text").get(),
+        }
+        for dia in response.css("section.-daily-infos-aggregator")
+    ]
+
+
+MOTORES = {
+    "lxml": extrair_dias_lxml,
+    "seletores": extrair_dias_seletores,
+}
@@ -0,0 +1,83 @@
+import logging
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+
+from scrapy.extensions.httpcache import FilesystemCacheStorage, RFC2616Policy
+
+logger = logging.getLogger(__name__)
+
+
+def _tamanho(pasta: Path) -> int:
+    return sum(f.stat().st_size for f in pasta.iterdir() if f.is_file())
+
+
+class RevalidarSemprePolicy(RFC2616Policy):
+    """RFC2616Policy que nunca considera a cópia em cache fresca.
+
+    Sem Cache-Control, a política padrão estima a validade pelo Last-Modified
+    (10% da idade) e poderia devolver a página de ontem sem ir ao site. Aqui
+    toda página vai ao servidor, mas com If-None-Match / If-Modified-Since:
+    se não mudou, volta um 304 sem corpo e o corpo sai do cache.
+    """
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        self._set_conditional_validators(request, cachedresponse)
+        return False
+
+
+class FilesystemCacheStorageLimitado(FilesystemCacheStorage):
+    """FilesystemCacheStorage com teto de tamanho (HTTPCACHE_MAX_BYTES).
+
+    Passando do teto, as entradas usadas há mais tempo (LRU pela mtime da
+    pasta) são apagadas. Um hit no cache "toca" a entrada. Com milhares de
+    cidades o cache guarda só o corpo mais recente de cada página, que é o
+    que a revalidação por ETag/Last-Modified precisa.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.max_bytes = settings.getint("HTTPCACHE_MAX_BYTES")
+        self.entradas = OrderedDict()  # pasta -> bytes, da menos para a mais recente
+        self.total_bytes = 0
+
+    def open_spider(self, spider):
+        super().open_spider(spider)
+        raiz = Path(self.cachedir) / spider.name
+        if not raiz.exists():
+            return
+        pastas = [p for prefixo in raiz.iterdir() if prefixo.is_dir() for p in prefixo.iterdir() if p.is_dir()]
+        for pasta in sorted(pastas, key=lambda p: p.stat().st_mtime):
+            self.entradas[str(pasta)] = _tamanho(pasta)
+        self.total_bytes = sum(self.entradas.values())
+        self._podar()
+
+    def retrieve_response(self, spider, request):
+        response = super().retrieve_response(spider, request)
+        if response is not None:
+            rpath = self._get_request_path(spider, request)
+            if rpath in self.entradas:
+                os.utime(rpath)
+                self.entradas.move_to_end(rpath)
+        return response
+
+    def store_response(self, spider, request, response):
+        super().store_response(spider, request, response)
+        rpath = self._get_request_path(spider, request)
+        self.total_bytes -= self.entradas.pop(rpath, 0)
+        self.entradas[rpath] = _tamanho(Path(rpath))
+        self.total_bytes += self.entradas[rpath]
+        self._podar()
+
+    def _podar(self):
+        if not self.max_bytes:
+            return
+        removidas = 0
+        while self.total_bytes > self.max_bytes and len(self.entradas) > 1:
+            rpath, tamanho = self.entradas.popitem(last=False)
+            shutil.rmtree(rpath, ignore_errors=True)
+            self.total_bytes -= tamanho
+            removidas += 1
+        if removidas:
+            logger.debug("httpcache: %d entradas removidas (%d bytes em uso)", removidas, self.total_bytes)
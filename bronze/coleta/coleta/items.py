@@ -7,6 +7,18 @@ import scrapy
 
 
 class ColetaItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass
+    """Um dia (D+0 ... D+14) da página de 15 dias de uma cidade.
+
+    O spider preenche com o texto cru da página; o ValidaPrevisaoPipeline
+    converte para os tipos abaixo antes de qualquer exportação.
+    """
+    cidade = scrapy.Field()            # str: slug da URL, ex "saopaulo-sp"
+    atualouprevisao = scrapy.Field()   # str: "atual" (D+0) ou "previsao"
+    lead_time = scrapy.Field()         # int: 0 ... 14
+    tmin = scrapy.Field()              # int: °C
+    tmax = scrapy.Field()              # int: °C
+    descricao = scrapy.Field()         # str: espaços colapsados
+    chuva = scrapy.Field()             # float: mm
+    data_previsao = scrapy.Field()     # date: dia a que o bloco se refere
+    dt_ingest = scrapy.Field()         # str: timestamp ISO (UTC) da coleta
+    conteudo_hash = scrapy.Field()     # str: sha1 do bloco de 15 dias (ConteudoInalteradoMiddleware)
@@ -0,0 +1,228 @@
+# Define here the models for your downloader and spider middlewares
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
+
+import hashlib
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from scrapy import Request, signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+
+from coleta.extracao import trecho_previsao
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "transform"))
+
+from raw_db import DB_PATH, conectar, garantir_schema_raw, ler_checkpoint, ler_conteudo  # noqa: E402
+
+# enviado quando todos os itens de uma página passaram pelos pipelines
+pagina_concluida = object()
+# enviado quando uma página é descartada por ser igual à já gravada hoje
+pagina_inalterada = object()
+
+
+def _cidade(url: str) -> str:
+    return url.rstrip("/").split("/")[-1]
+
+
+def hash_bloco_previsao(corpo: bytes):
+    """sha1 só do trecho com os blocos diários, direto nos bytes, sem parsear.
+
+    Menu, anúncios e horários no resto da página mudam a cada request e
+    não devem contar como previsão nova. None se a página não tem os blocos.
+    """
+    trecho = trecho_previsao(corpo)
+    return hashlib.sha1(trecho).hexdigest() if trecho is not None else None
+
+
+class ConteudoInalteradoMiddleware:
+    """Descarta páginas cujo bloco de previsão não mudou desde a última coleta do dia.
+
+    Fica depois do HttpCacheMiddleware: uma resposta 304 (ETag/Last-Modified)
+    chega aqui como o corpo em cache. O hash do bloco é comparado com o que a
+    raw já tem para a cidade no mesmo dia (tabela coleta_conteudo); se for
+    igual, a página nem vai para o parse. Em dia novo tudo é coletado de novo,
+    porque os lead_time mudam. O hash segue em meta["conteudo_hash"] até o
+    RawSQLitePipeline, que grava junto com as linhas. A página descartada
+    sai no sinal pagina_inalterada (o CheckpointMiddleware dá a cidade como
+    feita: as linhas dela já estão na raw).
+    """
+
+    def __init__(self, db_path, stats, signals=None):
+        self.db_path = db_path
+        self.stats = stats
+        self.signals = signals
+        self.dia = None
+        self.conhecidos = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("CONTEUDO_HASH_ENABLED"):
+            raise NotConfigured("CONTEUDO_HASH_ENABLED desligado")
+        # o hash só é gravado pelo RawSQLitePipeline
+        if not settings.getbool("RAW_DB_ENABLED"):
+            raise NotConfigured("CONTEUDO_HASH_ENABLED precisa do RAW_DB_ENABLED")
+        # num shard a raw é um banco só do shard; os hashes vêm do banco principal
+        db_path = settings.get("CONTEUDO_HASH_DB_PATH") or settings.get("RAW_DB_PATH") or DB_PATH
+        middleware = cls(db_path, crawler.stats, crawler.signals)
+        crawler.signals.connect(middleware.spider_opened, signal=signals.spider_opened)
+        return middleware
+
+    def spider_opened(self, spider):
+        self.dia = datetime.now(timezone.utc).date().isoformat()
+        conn = conectar(self.db_path)
+        try:
+            with conn:
+                garantir_schema_raw(conn)
+            self.conhecidos = ler_conteudo(conn, self.dia)
+        finally:
+            conn.close()
+
+    def process_response(self, request, response, spider=None):
+        if response.status != 200:
+            return response
+
+        hash_ = hash_bloco_previsao(response.body)
+        if hash_ is None:
+            return response
+
+        cidade = _cidade(request.url)
+        if self.conhecidos.get(cidade) == hash_:
+            self.stats.inc_value("coleta/paginas_inalteradas")
+            if self.signals is not None:
+                self.signals.send_catch_log(pagina_inalterada, cidade=cidade)
+            raise IgnoreRequest(f"previsão inalterada hoje: {cidade}")
+
+        request.meta["conteudo_hash"] = hash_
+        return response
+
+
+def job_checkpoint(settings) -> str:
+    """CHECKPOINT_JOB, o run da DAG (PIPELINE_RUN_ID) ou o dia UTC."""
+    return (
+        settings.get("CHECKPOINT_JOB")
+        or os.environ.get("PIPELINE_RUN_ID")
+        or datetime.now(timezone.utc).date().isoformat()
+    )
+
+
+class CheckpointMiddleware:
+    """Spider middleware que deixa um crawl que caiu ser retomado de onde parou.
+
+    Na saída do parse: conta os itens de cada página e espera o
+    item_scraped/item_dropped de todos eles (o item_scraped só sai depois do
+    último pipeline). Aí o sinal pagina_concluida avisa o RawSQLitePipeline,
+    que grava a cidade em coleta_checkpoint na mesma transação das linhas:
+    uma cidade só conta como feita quando as linhas dela estão na raw.
+    Item descartado pela validação (DropItem) conta como processado: uma
+    página só com itens inválidos conclui, porque buscar de novo traria os
+    mesmos itens. Página sem nenhum item, ou com erro num pipeline, não
+    conclui. Página descartada pelo ConteudoInalteradoMiddleware (sinal
+    pagina_inalterada) conclui na hora: as linhas são as já gravadas hoje.
+
+    Nas requisições iniciais: as cidades já feitas no job (o run da DAG ou o
+    dia) saem antes de ir para a fila. Uma nova tentativa da task só busca
+    as que faltam. Desligado com CHECKPOINT_ENABLED = False.
+    """
+
+    def __init__(self, db_path, job, crawler):
+        self.db_path = db_path
+        self.job = job
+        self.crawler = crawler
+        self.feitas = None
+        # cidade -> [itens gerados, itens que saíram dos pipelines, parse terminou]
+        self.paginas = {}
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("CHECKPOINT_ENABLED"):
+            raise NotConfigured("CHECKPOINT_ENABLED desligado")
+        # o checkpoint é gravado pelo RawSQLitePipeline, no banco da raw (num shard, o do shard)
+        if not settings.getbool("RAW_DB_ENABLED"):
+            raise NotConfigured("CHECKPOINT_ENABLED precisa do RAW_DB_ENABLED")
+        middleware = cls(settings.get("RAW_DB_PATH") or DB_PATH, job_checkpoint(settings), crawler)
+        crawler.signals.connect(middleware.item_processado, signal=signals.item_scraped)
+        crawler.signals.connect(middleware.item_processado, signal=signals.item_dropped)
+        crawler.signals.connect(middleware.item_error, signal=signals.item_error)
+        crawler.signals.connect(middleware.pagina_inalterada, signal=pagina_inalterada)
+        return middleware
+
+    def _carregar(self):
+        conn = conectar(self.db_path)
+        try:
+            with conn:
+                garantir_schema_raw(conn)
+            self.feitas = ler_checkpoint(conn, self.job)
+        finally:
+            conn.close()
+        if self.feitas:
+            self.crawler.spider.logger.info(
+                "♻️  checkpoint %s: %d cidades já coletadas, retomando", self.job, len(self.feitas),
+            )
+
+    def _pendente(self, request) -> bool:
+        if self.feitas is None:
+            self._carregar()
+        if _cidade(request.url) not in self.feitas:
+            return True
+        self.crawler.stats.inc_value("coleta/checkpoint_puladas")
+        return False
+
+    async def process_start(self, start):
+        # Scrapy >= 2.13; process_start_requests para versões anteriores
+        async for request in start:
+            if self._pendente(request):
+                yield request
+
+    def process_start_requests(self, start_requests, spider=None):
+        for request in start_requests:
+            if self._pendente(request):
+                yield request
+
+    # ---- conclusão das páginas ----
+    def _gerado(self, response, saida):
+        if not isinstance(saida, Request):
+            self.paginas.setdefault(_cidade(response.url), [0, 0, False])[0] += 1
+
+    def _fim_do_parse(self, response):
+        pagina = self.paginas.get(_cidade(response.url))
+        if pagina is not None:
+            pagina[2] = True
+            self._conferir(_cidade(response.url))
+
+    def _conferir(self, cidade):
+        gerados, processados, terminou = self.paginas[cidade]
+        if terminou and processados == gerados:
+            del self.paginas[cidade]
+            self.crawler.signals.send_catch_log(pagina_concluida, job=self.job, cidade=cidade)
+
+    def item_processado(self, item, response, spider, **_):
+        cidade = _cidade(response.url)
+        if cidade in self.paginas:
+            self.paginas[cidade][1] += 1
+            self._conferir(cidade)
+
+    def pagina_inalterada(self, cidade):
+        self.crawler.stats.inc_value("coleta/checkpoint_inalteradas")
+        self.crawler.signals.send_catch_log(pagina_concluida, job=self.job, cidade=cidade)
+
+    def item_error(self, item, response, spider, failure):
+        # a página não conclui: o próximo crawl do job busca de novo
+        self.paginas.pop(_cidade(response.url), None)
+
+    def process_spider_output(self, response, result, spider=None):
+        for saida in result:
+            self._gerado(response, saida)
+            yield saida
+        self._fim_do_parse(response)
+
+    async def process_spider_output_async(self, response, result, spider=None):
+        async for saida in result:
+            self._gerado(response, saida)
+            yield saida
+        self._fim_do_parse(response)
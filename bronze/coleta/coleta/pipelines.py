@@ -0,0 +1,231 @@
+# Define your item pipelines here
+#
+# Don't forget to add your pipeline to the ITEM_PIPELINES setting
+# See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
+
+import importlib.util
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from scrapy.exceptions import DropItem, NotConfigured
+
+from coleta.middlewares import pagina_concluida
+
+# schema/upsert da raw ficam em bronze/transform/raw_db.py (os mesmos do transform.py)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "transform"))
+
+from arquivo_bronze import ARQUIVO_DIR, escrever_particoes  # noqa: E402
+from raw_db import (  # noqa: E402
+    DB_PATH,
+    carregar_linhas,
+    conectar,
+    garantir_schema_raw,
+    normalizar_registro,
+    registrar_versao,
+    salvar_checkpoint,
+    salvar_conteudo,
+)
+
+_NUMERO = re.compile(r"-?\d+(?:[.,]\d+)?")
+
+
+def _para_numero(valor, tipo):
+    if isinstance(valor, (int, float)):
+        return tipo(valor)
+    match = _NUMERO.search(valor or "")
+    if not match:
+        return None
+    return tipo(float(match.group().replace(",", ".")))
+
+
+def normalizar_descricao(texto):
+    # "\n   Sol com   nuvens.\n " -> "Sol com nuvens."
+    return " ".join((texto or "").split()) or None
+
+
+class ValidaPrevisaoPipeline:
+    """Converte os campos do ColetaItem uma única vez, na origem.
+
+    "18°" -> 18, "2.4mm" -> 2.4, descrição sem quebras de linha e
+    data_previsao = data da coleta + lead_time. Itens que não dão para
+    converter são descartados e contados nas stats do crawl em
+    coleta/itens_invalidos/<motivo>.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats)
+
+    def process_item(self, item, spider=None):
+        item["lead_time"] = int(item.get("lead_time") or 0)
+        item["tmin"] = _para_numero(item.get("tmin"), int)
+        item["tmax"] = _para_numero(item.get("tmax"), int)
+        item["chuva"] = _para_numero(item.get("chuva"), float)
+        item["descricao"] = normalizar_descricao(item.get("descricao"))
+
+        motivo = self.validar(item)
+        if motivo:
+            self.stats.inc_value("coleta/itens_invalidos")
+            self.stats.inc_value(f"coleta/itens_invalidos/{motivo}")
+            raise DropItem(f"{motivo}: {item.get('cidade')} D+{item['lead_time']}")
+
+        coleta = datetime.fromisoformat(item["dt_ingest"]).date()
+        item["data_previsao"] = coleta + timedelta(days=item["lead_time"])
+
+        self.stats.inc_value("coleta/itens_validos")
+        return item
+
+    @staticmethod
+    def validar(item):
+        if item["tmin"] is None or item["tmax"] is None:
+            return "temperatura_ausente"
+        if item["tmin"] > item["tmax"]:
+            return "tmin_maior_que_tmax"
+        if item["chuva"] is None:
+            return "chuva_ausente"
+        if item["chuva"] < 0:
+            return "chuva_negativa"
+        if not item["descricao"]:
+            return "descricao_ausente"
+        return None
+
+
+class RawSQLitePipeline:
+    """Grava os itens direto na raw_climatempo_previsao, sem passar pelo JSONL.
+
+    Uma conexão por crawl; os itens vão para um buffer e viram um upsert em
+    lote (executemany + commit) a cada RAW_DB_LOTE itens e no close_spider.
+    Cada commit também incrementa a versão da raw em pipeline_versao, que o
+    dashboard usa para saber que precisa reler a tabela, e grava o hash do
+    bloco de previsão de cada cidade (coleta_conteudo) lido pelo
+    ConteudoInalteradoMiddleware e as cidades concluídas (coleta_checkpoint)
+    que o CheckpointMiddleware avisa. Desligado com RAW_DB_ENABLED = False.
+
+    Cada página concluída também força um commit, com as linhas dela e a
+    cidade no checkpoint: um crawl que cai perde só as páginas ainda no
+    meio dos pipelines (no máximo CONCURRENT_REQUESTS), nunca cidades já
+    concluídas esperando o lote encher. O RAW_DB_LOTE limita o buffer
+    entre duas conclusões.
+    """
+
+    def __init__(self, db_path, tamanho_lote, stats):
+        self.db_path = db_path
+        self.tamanho_lote = tamanho_lote
+        self.stats = stats
+        self.conn = None
+        self.buffer = []
+        self.hashes = {}
+        self.concluidas = []
+        self.run_id = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("RAW_DB_ENABLED"):
+            raise NotConfigured("RAW_DB_ENABLED desligado")
+        pipeline = cls(
+            settings.get("RAW_DB_PATH") or DB_PATH,
+            settings.getint("RAW_DB_LOTE", 500),
+            crawler.stats,
+        )
+        crawler.signals.connect(pipeline.pagina_concluida, signal=pagina_concluida)
+        return pipeline
+
+    def open_spider(self, spider=None):
+        self.conn = conectar(self.db_path)
+        self.run_id = uuid.uuid4().hex
+        with self.conn:
+            garantir_schema_raw(self.conn)
+
+    def process_item(self, item, spider=None):
+        self.buffer.append(normalizar_registro(item))
+        if item.get("conteudo_hash"):
+            self.hashes[item["cidade"]] = (item["dt_ingest"][:10], item["conteudo_hash"])
+        if len(self.buffer) >= self.tamanho_lote:
+            self.flush()
+        return item
+
+    def pagina_concluida(self, job, cidade):
+        # as linhas da página já estão no buffer (ou em um commit anterior):
+        # a cidade vai para o checkpoint no mesmo commit delas
+        self.concluidas.append((job, cidade))
+        self.flush()
+
+    def flush(self):
+        if not self.buffer and not self.concluidas:
+            return
+        with self.conn:
+            if self.buffer:
+                carregar_linhas(self.conn, self.buffer, self.tamanho_lote)
+                registrar_versao(self.conn, run_id=self.run_id)
+                salvar_conteudo(self.conn, [(cidade, dia, hash_) for cidade, (dia, hash_) in self.hashes.items()])
+            salvar_checkpoint(self.conn, self.concluidas)
+        self.stats.inc_value("raw_db/linhas_gravadas", len(self.buffer))
+        self.stats.inc_value("raw_db/commits")
+        self.buffer = []
+        self.hashes = {}
+        self.concluidas = []
+
+    def close_spider(self, spider=None):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+
+class ArquivoParquetPipeline:
+    """Arquiva cada crawl em Parquet, particionado por dt=YYYY-MM-DD/cidade=<slug>.
+
+    Guarda as mesmas tuplas que vão para a raw e grava um conjunto de
+    arquivos novo a cada ARQUIVO_PARQUET_LOTE itens e no close_spider.
+    O diretório (bronze/arquivo por padrão) é o histórico re-executável da
+    coleta: arquivo_bronze.reconstruir_raw recarrega qualquer período.
+    Precisa do pyarrow; sem ele ou com ARQUIVO_PARQUET_ENABLED = False fica desligado.
+    """
+
+    def __init__(self, base_dir, tamanho_lote, stats):
+        self.base_dir = base_dir
+        self.tamanho_lote = tamanho_lote
+        self.stats = stats
+        self.buffer = []
+        self.run_id = None
+        self.lotes = 0
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("ARQUIVO_PARQUET_ENABLED"):
+            raise NotConfigured("ARQUIVO_PARQUET_ENABLED desligado")
+        if importlib.util.find_spec("pyarrow") is None:
+            raise NotConfigured("pyarrow não instalado: arquivo Parquet desligado")
+        return cls(
+            settings.get("ARQUIVO_PARQUET_DIR") or ARQUIVO_DIR,
+            settings.getint("ARQUIVO_PARQUET_LOTE", 5000),
+            crawler.stats,
+        )
+
+    def open_spider(self, spider=None):
+        self.run_id = uuid.uuid4().hex
+
+    def process_item(self, item, spider=None):
+        self.buffer.append(normalizar_registro(item))
+        if len(self.buffer) >= self.tamanho_lote:
+            self.flush()
+        return item
+
+    def flush(self):
+        if not self.buffer:
+            return
+        escrever_particoes(self.buffer, self.base_dir, prefixo=f"{self.run_id}-{self.lotes}")
+        self.stats.inc_value("arquivo_parquet/linhas_gravadas", len(self.buffer))
+        self.lotes += 1
+        self.buffer = []
+
+    def close_spider(self, spider=None):
+        self.flush()
@@ -22,9 +22,23 @@ ADDONS = {}
 ROBOTSTXT_OBEY = True
 
 # Concurrency and throttling settings
-#CONCURRENT_REQUESTS = 16
-CONCURRENT_REQUESTS_PER_DOMAIN = 1
-DOWNLOAD_DELAY = 1
+# Perfil para o catálogo de cidades: todas as páginas são do mesmo domínio,
+# então quem manda é o limite por domínio. Com até 4 requisições simultâneas e
+# o AutoThrottle segurando ~2 em voo, o ritmo fica perto de 2-4 páginas/s:
+# 5.000 cidades cabem em ~30-45 min, bem dentro da janela diária abaixo.
+CONCURRENT_REQUESTS = 16
+CONCURRENT_REQUESTS_PER_DOMAIN = 4
+DOWNLOAD_DELAY = 0.25
+
+# Catálogo de cidades lido pelo spider (None = coleta/cidades.csv)
+CIDADES_CATALOGO = None
+
+# Extração dos blocos diários: "lxml" (uma XPath só sobre o trecho da previsão)
+# ou "seletores" (response.css por campo, o caminho original)
+EXTRACAO_MOTOR = "lxml"
+
+# Janela diária em que a coleta precisa terminar (usada só para log da taxa necessária)
+JANELA_COLETA_SEGUNDOS = 2 * 60 * 60
 
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
@@ -40,48 +54,84 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "coleta.middlewares.ColetaSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    "coleta.middlewares.CheckpointMiddleware": 543,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
-#DOWNLOADER_MIDDLEWARES = {
-#    "coleta.middlewares.ColetaDownloaderMiddleware": 543,
-#}
+DOWNLOADER_MIDDLEWARES = {
+    # depois do HttpCache (900) e da descompressão (590): vê o corpo final
+    "coleta.middlewares.ConteudoInalteradoMiddleware": 560,
+}
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    "coleta.extensions.MetricasColetaExtension": 500,
+}
+
+# Métricas do crawl (latência, respostas/s, erros por cidade) em pipeline_run_metrics.
+# run_id vem de PIPELINE_RUN_ID (a DAG passa o run_id do Airflow).
+METRICAS_ENABLED = True
+METRICAS_DB_PATH = None  # None = RAW_DB_PATH; nos shards, o banco principal
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "coleta.pipelines.ColetaPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "coleta.pipelines.ValidaPrevisaoPipeline": 300,
+    "coleta.pipelines.ArquivoParquetPipeline": 700,
+    "coleta.pipelines.RawSQLitePipeline": 800,
+}
+
+# Gravação direta na raw_climatempo_previsao (dispensa o transform.py).
+# O feed JSONL (-O coleta/data.jsonl) continua opcional, como arquivo.
+RAW_DB_ENABLED = True
+RAW_DB_PATH = None  # None = dataset_climatempo.db na raiz do projeto
+RAW_DB_LOTE = 500
+
+# Arquivo Parquet da bronze, particionado por dt=/cidade= (precisa do pyarrow).
+# Histórico de todas as coletas para backfill/reprocessamento sem re-scrape.
+ARQUIVO_PARQUET_ENABLED = True
+ARQUIVO_PARQUET_DIR = None  # None = bronze/arquivo
+ARQUIVO_PARQUET_LOTE = 5000
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-#AUTOTHROTTLE_ENABLED = True
+AUTOTHROTTLE_ENABLED = True
 # The initial download delay
-#AUTOTHROTTLE_START_DELAY = 5
+AUTOTHROTTLE_START_DELAY = 1
 # The maximum download delay to be set in case of high latencies
-#AUTOTHROTTLE_MAX_DELAY = 60
+AUTOTHROTTLE_MAX_DELAY = 30
 # The average number of requests Scrapy should be sending in parallel to
 # each remote server
-#AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+AUTOTHROTTLE_TARGET_CONCURRENCY = 2.0
 # Enable showing throttling stats for every response received:
 #AUTOTHROTTLE_DEBUG = False
 
-# Enable and configure HTTP caching (disabled by default)
+# Cache HTTP com revalidação: toda página é pedida de novo com If-None-Match /
+# If-Modified-Since (ETag/Last-Modified guardados) e um 304 reaproveita o
+# corpo do cache. O storage apaga as entradas mais antigas acima de HTTPCACHE_MAX_BYTES.
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+HTTPCACHE_ENABLED = True
+HTTPCACHE_POLICY = "coleta.httpcache.RevalidarSemprePolicy"
+HTTPCACHE_STORAGE = "coleta.httpcache.FilesystemCacheStorageLimitado"
+HTTPCACHE_DIR = "httpcache"
+HTTPCACHE_EXPIRATION_SECS = 0
+# guarda mesmo sem Cache-Control, para ter o validador na próxima coleta
+HTTPCACHE_ALWAYS_STORE = True
+HTTPCACHE_IGNORE_HTTP_CODES = [403, 429, 500, 502, 503, 504]
+HTTPCACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Pula o parse de páginas cujo bloco de 15 dias tem o mesmo hash já gravado
+# hoje para a cidade (coleta_conteudo na raw; precisa do RAW_DB_ENABLED).
+CONTEUDO_HASH_ENABLED = True
+CONTEUDO_HASH_DB_PATH = None  # None = RAW_DB_PATH; nos shards, o banco principal
+
+# Checkpoint por cidade (coleta_checkpoint na raw; precisa do RAW_DB_ENABLED):
+# repetir o crawl no mesmo job só busca as cidades que ainda não entraram
+CHECKPOINT_ENABLED = True
+CHECKPOINT_JOB = None  # None = PIPELINE_RUN_ID (run da DAG) ou o dia UTC
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
@@ -1,49 +1,143 @@
+import csv
+import zlib
 import scrapy
+from pathlib import Path
 from datetime import datetime, timezone
 
+from coleta.extracao import MOTORES
+from coleta.items import ColetaItem
+
+# catálogo padrão de cidades (city_id, slug, uf) que fica dentro do pacote coleta
+CATALOGO_PADRAO = Path(__file__).resolve().parents[1] / "cidades.csv"
+
+BASE_URL = "https://www.climatempo.com.br/previsao-do-tempo/15-dias/cidade"
+
+# orçamento de politeness do domínio, dividido entre os shards
+POLITENESS = ("CONCURRENT_REQUESTS_PER_DOMAIN", "DOWNLOAD_DELAY", "AUTOTHROTTLE_TARGET_CONCURRENCY")
+
+
+def ler_catalogo(caminho):
+    """Lê o catálogo de cidades (CSV com city_id, slug, uf) linha a linha."""
+    with open(caminho, encoding="utf-8", newline="") as f:
+        for linha in csv.DictReader(f):
+            city_id = (linha.get("city_id") or "").strip()
+            slug = (linha.get("slug") or "").strip()
+            if not city_id or not slug:
+                continue
+            yield {
+                "city_id": city_id,
+                "slug": slug,
+                "uf": (linha.get("uf") or "").strip().upper(),
+            }
+
+
+def shard_da_cidade(city_id: str, shards: int) -> int:
+    """Shard estável de uma cidade: crc32 do city_id, igual em qualquer nó."""
+    return zlib.crc32(city_id.encode()) % shards
+
+
 class PrevisaoSpider(scrapy.Spider):
     name = "previsao"
 
-    start_urls = [
-        "https://www.climatempo.com.br/previsao-do-tempo/15-dias/cidade/5208/pedra-pe",
-        "https://www.climatempo.com.br/previsao-do-tempo/15-dias/cidade/558/saopaulo-sp",
-        "https://www.climatempo.com.br/previsao-do-tempo/15-dias/cidade/259/recife-pe",
-        "https://www.climatempo.com.br/previsao-do-tempo/15-dias/cidade/391/americana-sp"
-    ]
+    def __init__(self, catalogo=None, shard=0, shards=1, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # permite trocar o catálogo na linha de comando: scrapy crawl previsao -a catalogo=...
+        self.catalogo = catalogo
+        # coleta dividida: scrapy crawl previsao -a shard=2 -a shards=8 só pega as cidades do shard 2
+        self.shard = int(shard)
+        self.shards = int(shards)
+        if not 0 <= self.shard < self.shards:
+            raise ValueError(f"shard {self.shard} fora de 0..{self.shards - 1}")
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if spider.shards > 1:
+            # os N processos batem no mesmo domínio: cada um fica com 1/N do
+            # orçamento (concorrência e ritmo), e a soma é a do crawl único
+            settings = crawler.settings
+            por_dominio = settings.getint("CONCURRENT_REQUESTS_PER_DOMAIN")
+            if spider.shards > por_dominio:
+                # cada shard precisa de ao menos 1 requisição: com mais shards
+                # que o orçamento, a soma passaria do CONCURRENT_REQUESTS_PER_DOMAIN
+                raise ValueError(
+                    f"shards={spider.shards} maior que CONCURRENT_REQUESTS_PER_DOMAIN={por_dominio}: "
+                    "use no máximo um shard por requisição simultânea do domínio"
+                )
+            settings.set("CONCURRENT_REQUESTS_PER_DOMAIN", por_dominio // spider.shards, "spider")
+            settings.set("DOWNLOAD_DELAY", settings.getfloat("DOWNLOAD_DELAY") * spider.shards, "spider")
+            settings.set("AUTOTHROTTLE_TARGET_CONCURRENCY",
+                         settings.getfloat("AUTOTHROTTLE_TARGET_CONCURRENCY") / spider.shards, "spider")
+            spider.logger.info(
+                "🧩 orçamento por shard (%d shards): %s",
+                spider.shards, ", ".join(f"{nome}={settings.get(nome)}" for nome in POLITENESS),
+            )
+        return spider
+
+    async def start(self):
+        # Scrapy >= 2.13 chama start(); mantemos start_requests() para versões anteriores
+        for request in self.start_requests():
+            yield request
+
+    def start_requests(self):
+        catalogo = self.catalogo or self.settings.get("CIDADES_CATALOGO") or CATALOGO_PADRAO
+        base_url = self.settings.get("CLIMATEMPO_BASE_URL", BASE_URL).rstrip("/")
+
+        cidades = list(ler_catalogo(catalogo))
+        if self.shards > 1:
+            cidades = [c for c in cidades if shard_da_cidade(c["city_id"], self.shards) == self.shard]
+            self.logger.info("🧩 shard %d/%d: %d cidades", self.shard, self.shards, len(cidades))
+        self.log_janela(len(cidades))
+
+        for cidade in cidades:
+            yield scrapy.Request(
+                f"{base_url}/{cidade['city_id']}/{cidade['slug']}",
+                callback=self.parse,
+                dont_filter=True,
+            )
+
+    def log_janela(self, n_cidades):
+        # taxa mínima para caber o catálogo inteiro na janela diária configurada
+        janela = self.settings.getfloat("JANELA_COLETA_SEGUNDOS")
+        if not janela or not n_cidades:
+            return
+        self.logger.info(
+            "📋 %d cidades no catálogo | janela de %.0f min | taxa necessária: %.2f páginas/s",
+            n_cidades, janela / 60, n_cidades / janela,
+        )
 
     def parse(self, response):
-        dt_ingest = datetime.now(timezone.utc).isoformat()
-        cidade = response.url.split('/')[-1]
-        dias = response.css("section.-daily-infos-aggregator")
-
-        # ====================
-        # HOJE
-        # ====================
-
-        hoje = dias[0]
-
-        yield {
-            "cidade": cidade,
-            "atualouprevisao": "atual",
-            "tmin": hoje.css("span.agg-daily__temp.-min::text").get(),
-            "tmax": hoje.css("span.agg-daily__temp.-max::text").get(),
-            "descricao": hoje.css("p.agg-daily__description::text").get(),
-            "chuva": hoje.css("span.agg-daily__rain-text::text").get(),
-            "dt_ingest": dt_ingest,
-        }
-
-        # ====================
-        # AMANHÃ
-        # ====================
-
-        amanha = dias[1]
-
-        yield {
-            "cidade": cidade,
-            "atualouprevisao": "previsao",
-            "tmin": amanha.css("span.agg-daily__temp.-min::text").get(),
-            "tmax": amanha.css("span.agg-daily__temp.-max::text").get(),
-            "descricao": amanha.css("p.agg-daily__description::text").get(),
-            "chuva": amanha.css("span.agg-daily__rain-text::text").get(),
-            "dt_ingest": dt_ingest,
-        }
\ No newline at end of file
+        yield from itens_da_pagina(
+            response, self.settings.get("EXTRACAO_MOTOR", "lxml"), response.meta.get("conteudo_hash"),
+        )
+
+
+def itens_da_pagina(response, motor: str = "lxml", conteudo_hash: str = None):
+    """ColetaItems (D+0..D+14) de uma página de 15 dias.
+
+    É o parse do spider, fora da classe para o coletor asyncio
+    (bronze/coleta/coleta_async.py) gerar exatamente os mesmos itens.
+    """
+    dt_ingest = datetime.now(timezone.utc).isoformat()
+    cidade = response.url.split('/')[-1]
+    dias = MOTORES[motor](response)
+
+    # ====================
+    # D+0 (HOJE) ... D+14
+    # A página traz 15 blocos; dias[0] é o dado do dia e os demais são
+    # previsões com lead_time = quantos dias à frente da coleta.
+    # ====================
+
+    for lead_time, dia in enumerate(dias):
+        # texto cru da página; a tipagem fica no ValidaPrevisaoPipeline
+        yield ColetaItem(
+            cidade=cidade,
+            atualouprevisao="atual" if lead_time == 0 else "previsao",
+            lead_time=lead_time,
+            tmin=dia["tmin"],
+            tmax=dia["tmax"],
+            descricao=dia["descricao"],
+            chuva=dia["chuva"],
+            dt_ingest=dt_ingest,
+            conteudo_hash=conteudo_hash,
+        )
@@ -0,0 +1,376 @@
+"""Coletor asyncio: a coleta do PrevisaoSpider sem o motor do Scrapy.
+
+Para catálogos com dezenas de milhares de cidades. Um cliente aiohttp com
+pool de conexões keep-alive busca as páginas. A extração é a do spider
+(itens_da_pagina), e os itens passam pelos mesmos pipelines: validação,
+arquivo Parquet e raw no SQLite. A saída é a mesma do `scrapy crawl previsao`.
+
+* concorrência: `--concorrencia` workers no total e no máximo `--por-host`
+  requisições simultâneas por host (um semáforo por host);
+* ritmo: um balde de fichas por host, com `--taxa` páginas/s e rajada de
+  até `--rajada` páginas;
+* falhas: timeout, erro de conexão e 408/429/5xx são refeitos até
+  `--tentativas` vezes, com backoff exponencial e jitter (ou o Retry-After);
+* os itens entram na raw em lotes de RAW_DB_LOTE enquanto a coleta anda, e
+  o catálogo é lido como stream, sem montar a lista de URLs na memória;
+* extração e pipelines (commit no SQLite, escrita do Parquet) rodam numa
+  thread de escrita só, fora do event loop: os downloads não param
+  esperando o disco;
+* o checkpoint é o mesmo do spider (coleta_checkpoint, CHECKPOINT_JOB):
+  rodar de novo no mesmo job só busca as cidades que faltam.
+
+Os padrões vêm de coleta/settings.py (CONCURRENT_REQUESTS,
+CONCURRENT_REQUESTS_PER_DOMAIN, DOWNLOAD_DELAY -> taxa, ROBOTSTXT_OBEY).
+
+    cd bronze/coleta
+    python coleta_async.py --catalogo coleta/cidades.csv
+    python coleta_async.py --catalogo grande.csv --por-host 8 --taxa 20
+"""
+import argparse
+import asyncio
+import importlib.util
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from scrapy.exceptions import DropItem
+from scrapy.http import HtmlResponse
+
+from coleta import settings as config
+from coleta.middlewares import job_checkpoint
+from coleta.pipelines import ArquivoParquetPipeline, RawSQLitePipeline, ValidaPrevisaoPipeline
+from coleta.spiders.previsao import BASE_URL, CATALOGO_PADRAO, itens_da_pagina, ler_catalogo
+
+# instrumentacao/raw_db: bronze/transform já está no sys.path pelo coleta.pipelines
+from arquivo_bronze import ARQUIVO_DIR
+from instrumentacao import percentil, pico_memoria_mb, registrar_metricas
+from raw_db import DB_PATH, ler_checkpoint
+
+# os mesmos códigos que o RetryMiddleware do Scrapy refaz
+RETRY_HTTP_CODES = {408, 429, 500, 502, 503, 504, 522, 524}
+
+# páginas/s por host com o mesmo ritmo do spider (DOWNLOAD_DELAY); 0 = sem limite
+TAXA_PADRAO = 1 / config.DOWNLOAD_DELAY if config.DOWNLOAD_DELAY else 0.0
+
+
+class Contadores(Counter):
+    """Stats com a interface que os pipelines da coleta usam (inc_value)."""
+
+    def inc_value(self, chave, n=1, start=0):
+        self[chave] += n
+
+    def get_stats(self):
+        return dict(self)
+
+
+class BaldeDeFichas:
+    """Token bucket: `taxa` fichas por segundo, acumulando até `capacidade`.
+
+    Cada requisição retira uma ficha; sem ficha, espera a próxima. Quem
+    espera segura o lock, então as requisições saem na ordem de chegada.
+    taxa = 0 desliga o limite.
+    """
+
+    def __init__(self, taxa: float, capacidade: float = 1):
+        self.taxa = taxa
+        self.capacidade = max(1, capacidade)
+        self.fichas = self.capacidade
+        self.atualizado = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def retirar(self):
+        if not self.taxa:
+            return
+        async with self.lock:
+            while True:
+                agora = time.monotonic()
+                self.fichas = min(self.capacidade, self.fichas + (agora - self.atualizado) * self.taxa)
+                self.atualizado = agora
+                if self.fichas >= 1:
+                    self.fichas -= 1
+                    return
+                await asyncio.sleep((1 - self.fichas) / self.taxa)
+
+
+def _retry_after(valor):
+    # só a forma em segundos; a forma com data cai no backoff normal
+    try:
+        return max(0.0, float(valor))
+    except (TypeError, ValueError):
+        return None
+
+
+def _cidade(url: str) -> str:
+    return url.rstrip("/").split("/")[-1]
+
+
+class ColetorAsync:
+    def __init__(self, pipelines, stats, concorrencia=config.CONCURRENT_REQUESTS,
+                 por_host=config.CONCURRENT_REQUESTS_PER_DOMAIN, taxa=TAXA_PADRAO, rajada=None, tentativas=2,
+                 backoff=0.5, timeout=30.0, motor=config.EXTRACAO_MOTOR, obedecer_robots=config.ROBOTSTXT_OBEY,
+                 ao_concluir=None, escritor=None):
+        self.pipelines = pipelines
+        self.stats = stats
+        self.concorrencia = concorrencia
+        self.por_host = por_host
+        self.taxa = taxa
+        self.rajada = rajada or por_host
+        self.tentativas = tentativas
+        self.backoff = backoff
+        self.timeout = timeout
+        self.motor = motor
+        self.obedecer_robots = obedecer_robots
+        # chamado com a cidade quando todos os itens da página passaram pelos pipelines
+        self.ao_concluir = ao_concluir
+        # executor de uma thread onde rodam processar/pipelines, o mesmo que
+        # abriu os pipelines (a conexão SQLite só vale na thread que a criou);
+        # None processa no próprio loop
+        self.escritor = escritor
+        self.user_agent = getattr(config, "USER_AGENT", None) or f"{config.BOT_NAME} (coleta_async)"
+        self.semaforos = {}
+        self.baldes = {}
+        self.robots = {}
+        self.latencias = {}
+        self.erros = Counter()
+        self.descartes = Counter()
+
+    def _limites(self, host: str):
+        if host not in self.semaforos:
+            self.semaforos[host] = asyncio.Semaphore(self.por_host)
+            self.baldes[host] = BaldeDeFichas(self.taxa, self.rajada)
+        return self.semaforos[host], self.baldes[host]
+
+    async def _carregar_robots(self, sessao, url: str):
+        # como o RobotsTxtMiddleware: robots.txt ausente ou com erro libera tudo
+        resposta = await self.buscar(sessao, url, robots=True)
+        if resposta is None or resposta.status != 200:
+            return None
+        regras = RobotFileParser()
+        regras.parse(resposta.text.splitlines())
+        return regras
+
+    async def _permitido(self, sessao, url: str) -> bool:
+        if not self.obedecer_robots:
+            return True
+        partes = urlsplit(url)
+        if partes.netloc not in self.robots:
+            # uma task por host: os workers que chegam juntos esperam a mesma leitura
+            self.robots[partes.netloc] = asyncio.ensure_future(
+                self._carregar_robots(sessao, f"{partes.scheme}://{partes.netloc}/robots.txt")
+            )
+        regras = await self.robots[partes.netloc]
+        if regras is None or regras.can_fetch(self.user_agent, url):
+            return True
+        self.stats.inc_value("robotstxt/forbidden")
+        return False
+
+    async def buscar(self, sessao, url: str, robots=False):
+        """HtmlResponse da página, ou None se não for 200 depois das tentativas."""
+        import aiohttp
+
+        semaforo, balde = self._limites(urlsplit(url).netloc)
+        for tentativa in range(self.tentativas + 1):
+            espera = None
+            await balde.retirar()
+            async with semaforo:
+                inicio = time.perf_counter()
+                try:
+                    async with sessao.get(url) as resp:
+                        corpo = await resp.read()
+                        status = resp.status
+                        if status not in RETRY_HTTP_CODES:
+                            self.stats.inc_value("response_received_count")
+                            self.stats.inc_value(f"downloader/response_status_count/{status}")
+                            self.stats.inc_value("downloader/response_bytes", len(corpo))
+                            if robots or status == 200:
+                                if not robots:
+                                    self.latencias[_cidade(url)] = (time.perf_counter() - inicio) * 1000
+                                return HtmlResponse(url=url, status=status, headers=dict(resp.headers), body=corpo)
+                            # como o HttpErrorMiddleware: 404 e afins não chegam no parse
+                            self.stats.inc_value("httperror/response_ignored_count")
+                            return None
+                        espera = _retry_after(resp.headers.get("Retry-After"))
+                        motivo = f"http_{status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    motivo = type(e).__name__
+
+            self.stats.inc_value(f"retry/reason_count/{motivo}")
+            if tentativa == self.tentativas:
+                break
+            self.stats.inc_value("retry/count")
+            if espera is None:
+                espera = self.backoff * 2 ** tentativa * random.uniform(0.5, 1.5)
+            await asyncio.sleep(espera)
+
+        self.stats.inc_value("retry/max_reached")
+        return None
+
+    def processar(self, response):
+        """Extrai os itens e passa pelos pipelines (roda na thread do escritor)."""
+        cidade = _cidade(response.url)
+        try:
+            itens = list(itens_da_pagina(response, self.motor))
+        except Exception:
+            self.erros[cidade] += 1
+            self.stats.inc_value("spider_exceptions")
+            return
+
+        for item in itens:
+            try:
+                for pipeline in self.pipelines:
+                    item = pipeline.process_item(item)
+            except DropItem:
+                self.descartes[cidade] += 1
+                self.stats.inc_value("item_dropped_count")
+                continue
+            self.stats.inc_value("item_scraped_count")
+
+        if itens and self.ao_concluir:
+            self.ao_concluir(cidade)
+
+    async def coletar(self, urls):
+        """Busca e processa as URLs de um iterador com `concorrencia` workers."""
+        import aiohttp
+
+        conector = aiohttp.TCPConnector(limit=self.concorrencia, keepalive_timeout=30, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(
+            connector=conector, headers={"User-Agent": self.user_agent},
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        ) as sessao:
+
+            async def worker():
+                # iterador compartilhado: cada URL sai para um worker só
+                for url in urls:
+                    if not await self._permitido(sessao, url):
+                        continue
+                    response = await self.buscar(sessao, url)
+                    if response is None:
+                        continue
+                    if self.escritor is None:
+                        self.processar(response)
+                    else:
+                        # o worker espera a gravação da sua página: no máximo
+                        # `concorrencia` respostas na fila do escritor
+                        await asyncio.get_running_loop().run_in_executor(self.escritor, self.processar, response)
+
+            await asyncio.gather(*(worker() for _ in range(self.concorrencia)))
+
+
+def executar(catalogo=None, base_url: str = None, db_path=None, arquivo_dir=None, lote: int = None,
+             metricas: bool = True, checkpoint: bool = config.CHECKPOINT_ENABLED, **opcoes) -> dict:
+    """Coleta o catálogo inteiro e devolve as stats; `opcoes` vão para o ColetorAsync."""
+    catalogo = catalogo or config.CIDADES_CATALOGO or CATALOGO_PADRAO
+    base_url = (base_url or BASE_URL).rstrip("/")
+    db_path = db_path or config.RAW_DB_PATH or DB_PATH
+    lote = lote or config.RAW_DB_LOTE
+
+    stats = Contadores()
+    pipelines = [ValidaPrevisaoPipeline(stats)]
+    if arquivo_dir is not False and config.ARQUIVO_PARQUET_ENABLED and importlib.util.find_spec("pyarrow"):
+        pipelines.append(ArquivoParquetPipeline(
+            arquivo_dir or config.ARQUIVO_PARQUET_DIR or ARQUIVO_DIR, config.ARQUIVO_PARQUET_LOTE, stats,
+        ))
+    raw = RawSQLitePipeline(db_path, lote, stats)
+    pipelines.append(raw)
+
+    # thread única dos pipelines: abre, grava, faz checkpoint e fecha
+    escritor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipelines")
+
+    def no_escritor(funcao, *args):
+        return escritor.submit(funcao, *args).result()
+
+    for pipeline in pipelines:
+        if hasattr(pipeline, "open_spider"):
+            no_escritor(pipeline.open_spider)
+
+    feitas = set()
+    ao_concluir = None
+    if checkpoint:
+        job = job_checkpoint({"CHECKPOINT_JOB": config.CHECKPOINT_JOB})
+        feitas = no_escritor(ler_checkpoint, raw.conn, job)
+        if feitas:
+            print(f"♻️  checkpoint {job}: {len(feitas)} cidades já coletadas, retomando")
+
+        def ao_concluir(cidade):
+            raw.pagina_concluida(job, cidade)
+
+    def pendentes():
+        for cidade in ler_catalogo(catalogo):
+            if cidade["slug"] in feitas:
+                stats.inc_value("coleta/checkpoint_puladas")
+                continue
+            yield f"{base_url}/{cidade['city_id']}/{cidade['slug']}"
+
+    coletor = ColetorAsync(pipelines, stats, ao_concluir=ao_concluir, escritor=escritor, **opcoes)
+    inicio = time.perf_counter()
+    try:
+        asyncio.run(coletor.coletar(pendentes()))
+    finally:
+        for pipeline in pipelines:
+            if hasattr(pipeline, "close_spider"):
+                no_escritor(pipeline.close_spider)
+        escritor.shutdown()
+    segundos = time.perf_counter() - inicio
+
+    respostas = stats["response_received_count"]
+    latencias = list(coletor.latencias.values())
+    print(f"🕷️  {respostas} respostas, {stats['item_scraped_count']} itens em {segundos:.1f}s "
+          f"({respostas / segundos if segundos else 0:.1f}/s) | retries {stats['retry/count']}, "
+          f"desistências {stats['retry/max_reached']}")
+
+    if metricas:
+        registrar_metricas("coleta_async", {
+            "segundos": segundos,
+            "respostas": respostas,
+            "respostas_por_s": respostas / segundos if segundos else None,
+            "bytes": stats["downloader/response_bytes"],
+            "latencia_p50_ms": percentil(latencias, 50),
+            "latencia_p95_ms": percentil(latencias, 95),
+            "latencia_p99_ms": percentil(latencias, 99),
+            "latencia_max_ms": max(latencias, default=None),
+            "linhas": stats["item_scraped_count"],
+            "itens_descartados": sum(coletor.descartes.values()),
+            "erros_parse": sum(coletor.erros.values()),
+            "retries": stats["retry/count"],
+            "pico_memoria_mb": pico_memoria_mb(),
+        }, {
+            "latencia_ms": coletor.latencias,
+            "erros_parse": dict(coletor.erros),
+            "itens_descartados": dict(coletor.descartes),
+        }, db_path=db_path)
+    return stats.get_stats()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalogo", type=Path, help="CSV de cidades (padrão: o do settings.py)")
+    parser.add_argument("--base-url", help="padrão: o site do Climatempo")
+    parser.add_argument("--db", type=Path, help="banco da raw (padrão: RAW_DB_PATH ou dataset_climatempo.db)")
+    parser.add_argument("--arquivo", type=Path, help="diretório do arquivo Parquet")
+    parser.add_argument("--sem-arquivo", action="store_true", help="não arquiva em Parquet")
+    parser.add_argument("--concorrencia", type=int, default=config.CONCURRENT_REQUESTS, help="requisições no total")
+    parser.add_argument("--por-host", type=int, default=config.CONCURRENT_REQUESTS_PER_DOMAIN,
+                        help="requisições simultâneas por host")
+    parser.add_argument("--taxa", type=float, default=TAXA_PADRAO,
+                        help="páginas/s por host (0 = sem limite; padrão: 1/DOWNLOAD_DELAY)")
+    parser.add_argument("--rajada", type=int, help="fichas acumuladas no balde (padrão: --por-host)")
+    parser.add_argument("--tentativas", type=int, default=2, help="retries por página")
+    parser.add_argument("--backoff", type=float, default=0.5, help="espera base do retry (s), dobra a cada tentativa")
+    parser.add_argument("--timeout", type=float, default=30.0, help="timeout por requisição (s)")
+    parser.add_argument("--lote", type=int, help="linhas por commit na raw (padrão: RAW_DB_LOTE)")
+    parser.add_argument("--ignorar-robots", action="store_true", help="não lê o robots.txt")
+    parser.add_argument("--sem-metricas", action="store_true", help="não grava em pipeline_run_metrics")
+    parser.add_argument("--sem-checkpoint", action="store_true", help="busca todas as cidades, mesmo as já feitas")
+    args = parser.parse_args()
+
+    executar(
+        args.catalogo, args.base_url, args.db, False if args.sem_arquivo else args.arquivo, args.lote,
+        not args.sem_metricas, config.CHECKPOINT_ENABLED and not args.sem_checkpoint,
+        concorrencia=args.concorrencia, por_host=args.por_host, taxa=args.taxa, rajada=args.rajada,
+        tentativas=args.tentativas, backoff=args.backoff, timeout=args.timeout,
+        obedecer_robots=config.ROBOTSTXT_OBEY and not args.ignorar_robots,
+    )
@@ -0,0 +1,136 @@
+"""Arquivo da bronze em Parquet, particionado por dia de coleta e cidade.
+
+    bronze/arquivo/dt=2026-03-02/cidade=saopaulo-sp/<run>-<lote>-0.parquet
+
+Cada crawl grava arquivos novos (nada é sobrescrito), então o diretório é o
+histórico completo e re-executável da coleta. A leitura usa o particionamento
+hive: um filtro de datas/cidades só abre as pastas que casam (partition
+pruning), sem varrer o resto.
+
+Reconstruir a raw de um período a partir do arquivo:
+
+    python bronze/transform/arquivo_bronze.py --desde 2026-03-01 --ate 2026-03-07
+"""
+import argparse
+import uuid
+from datetime import date
+from pathlib import Path
+
+from raw_db import (
+    COLUNAS_RAW,
+    DB_PATH,
+    TAMANHO_LOTE,
+    carregar_linhas,
+    conectar,
+    garantir_schema_raw,
+    registrar_versao,
+)
+
+ARQUIVO_DIR = Path(__file__).resolve().parents[1] / "arquivo"
+
+
+def _schema():
+    # pyarrow só é importado aqui: quem não usa o arquivo não precisa dele
+    import pyarrow as pa
+
+    tipos = {"lead_time": pa.int64(), "tmin": pa.int64(), "tmax": pa.int64(), "chuva": pa.float64()}
+    return pa.schema(
+        [(col, tipos.get(col, pa.string())) for col in COLUNAS_RAW] + [("dt", pa.string())]
+    )
+
+
+def _particionamento():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return ds.partitioning(pa.schema([("dt", pa.string()), ("cidade", pa.string())]), flavor="hive")
+
+
+def escrever_particoes(linhas, base_dir=ARQUIVO_DIR, prefixo: str = None) -> int:
+    """Grava tuplas na ordem de COLUNAS_RAW (as de normalizar_registro) no arquivo.
+
+    `prefixo` identifica o lote no nome dos arquivos; cada chamada cria
+    arquivos novos nas partições dt=/cidade= que aparecem nas linhas.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    linhas = list(linhas)
+    if not linhas:
+        return 0
+
+    colunas = {col: [linha[i] for linha in linhas] for i, col in enumerate(COLUNAS_RAW)}
+    # dt = dia (UTC) do dt_ingest, o mesmo DATE(dt_ingest) que a silver usa
+    colunas["dt"] = [(dt_ingest or "")[:10] for dt_ingest in colunas["dt_ingest"]]
+    tabela = pa.table(colunas, schema=_schema())
+
+    ds.write_dataset(
+        tabela,
+        base_dir,
+        format="parquet",
+        partitioning=_particionamento(),
+        basename_template=f"{prefixo or uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        # um lote pode ter milhares de cidades; o padrão do pyarrow para em 1024
+        max_partitions=1 << 20,
+    )
+    return len(linhas)
+
+
+def ler_particoes(desde: date = None, ate: date = None, cidades=None, base_dir=ARQUIVO_DIR,
+                  tamanho_lote=TAMANHO_LOTE):
+    """Gera tuplas (ordem de COLUNAS_RAW) das partições entre `desde` e `ate`.
+
+    O filtro é sobre as colunas de partição, então o pyarrow descarta as
+    pastas fora do intervalo antes de abrir qualquer arquivo. Lê em lotes de
+    `tamanho_lote` linhas, sem carregar o período inteiro na memória.
+    """
+    import pyarrow.dataset as ds
+
+    base_dir = Path(base_dir)
+    if not base_dir.exists():
+        return
+
+    dataset = ds.dataset(base_dir, format="parquet", partitioning=_particionamento())
+
+    filtro = None
+    for condicao in (
+        ds.field("dt") >= desde.isoformat() if desde else None,
+        ds.field("dt") <= ate.isoformat() if ate else None,
+        ds.field("cidade").isin(list(cidades)) if cidades else None,
+    ):
+        if condicao is not None:
+            filtro = condicao if filtro is None else filtro & condicao
+
+    for lote in dataset.to_batches(columns=COLUNAS_RAW, filter=filtro, batch_size=tamanho_lote):
+        colunas = [lote.column(col).to_pylist() for col in COLUNAS_RAW]
+        yield from zip(*colunas)
+
+
+def reconstruir_raw(desde: date = None, ate: date = None, cidades=None, base_dir=ARQUIVO_DIR,
+                    db_path=DB_PATH, tamanho_lote=TAMANHO_LOTE) -> int:
+    """Upsert na raw das linhas arquivadas no período; re-executar não duplica."""
+    conn = conectar(db_path)
+    try:
+        with conn:
+            garantir_schema_raw(conn)
+            total = carregar_linhas(conn, ler_particoes(desde, ate, cidades, base_dir, tamanho_lote), tamanho_lote)
+            if total:
+                registrar_versao(conn)
+    finally:
+        conn.close()
+
+    print(f"✅ Arquivo: {total} linhas de {desde or 'início'} a {ate or 'hoje'} recarregadas na raw")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstrói a raw a partir do arquivo Parquet da bronze")
+    parser.add_argument("--desde", type=date.fromisoformat, help="primeiro dia de coleta (YYYY-MM-DD)")
+    parser.add_argument("--ate", type=date.fromisoformat, help="último dia de coleta (YYYY-MM-DD)")
+    parser.add_argument("--cidade", action="append", dest="cidades", help="slug da cidade (pode repetir)")
+    parser.add_argument("--arquivo", type=Path, default=ARQUIVO_DIR, help="diretório do arquivo")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas por lote")
+    args = parser.parse_args()
+
+    reconstruir_raw(args.desde, args.ate, args.cidades, args.arquivo, tamanho_lote=args.lote)
@@ -0,0 +1,161 @@
+"""Métricas de cada execução da pipeline na tabela pipeline_run_metrics.
+
+Formato longo, uma linha por (run_id, etapa, metrica, chave):
+
+    run_id        manual__2026-03-02T06:00:00 (o run_id do Airflow, via PIPELINE_RUN_ID)
+    etapa         run_scrapy, run_scrapy[2], join_shards, run_transform, run_dbt_silver...
+    metrica       segundos, linhas, linhas_por_s, pico_memoria_mb, latencia_p95_ms...
+    chave         '' para a etapa toda; a cidade ou o modelo dbt quando a métrica é por item
+    valor         número
+
+Quem grava: o MetricasColetaExtension do Scrapy, `medir_etapa` (transform e
+join dos shards) e este script para o run_results.json do dbt:
+
+    python bronze/transform/instrumentacao.py dbt --etapa run_dbt_silver \\
+        --run-results silver-gold/projeto_clima/target/run_results.json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+from raw_db import DB_PATH, conectar, garantir_schema_versao, registrar_versao
+
+METRICAS_TABLE = "pipeline_run_metrics"
+
+
+def run_id_atual() -> str:
+    """Run da DAG (PIPELINE_RUN_ID) ou, fora do Airflow, o minuto atual em UTC."""
+    return os.environ.get("PIPELINE_RUN_ID") or "manual__" + datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M")
+
+
+def garantir_schema_metricas(conn: sqlite3.Connection):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {METRICAS_TABLE} ("
+        "run_id TEXT NOT NULL, "
+        "etapa TEXT NOT NULL, "
+        "metrica TEXT NOT NULL, "
+        "chave TEXT NOT NULL DEFAULT '', "
+        "valor REAL, "
+        "registrado_em TEXT, "
+        "PRIMARY KEY (run_id, etapa, metrica, chave))"
+    )
+    garantir_schema_versao(conn)
+
+
+def registrar_metricas(etapa: str, metricas: dict, por_chave: dict = None, run_id: str = None, db_path=DB_PATH):
+    """Grava as métricas de uma etapa numa transação própria.
+
+    `metricas` é {metrica: valor} da etapa toda; `por_chave` é
+    {metrica: {chave: valor}} (por cidade, por modelo). Re-gravar a mesma
+    etapa no mesmo run sobrescreve. Valores None são ignorados.
+    """
+    run_id = run_id or run_id_atual()
+    agora = datetime.now(timezone.utc).isoformat()
+    linhas = [(run_id, etapa, m, "", v, agora) for m, v in metricas.items() if v is not None]
+    for metrica, valores in (por_chave or {}).items():
+        linhas += [(run_id, etapa, metrica, str(k), v, agora) for k, v in valores.items() if v is not None]
+
+    conn = conectar(db_path)
+    try:
+        with conn:
+            garantir_schema_metricas(conn)
+            conn.executemany(
+                f"INSERT INTO {METRICAS_TABLE} (run_id, etapa, metrica, chave, valor, registrado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (run_id, etapa, metrica, chave) DO UPDATE SET "
+                "valor = excluded.valor, registrado_em = excluded.registrado_em",
+                linhas,
+            )
+            registrar_versao(conn, METRICAS_TABLE, run_id)
+    finally:
+        conn.close()
+    return len(linhas)
+
+
+def percentil(valores, p: float):
+    """Percentil `p` (0-100) por posição mais próxima; None sem valores."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados)) - 1))]
+
+
+def pico_memoria_mb():
+    """Pico de memória residente do processo (None fora de Unix)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devolve KiB; macOS, bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+@contextmanager
+def medir_etapa(etapa: str, run_id: str = None, db_path=DB_PATH):
+    """Mede tempo, linhas/s e pico de memória de um bloco e grava no fim.
+
+        with medir_etapa("run_transform") as m:
+            m["linhas"] = main_streaming(...)
+
+    Só grava se o bloco terminar sem erro; uma falha de gravação das
+    métricas só gera um aviso, não derruba a etapa.
+    """
+    metricas = {}
+    t0 = time.perf_counter()
+    yield metricas
+    segundos = time.perf_counter() - t0
+    metricas["segundos"] = segundos
+    metricas["pico_memoria_mb"] = pico_memoria_mb()
+    if metricas.get("linhas") is not None and segundos > 0:
+        metricas["linhas_por_s"] = metricas["linhas"] / segundos
+    try:
+        registrar_metricas(etapa, metricas, run_id=run_id, db_path=db_path)
+    except sqlite3.Error as e:
+        print(f"⚠️  Métricas de {etapa} não gravadas: {e}")
+
+
+def metricas_dbt(run_results: dict):
+    """run_results.json do dbt -> (métricas da etapa, métricas por modelo)."""
+    # on-run-start/end (operation.*) não são modelos
+    resultados = [r for r in run_results.get("results", []) if not r["unique_id"].startswith("operation.")]
+    modelos = {"segundos": {}, "linhas": {}}
+    status = {}
+    for resultado in resultados:
+        modelo = resultado["unique_id"].split(".")[-1]
+        modelos["segundos"][modelo] = resultado.get("execution_time")
+        modelos["linhas"][modelo] = (resultado.get("adapter_response") or {}).get("rows_affected")
+        status[resultado.get("status")] = status.get(resultado.get("status"), 0) + 1
+
+    etapa = {
+        "segundos": run_results.get("elapsed_time"),
+        "modelos": len(resultados),
+        "modelos_com_erro": status.get("error", 0),
+    }
+    return etapa, modelos
+
+
+def registrar_dbt(etapa: str, run_results_path: Path, run_id: str = None, db_path=DB_PATH) -> int:
+    run_results = json.loads(Path(run_results_path).read_text(encoding="utf-8"))
+    metricas, por_modelo = metricas_dbt(run_results)
+    total = registrar_metricas(etapa, metricas, por_modelo, run_id, db_path)
+    print(f"📈 {etapa}: {metricas['modelos']} modelos em {metricas['segundos'] or 0:.1f}s ({total} métricas)")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grava métricas da pipeline em pipeline_run_metrics")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    dbt = sub.add_parser("dbt", help="lê o run_results.json de um dbt run")
+    dbt.add_argument("--etapa", required=True, help="nome da etapa, ex run_dbt_silver")
+    dbt.add_argument("--run-results", type=Path, required=True, help="target/run_results.json")
+    dbt.add_argument("--run-id", help="padrão: PIPELINE_RUN_ID ou o minuto atual")
+    args = parser.parse_args()
+
+    registrar_dbt(args.etapa, args.run_results, args.run_id)
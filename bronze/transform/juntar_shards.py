@@ -0,0 +1,106 @@
+"""Junta na raw principal as saídas de uma coleta dividida em shards.
+
+Cada shard do spider (`-a shard=i -a shards=N`) grava num banco próprio
+(RAW_DB_PATH = <pasta>/shard_<i>.db) e, se pedido, num JSONL próprio. Aqui
+todos os bancos da pasta viram um upsert só na raw_climatempo_previsao, numa
+única transação: ou a coleta do dia entra inteira, ou nada muda. Os hashes
+de conteúdo (coleta_conteudo) vêm junto.
+
+    python bronze/transform/juntar_shards.py --pasta bronze/shards/2026-03-02 \\
+        --jsonl bronze/coleta/coleta/data.jsonl
+"""
+import argparse
+import shutil
+import sqlite3
+from pathlib import Path
+
+from instrumentacao import medir_etapa
+from raw_db import (
+    COLUNAS_RAW,
+    CONTEUDO_TABLE,
+    DB_PATH,
+    RAW_TABLE,
+    TAMANHO_LOTE,
+    carregar_linhas,
+    conectar,
+    garantir_schema_raw,
+    registrar_versao,
+    salvar_conteudo,
+)
+
+
+def _abrir_shard(caminho: Path) -> sqlite3.Connection:
+    # só leitura: o shard já terminou, e assim um shard corrompido não é alterado
+    return sqlite3.connect(f"{caminho.resolve().as_uri()}?mode=ro", uri=True)
+
+
+def _tem_tabela(conn: sqlite3.Connection, tabela: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (tabela,)).fetchone() is not None
+
+
+def juntar_jsonl(pasta: Path, destino: Path) -> int:
+    """Concatena os shard_*.jsonl da pasta em `destino` (sobrescreve)."""
+    arquivos = sorted(pasta.glob("shard_*.jsonl"))
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    with open(destino, "wb") as saida:
+        for arquivo in arquivos:
+            with open(arquivo, "rb") as entrada:
+                shutil.copyfileobj(entrada, saida)
+    return len(arquivos)
+
+
+def juntar_shards(pasta: Path, db_path=DB_PATH, tamanho_lote=TAMANHO_LOTE, apagar=False,
+                  padrao: str = "shard_*.db") -> int:
+    shards = sorted(pasta.glob(padrao))
+    if not shards:
+        print(f"⚠️  Nenhum shard em {pasta}")
+        return 0
+
+    cols = ", ".join(f'"{c}"' for c in COLUNAS_RAW)
+    conn = conectar(db_path)
+    total = 0
+    try:
+        with conn:
+            garantir_schema_raw(conn)
+            for caminho in shards:
+                shard = _abrir_shard(caminho)
+                try:
+                    if not _tem_tabela(shard, RAW_TABLE):
+                        print(f"⚠️  {caminho.name} sem {RAW_TABLE}, ignorado")
+                        continue
+                    linhas = carregar_linhas(conn, shard.execute(f"SELECT {cols} FROM {RAW_TABLE}"), tamanho_lote)
+                    if _tem_tabela(shard, CONTEUDO_TABLE):
+                        salvar_conteudo(conn, shard.execute(f"SELECT cidade, dia, hash FROM {CONTEUDO_TABLE}"))
+                finally:
+                    shard.close()
+                print(f"   {caminho.name}: {linhas} linhas")
+                total += linhas
+            if total:
+                registrar_versao(conn)
+    finally:
+        conn.close()
+
+    if apagar:
+        for caminho in shards:
+            for arquivo in (caminho, *(Path(f"{caminho}{sufixo}") for sufixo in ("-wal", "-shm"))):
+                arquivo.unlink(missing_ok=True)
+
+    print(f"✅ {len(shards)} shards, {total} linhas na raw")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Junta os bancos dos shards da coleta na raw principal")
+    parser.add_argument("--pasta", type=Path, required=True, help="pasta com os shard_<i>.db da coleta")
+    parser.add_argument("--jsonl", type=Path, help="também concatena os shard_<i>.jsonl neste arquivo")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas por lote")
+    parser.add_argument("--apagar", action="store_true", help="remove os arquivos dos shards depois de juntar")
+    args = parser.parse_args()
+
+    if args.jsonl:
+        print(f"📄 {juntar_jsonl(args.pasta, args.jsonl)} JSONL de shards em {args.jsonl}")
+    with medir_etapa("join_shards") as metricas:
+        metricas["linhas"] = juntar_shards(args.pasta, tamanho_lote=args.lote, apagar=args.apagar)
+    if args.jsonl and args.apagar:
+        for arquivo in args.pasta.glob("shard_*.jsonl"):
+            arquivo.unlink()
@@ -0,0 +1,298 @@
+"""Acesso à tabela raw_climatempo_previsao no SQLite.
+
+Concentra o schema da raw, a chave natural usada no upsert, a carga em lotes,
+o controle de high-water mark do transform incremental, o checkpoint da
+coleta e a versão dos dados que o dashboard usa para invalidar o cache.
+"""
+import hashlib
+import json
+import sqlite3
+from datetime import date, datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+RAW_TABLE = "raw_climatempo_previsao"
+WATERMARK_TABLE = "transform_watermark"
+VERSAO_TABLE = "pipeline_versao"
+CONTEUDO_TABLE = "coleta_conteudo"
+CHECKPOINT_TABLE = "coleta_checkpoint"
+
+# colunas na ordem em que o spider gera os itens
+COLUNAS_RAW = [
+    "cidade",
+    "atualouprevisao",
+    "lead_time",
+    "tmin",
+    "tmax",
+    "descricao",
+    "chuva",
+    "dt_ingest",
+    "data_previsao",
+]
+
+# tipos das colunas numéricas (o resto é TEXT); linhas antigas com "18°"
+# continuam cabendo porque o SQLite guarda como texto o que não converte
+TIPOS_RAW = {"lead_time": "INTEGER", "tmin": "INTEGER", "tmax": "INTEGER", "chuva": "REAL"}
+
+# uma coleta (dt_ingest) gera uma linha por cidade e lead_time
+CHAVE_NATURAL = ["cidade", "atualouprevisao", "lead_time", "dt_ingest"]
+
+DB_PATH = Path(__file__).resolve().parents[2] / "dataset_climatempo.db"
+
+# linhas por executemany na carga em streaming
+TAMANHO_LOTE = 5000
+
+
+def conectar(db_path=DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path), timeout=30)
+    # WAL: leitores (dashboard/DBeaver) não bloqueiam a carga e vice-versa;
+    # NORMAL só faz fsync no checkpoint, seguro com WAL e bem mais rápido
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def garantir_schema_raw(conn: sqlite3.Connection, colunas=COLUNAS_RAW):
+    """Cria/atualiza a raw e o índice único da chave natural.
+
+    Bancos antigos não têm lead_time e podem ter duplicatas do append antigo:
+    preenche o lead_time a partir de atualouprevisao e mantém só a última cópia
+    de cada chave antes de criar o índice.
+    """
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {RAW_TABLE} ("
+        + ", ".join(f'"{c}" {TIPOS_RAW.get(c, "TEXT")}' for c in COLUNAS_RAW)
+        + ")"
+    )
+
+    existentes = {row[1] for row in conn.execute(f"PRAGMA table_info({RAW_TABLE})")}
+    for col in dict.fromkeys([*COLUNAS_RAW, *colunas]):
+        if col not in existentes:
+            conn.execute(f'ALTER TABLE {RAW_TABLE} ADD COLUMN "{col}"')
+
+    chave = ", ".join(CHAVE_NATURAL)
+    indice = f"ux_{RAW_TABLE}_chave"
+    tem_indice = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (indice,)
+    ).fetchone()
+    if not tem_indice:
+        # migração única (o índice só existe depois dela): sem isso o UPDATE
+        # varreria a raw inteira a cada conexão
+        conn.execute(
+            f"UPDATE {RAW_TABLE} "
+            "SET lead_time = CASE WHEN atualouprevisao = 'atual' THEN 0 ELSE 1 END "
+            "WHERE lead_time IS NULL"
+        )
+        conn.execute(
+            f"DELETE FROM {RAW_TABLE} WHERE rowid NOT IN "
+            f"(SELECT MAX(rowid) FROM {RAW_TABLE} GROUP BY {chave})"
+        )
+        conn.execute(f"CREATE UNIQUE INDEX {indice} ON {RAW_TABLE} ({chave})")
+
+    # a silver filtra (incremental) e particiona o dedup por DATE(dt_ingest):
+    # índice de expressão com a mesma expressão para o SQLite conseguir usar
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS ix_{RAW_TABLE}_data_ingest "
+        f"ON {RAW_TABLE} (DATE(dt_ingest), cidade, lead_time)"
+    )
+
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} ("
+        "arquivo TEXT PRIMARY KEY, "
+        "offset_bytes INTEGER NOT NULL, "
+        "assinatura TEXT, "
+        "atualizado_em TEXT)"
+    )
+    garantir_schema_versao(conn)
+
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {CONTEUDO_TABLE} ("
+        "cidade TEXT PRIMARY KEY, "
+        "dia TEXT NOT NULL, "
+        "hash TEXT NOT NULL, "
+        "atualizado_em TEXT)"
+    )
+
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+        "job TEXT NOT NULL, "
+        "cidade TEXT NOT NULL, "
+        "concluido_em TEXT, "
+        "PRIMARY KEY (job, cidade))"
+    )
+
+
+def sql_upsert(colunas=COLUNAS_RAW) -> str:
+    """INSERT ... ON CONFLICT na chave natural: re-execuções não duplicam linhas."""
+    cols = ", ".join(f'"{c}"' for c in colunas)
+    marcadores = ", ".join("?" for _ in colunas)
+    atualiza = ", ".join(f'"{c}" = excluded."{c}"' for c in colunas if c not in CHAVE_NATURAL)
+    return (
+        f"INSERT INTO {RAW_TABLE} ({cols}) VALUES ({marcadores}) "
+        f"ON CONFLICT ({', '.join(CHAVE_NATURAL)}) DO UPDATE SET {atualiza}"
+    )
+
+
+def upsert_to_sql(table, conn, keys, data_iter):
+    """`method` do DataFrame.to_sql que grava com upsert em vez de INSERT puro."""
+    conn.exec_driver_sql(sql_upsert(keys), list(data_iter))
+
+
+def em_lotes(iteravel, tamanho):
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def carregar_linhas(conn: sqlite3.Connection, linhas, tamanho_lote=TAMANHO_LOTE) -> int:
+    """Upsert de tuplas já normalizadas (ordem de COLUNAS_RAW) em lotes.
+
+    Não faz commit: quem chama decide a transação (normalmente `with conn:`).
+    """
+    sql = sql_upsert()
+    total = 0
+    for lote in em_lotes(linhas, tamanho_lote):
+        conn.executemany(sql, lote)
+        total += len(lote)
+    return total
+
+
+def normalizar_registro(registro: dict) -> tuple:
+    """Item do spider -> tupla na ordem de COLUNAS_RAW, com strings sem espaços.
+
+    Aceita tanto o item já tipado pelo pipeline da coleta quanto linhas
+    antigas do JSONL com texto cru ("18°", "2.4mm").
+    """
+    valores = []
+    for col in COLUNAS_RAW:
+        valor = registro.get(col)
+        if col == "lead_time" and valor is None:
+            valor = 0 if registro.get("atualouprevisao") == "atual" else 1
+        elif isinstance(valor, str):
+            valor = valor.strip()
+        elif isinstance(valor, date):
+            valor = valor.isoformat()
+        valores.append(valor)
+    return tuple(valores)
+
+
+# ---------------------------------------------------
+# High-water mark do transform incremental
+# ---------------------------------------------------
+def _assinatura(path: Path) -> str:
+    # hash da primeira linha: se o arquivo foi sobrescrito (scrapy -O) ela muda
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.readline()).hexdigest()
+
+
+def ler_watermark(conn: sqlite3.Connection, path: Path) -> int:
+    """Offset (em bytes) até onde o arquivo já foi ingerido; 0 se mudou."""
+    row = conn.execute(
+        f"SELECT offset_bytes, assinatura FROM {WATERMARK_TABLE} WHERE arquivo = ?",
+        (str(path.resolve()),),
+    ).fetchone()
+    if not row:
+        return 0
+
+    offset, assinatura = row
+    if offset > path.stat().st_size or assinatura != _assinatura(path):
+        return 0
+    return offset
+
+
+def salvar_watermark(conn: sqlite3.Connection, path: Path, offset: int):
+    conn.execute(
+        f"INSERT INTO {WATERMARK_TABLE} (arquivo, offset_bytes, assinatura, atualizado_em) "
+        "VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (arquivo) DO UPDATE SET "
+        "offset_bytes = excluded.offset_bytes, "
+        "assinatura = excluded.assinatura, "
+        "atualizado_em = excluded.atualizado_em",
+        (str(path.resolve()), offset, _assinatura(path), datetime.now(timezone.utc).isoformat()),
+    )
+
+
+def ler_jsonl_desde(path: Path, offset: int, posicao: dict):
+    """Gera os registros do JSONL a partir de `offset`, uma linha por vez.
+
+    `posicao["offset"]` acompanha o fim da última linha completa lida, para
+    virar o novo high-water mark. Uma última linha sem '\\n' (arquivo ainda
+    sendo escrito) fica para a próxima execução.
+    """
+    posicao["offset"] = offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for linha in f:
+            if not linha.endswith(b"\n"):
+                break
+            posicao["offset"] += len(linha)
+            linha = linha.strip()
+            if linha:
+                yield json.loads(linha)
+
+
+# ---------------------------------------------------
+# Hash do bloco de previsão por cidade (coleta condicional)
+# ---------------------------------------------------
+# último hash do bloco de 15 dias gravado na raw para cada cidade, com o dia
+# da coleta: uma página igual no mesmo dia não precisa ser parseada de novo
+def ler_conteudo(conn: sqlite3.Connection, dia: str) -> dict:
+    return dict(conn.execute(f"SELECT cidade, hash FROM {CONTEUDO_TABLE} WHERE dia = ?", (dia,)))
+
+
+def salvar_conteudo(conn: sqlite3.Connection, registros):
+    """Grava (cidade, dia, hash). Não faz commit: vai na transação das linhas."""
+    agora = datetime.now(timezone.utc).isoformat()
+    conn.executemany(
+        f"INSERT INTO {CONTEUDO_TABLE} (cidade, dia, hash, atualizado_em) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (cidade) DO UPDATE SET "
+        "dia = excluded.dia, hash = excluded.hash, atualizado_em = excluded.atualizado_em",
+        [(cidade, dia, hash_, agora) for cidade, dia, hash_ in registros],
+    )
+
+
+# ---------------------------------------------------
+# Checkpoint da coleta (retomar um crawl que caiu no meio)
+# ---------------------------------------------------
+# cidades cujas linhas já estão na raw para um job (o run da DAG ou o dia):
+# um crawl repetido no mesmo job só busca as que faltam
+def ler_checkpoint(conn: sqlite3.Connection, job: str) -> set:
+    return {row[0] for row in conn.execute(f"SELECT cidade FROM {CHECKPOINT_TABLE} WHERE job = ?", (job,))}
+
+
+def salvar_checkpoint(conn: sqlite3.Connection, registros):
+    """Grava (job, cidade). Não faz commit: vai na transação das linhas."""
+    agora = datetime.now(timezone.utc).isoformat()
+    conn.executemany(
+        f"INSERT INTO {CHECKPOINT_TABLE} (job, cidade, concluido_em) VALUES (?, ?, ?) "
+        "ON CONFLICT (job, cidade) DO UPDATE SET concluido_em = excluded.concluido_em",
+        [(job, cidade, agora) for job, cidade in registros],
+    )
+
+
+# ---------------------------------------------------
+# Versão dos dados (invalidação do cache do dashboard)
+# ---------------------------------------------------
+# uma linha por tabela; quem grava numa tabela incrementa a versão dela na
+# mesma transação (spider/transform na raw, post-hook do dbt na silver/gold)
+def garantir_schema_versao(conn: sqlite3.Connection):
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {VERSAO_TABLE} ("
+        "tabela TEXT PRIMARY KEY, "
+        "versao INTEGER NOT NULL, "
+        "run_id TEXT, "
+        "atualizado_em TEXT)"
+    )
+
+
+def registrar_versao(conn: sqlite3.Connection, tabela: str = RAW_TABLE, run_id: str = None):
+    """Incrementa a versão de `tabela`. Não faz commit, como carregar_linhas."""
+    conn.execute(
+        f"INSERT INTO {VERSAO_TABLE} (tabela, versao, run_id, atualizado_em) "
+        "VALUES (?, 1, ?, ?) "
+        "ON CONFLICT (tabela) DO UPDATE SET "
+        "versao = versao + 1, "
+        "run_id = excluded.run_id, "
+        "atualizado_em = excluded.atualizado_em",
+        (tabela, run_id, datetime.now(timezone.utc).isoformat()),
+    )
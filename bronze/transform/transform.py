@@ -1,11 +1,35 @@
+import argparse
+import csv
 import json
 from pathlib import Path
-import pandas as pd
-from sqlalchemy import create_engine
 
-def main():
+from instrumentacao import medir_etapa
+from raw_db import (
+    COLUNAS_RAW,
+    DB_PATH,
+    RAW_TABLE,
+    TAMANHO_LOTE,
+    carregar_linhas,
+    conectar,
+    garantir_schema_raw,
+    ler_jsonl_desde,
+    ler_watermark,
+    normalizar_registro,
+    registrar_versao,
+    salvar_watermark,
+    upsert_to_sql,
+)
+
+INPUT_PATH = Path(__file__).parent.parent / "coleta" / "data.jsonl"
+CSV_PATH = Path(__file__).parent / "saídatransform.csv"
+
+def main(input_path=INPUT_PATH, db_path=DB_PATH, csv_path=CSV_PATH, salvar_csv=True):
+    # pandas/sqlalchemy só no modo DataFrame: a carga em streaming não precisa deles
+    import pandas as pd
+    from sqlalchemy import create_engine
+
     # caminho do arquivo de entrada
-    input_path = Path(__file__).parent.parent / "coleta" / "data.jsonl"
+    input_path = Path(input_path)
 
     if not input_path.exists():
         raise FileNotFoundError(f"Arquivo não encontrado: {input_path.resolve()}")
@@ -24,6 +48,14 @@ def main():
         # fallback: JSON Lines (1 objeto por linha)
         df = pd.read_json(input_path, lines=True)
 
+    # lead_time (D+0..D+14): arquivos antigos só tinham HOJE/AMANHA
+    if "lead_time" not in df.columns:
+        df["lead_time"] = (df["atualouprevisao"] != "atual").astype(int)
+
+    # só as colunas da raw, como no streaming: campos de controle do feed
+    # (conteudo_hash, ...) não viram colunas; as que faltam ficam nulas
+    df = df.reindex(columns=COLUNAS_RAW)
+
     # limpeza básica de strings (opcional, mas ajuda)
     for col in df.select_dtypes(include="object").columns:
         df[col] = df[col].astype(str).str.strip()
@@ -33,20 +65,19 @@ def main():
     print(df.head())
 
     # se quiser já salvar uma versão em csv/parquet pra facilitar debug
-    output_dir = Path(__file__).parent
-    output_dir.mkdir(parents=True, exist_ok=True)
+    if salvar_csv:
+        csv_path = Path(csv_path)
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
 
-    df.to_csv(output_dir / "saídatransform.csv", index=False, encoding="utf-8")
+        df.to_csv(csv_path, index=False, encoding="utf-8")
 
-    print(f"📁 Salvo em: {(output_dir / 'saídatransform.csv').resolve()}")
+        print(f"📁 Salvo em: {csv_path.resolve()}")
 
     # --- PARTE 2: SALVAR NO BANCO DE DADOS ---
     
     # Usando Path para evitar problemas com barras \ ou /
-    db_file = "dataset_climatempo.db"
-    # Isso pega a pasta 'projeto_screap' (sobe 2 níveis de onde está o script)
-    base_dir = Path(__file__).parent.parent.parent 
-    full_db_path = base_dir / db_file
+    # (por padrão dataset_climatempo.db na raiz do projeto, 2 níveis acima deste script)
+    full_db_path = Path(db_path)
 
     print(f"Tentando salvar em: {full_db_path.resolve()}")
 
@@ -57,15 +88,87 @@ def main():
     try:
         # Abrindo a conexão de forma explícita
         with engine.begin() as connection:
+            garantir_schema_raw(connection.connection.driver_connection)
+            # upsert na chave natural: rodar de novo o mesmo arquivo não duplica
             df.to_sql(
-                name='raw_climatempo_previsao', 
+                name=RAW_TABLE, 
                 con=connection, 
                 if_exists='append', 
-                index=False
+                index=False,
+                method=upsert_to_sql
             )
+            registrar_versao(connection.connection.driver_connection)
         print(f"🚀 BOA! Dados inseridos na tabela 'raw_climatempo_previsao'!")
+        return len(df)
     except Exception as e:
         print(f"❌ Erro ao abrir o banco: {e}")
 
+def espelhar_csv(linhas, csv_path):
+    """Repassa as linhas adiante gravando a cópia de debug uma a uma."""
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUNAS_RAW)
+        for linha in linhas:
+            writer.writerow(linha)
+            yield linha
+
+def main_streaming(input_path=INPUT_PATH, db_path=DB_PATH, incremental=False,
+                   tamanho_lote=TAMANHO_LOTE, csv_path=CSV_PATH, salvar_csv=True):
+    """Carrega o JSONL em streaming: gerador -> normaliza -> executemany em lotes.
+
+    A memória fica limitada ao tamanho do lote, independente do tamanho do
+    arquivo. Tudo roda numa transação só (WAL + synchronous=NORMAL). Com
+    `incremental=True` começa do high-water mark em vez do início do arquivo.
+    Aceita só JSON Lines (o formato que o scrapy gera com -o/-O *.jsonl).
+    """
+    input_path = Path(input_path)
+
+    if not input_path.exists():
+        raise FileNotFoundError(f"Arquivo não encontrado: {input_path.resolve()}")
+
+    conn = conectar(db_path)
+    try:
+        with conn:
+            garantir_schema_raw(conn)
+            inicio = ler_watermark(conn, input_path) if incremental else 0
+
+            posicao = {}
+            linhas = (normalizar_registro(r) for r in ler_jsonl_desde(input_path, inicio, posicao))
+            if salvar_csv:
+                linhas = espelhar_csv(linhas, csv_path)
+
+            total = carregar_linhas(conn, linhas, tamanho_lote)
+            salvar_watermark(conn, input_path, posicao["offset"])
+            if total:
+                registrar_versao(conn)
+
+        modo = "Incremental" if incremental else "Streaming"
+        print(f"✅ {modo}: {total} linhas upsert em lotes de {tamanho_lote} "
+              f"(bytes {inicio} → {posicao['offset']} de {input_path.name})")
+    finally:
+        conn.close()
+
+    return total
+
+def main_incremental(input_path=INPUT_PATH, db_path=DB_PATH, **kwargs):
+    """Ingere só as linhas novas do JSONL desde o último high-water mark."""
+    return main_streaming(input_path, db_path, incremental=True, **kwargs)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Carrega o JSONL da coleta na raw_climatempo_previsao.")
+    parser.add_argument("--input", default=INPUT_PATH, help="arquivo JSONL gerado pelo scrapy")
+    parser.add_argument("--incremental", action="store_true",
+                        help="lê só as linhas novas desde a última execução (upsert na chave natural)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="carrega o arquivo inteiro em streaming, sem pandas (memória limitada ao lote)")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE, help="linhas por executemany")
+    parser.add_argument("--sem-csv", action="store_true", help="não grava o saídatransform.csv de debug")
+    args = parser.parse_args()
+
+    # tempo, linhas/s e pico de memória em pipeline_run_metrics
+    with medir_etapa("run_transform") as metricas:
+        if args.incremental or args.streaming:
+            metricas["linhas"] = main_streaming(args.input, incremental=args.incremental,
+                                                tamanho_lote=args.lote, salvar_csv=not args.sem_csv)
+        else:
+            metricas["linhas"] = main(args.input, salvar_csv=not args.sem_csv)
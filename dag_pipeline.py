@@ -1,9 +1,55 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.bash import BashOperator
+from airflow.operators.python import PythonOperator
 
 PROJECT_DIR = "/opt/project"
 
+# O scrapy grava direto na raw_climatempo_previsao (RawSQLitePipeline).
+# O JSONL fica só como arquivo da coleta; deixe vazio para não gerar.
+ARQUIVO_JSONL = "coleta/data.jsonl"
+
+# Coleta dividida em N shards (uma task mapeada por shard, em qualquer worker).
+# Cada shard grava no seu banco em SHARDS_DIR/<ds>/ e o join junta tudo na raw.
+# O orçamento de politeness do domínio é dividido entre os shards pelo spider;
+# N_SHARDS não pode passar de CONCURRENT_REQUESTS_PER_DOMAIN (4 nos settings),
+# senão o spider recusa a coleta.
+# Com workers em nós diferentes, PROJECT_DIR precisa ser um volume compartilhado.
+N_SHARDS = 4
+SHARDS_DIR = f"{PROJECT_DIR}/bronze/shards"
+
+DB_PATH = f"{PROJECT_DIR}/dataset_climatempo.db"
+
+# True: uma task só roda coleta, transform e dbt no mesmo processo
+# (pipeline_em_processo.py), sem pagar a subida de Python/Scrapy/dbt e o parse
+# do projeto dbt a cada etapa. Sem shards: a coleta é um CrawlerProcess só.
+MODO_EM_PROCESSO = False
+
+# Todas as etapas gravam suas métricas em pipeline_run_metrics com o run_id do Airflow
+RUN_ID = "export PIPELINE_RUN_ID='{{ run_id }}' && "
+
+
+def dbt_run(selecao: str, etapa: str) -> str:
+    # as métricas saem do run_results.json mesmo se o dbt falhar; o status do dbt é o da task
+    return (
+        RUN_ID
+        + f"cd {PROJECT_DIR}/silver-gold/projeto_clima && "
+        f"dbt run --profiles-dir ./.dbt --select {selecao}; status=$?; "
+        f"python {PROJECT_DIR}/bronze/transform/instrumentacao.py dbt --etapa {etapa} "
+        "--run-results target/run_results.json; "
+        "exit $status"
+    )
+
+
+def pipeline_em_processo(run_id, **_):
+    import sys
+
+    sys.path.insert(0, PROJECT_DIR)
+    from pipeline_em_processo import executar
+
+    executar(run_id=run_id)
+
+
 with DAG(
     dag_id="clima_pipeline",
     start_date=datetime(2025, 1, 1),
@@ -12,36 +58,53 @@ with DAG(
     tags=["clima"],
 ) as dag:
 
-    run_scrapy = BashOperator(
-        task_id="run_scrapy",
-        bash_command=(
-            f"cd {PROJECT_DIR}/bronze/coleta && "
-            "scrapy crawl previsao -O coleta/data.jsonl"
-        ),
-    )
+    if MODO_EM_PROCESSO:
+        run_pipeline = PythonOperator(
+            task_id="run_pipeline",
+            python_callable=pipeline_em_processo,
+            retries=2,
+            retry_delay=timedelta(minutes=5),
+        )
 
-    run_transform = BashOperator(
-        task_id="run_transform",
-        bash_command=(
-            f"cd {PROJECT_DIR}/bronze/transform && "
-            "python transform.py"
-        ),
-    )
+    else:
+        pasta_shards = f"{SHARDS_DIR}/{{{{ ds }}}}"
 
-    run_dbt_silver = BashOperator(
-        task_id="run_dbt_silver",
-        bash_command=(
-            f"cd {PROJECT_DIR}/silver-gold/projeto_clima && "
-            "dbt run --profiles-dir ./.dbt --select silver"
-        ),
-    )
+        # uma nova tentativa da task retoma o shard: o checkpoint (por run_id) fica
+        # no banco do shard, e o JSONL recebe append (-o) em vez de ser sobrescrito
+        run_scrapy = BashOperator.partial(
+            task_id="run_scrapy",
+            retries=2,
+            retry_delay=timedelta(minutes=5),
+            bash_command=(
+                RUN_ID
+                + f"mkdir -p {pasta_shards} && "
+                f"cd {PROJECT_DIR}/bronze/coleta && "
+                f"scrapy crawl previsao -a shard=$SHARD -a shards={N_SHARDS} "
+                f"-s RAW_DB_PATH={pasta_shards}/shard_$SHARD.db "
+                f"-s CONTEUDO_HASH_DB_PATH={DB_PATH} -s METRICAS_DB_PATH={DB_PATH}"
+                + (f" -o {pasta_shards}/shard_$SHARD.jsonl" if ARQUIVO_JSONL else "")
+            ),
+            append_env=True,
+        ).expand(env=[{"SHARD": str(i)} for i in range(N_SHARDS)])
 
-    run_dbt_gold = BashOperator(
-        task_id="run_dbt_gold",
-        bash_command=(
-            f"cd {PROJECT_DIR}/silver-gold/projeto_clima && "
-            "dbt run --profiles-dir ./.dbt --select gold"
-        ),
-    )
+        join_shards = BashOperator(
+            task_id="join_shards",
+            bash_command=(
+                RUN_ID
+                + f"cd {PROJECT_DIR}/bronze/transform && "
+                f"python juntar_shards.py --pasta {pasta_shards} --apagar"
+                + (f" --jsonl {PROJECT_DIR}/bronze/coleta/{ARQUIVO_JSONL}" if ARQUIVO_JSONL else "")
+            ),
+        )
+
+        run_dbt_silver = BashOperator(
+            task_id="run_dbt_silver",
+            bash_command=dbt_run("climatempo.silver", "run_dbt_silver"),
+        )
+
+        run_dbt_gold = BashOperator(
+            task_id="run_dbt_gold",
+            bash_command=dbt_run("climatempo.gold", "run_dbt_gold"),
+        )
 
-    run_scrapy >> run_transform >> run_dbt_silver >> run_dbt_gold
+        run_scrapy >> join_shards >> run_dbt_silver >> run_dbt_gold
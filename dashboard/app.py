@@ -4,6 +4,10 @@ import sqlite3
 from pathlib import Path
 import plotly.express as px
 
+import janelas
+from metricas import TEMP_CAP, W_CHUVA, W_CLIMA, W_TEMP, metricas, metricas_totais
+from pool_leitura import PoolLeitura
+
 # -----------------------------
 # CONFIG
 # -----------------------------
@@ -27,30 +31,136 @@ if not DB_PATH.exists():
 # -----------------------------
 # Helpers
 # -----------------------------
+@st.cache_resource
+def get_pool():
+    # um pool por processo, compartilhado por todas as sessões
+    return PoolLeitura(DB_PATH)
+
 def get_connection():
-    # timeout ajuda quando o DB estiver aberto no DBeaver
-    return sqlite3.connect(str(DB_PATH), timeout=30)
+    # uso: `with get_connection() as conn:`; a conexão volta para o pool no fim
+    return get_pool().conexao()
+
+# -----------------------------
+# Versão dos dados: o pipeline incrementa pipeline_versao a cada carga
+# (spider/transform na raw, post-hook do dbt nos modelos). As funções com
+# cache recebem a versão da tabela como argumento, então depois de uma carga
+# só as consultas das tabelas que mudaram são relidas, em todas as sessões
+# servidas pelo processo, sem limpar o cache inteiro.
+# -----------------------------
+def ler_versoes():
+    with get_connection() as conn:
+        try:
+            versoes = dict(conn.execute("SELECT tabela, versao FROM pipeline_versao"))
+        except sqlite3.OperationalError:
+            versoes = {}  # banco anterior ao pipeline_versao
+        # muda a cada CREATE/DROP/ALTER: lista de tabelas e colunas
+        schema = conn.execute("PRAGMA schema_version").fetchone()[0]
+    return versoes, schema
+
+def versao(table_name: str):
+    if table_name in VERSOES:
+        return VERSOES[table_name]
+    # tabela sem registro (banco antigo, carga manual): data de modificação do arquivo
+    arquivos = (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal"))
+    return tuple(p.stat().st_mtime_ns for p in arquivos if p.exists())
+
+VERSOES, VERSAO_SCHEMA = ler_versoes()
 
 @st.cache_data(show_spinner=False)
-def list_tables():
-    conn = get_connection()
-    df = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;", conn)
-    conn.close()
+def list_tables(versao_schema: int):
+    with get_connection() as conn:
+        df = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name;", conn)
     return df["name"].tolist()
 
-@st.cache_data(show_spinner=True)
-def load_table(table_name: str) -> pd.DataFrame:
-    conn = get_connection()
+# -----------------------------
+# Consultas parametrizadas: filtros (cidade, período, lead) e colunas vão
+# para o SQLite; o cache é por combinação de parâmetros, então cada sessão
+# só lê o recorte que está na tela.
+# filtros = tupla de (coluna, operador, valor), hashable para o st.cache_data
+# -----------------------------
+def where_clause(filtros: tuple):
+    if not filtros:
+        return "", ()
+    sql = " WHERE " + " AND ".join(f'"{col}" {op} ?' for col, op, _ in filtros)
+    return sql, tuple(valor for *_, valor in filtros)
+
+@st.cache_data(show_spinner=False)
+def table_columns(table_name: str, versao_schema: int) -> list:
+    with get_connection() as conn:
+        cols = [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+    return cols
+
+@st.cache_data(show_spinner=False)
+def distinct_values(table_name: str, versao_tabela, col: str, filtros: tuple = ()) -> list:
+    where, params = where_clause(filtros)
+    with get_connection() as conn:
+        rows = conn.execute(
+            f'SELECT DISTINCT "{col}" FROM "{table_name}"{where} ORDER BY 1', params
+        ).fetchall()
+    return [r[0] for r in rows if r[0] is not None]
+
+@st.cache_data(show_spinner=False)
+def value_range(table_name: str, versao_tabela, col: str, filtros: tuple = ()):
+    where, params = where_clause(filtros)
+    with get_connection() as conn:
+        row = conn.execute(f'SELECT MIN("{col}"), MAX("{col}") FROM "{table_name}"{where}', params).fetchone()
+    return row
+
+@st.cache_data(show_spinner=False)
+def count_rows(table_name: str, versao_tabela, filtros: tuple = ()) -> int:
+    where, params = where_clause(filtros)
+    with get_connection() as conn:
+        n = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"{where}', params).fetchone()[0]
+    return n
+
+# max_entries: versões antigas saem do cache em vez de acumular
+@st.cache_data(show_spinner=True, max_entries=256)
+def load_rows(table_name: str, versao_tabela, columns: tuple, filtros: tuple = (), order_by: str = None,
+              limit: int = None, offset: int = 0) -> pd.DataFrame:
+    where, params = where_clause(filtros)
     # aspas duplas evita problema com nomes “estranhos”
-    df = pd.read_sql_query(f'SELECT * FROM "{table_name}"', conn)
-    conn.close()
+    cols_sql = ", ".join(f'"{c}"' for c in columns)
+    sql = f'SELECT {cols_sql} FROM "{table_name}"{where}'
+    if order_by:
+        sql += f' ORDER BY "{order_by}"'
+    if limit:
+        sql += " LIMIT ? OFFSET ?"
+        params += (limit, offset)
+    with get_connection() as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+    return df
+
+# -----------------------------
+# Descrição do clima: as tabelas guardam só clima_desc_id; o texto e a
+# categoria (Sol, Nublado, Pancadas de chuva, ...) vêm da dimensão do dbt
+# -----------------------------
+DESC_TABLE = "silver_clima_desc"
+
+@st.cache_data(show_spinner=False)
+def descricoes_clima(versao_tabela) -> pd.DataFrame:
+    with get_connection() as conn:
+        try:
+            df = pd.read_sql_query(
+                f'SELECT clima_desc_id, clima_desc, categoria FROM "{DESC_TABLE}"', conn, index_col="clima_desc_id"
+            )
+        except pd.errors.DatabaseError:
+            df = pd.DataFrame(columns=["clima_desc", "categoria"])  # banco anterior à dimensão
+    return df
+
+def com_descricao(df: pd.DataFrame) -> pd.DataFrame:
+    """Acrescenta o texto ao lado de cada coluna *clima_desc_id (só para exibir)."""
+    textos = descricoes_clima(versao(DESC_TABLE))["clima_desc"]
+    df = df.copy()
+    for col in [c for c in df.columns if c.endswith("clima_desc_id")]:
+        df.insert(df.columns.get_loc(col) + 1, col.removesuffix("_id"), df[col].map(textos))
     return df
 
 # COMEÇANDO A AJEITAR SELEÇÃO DE TABELA
-all_tables = list_tables()
+all_tables = list_tables(VERSAO_SCHEMA)
 
 # manter apenas tabelas gold
-tables = [t for t in all_tables if t.startswith("gold_")]
+# (fora as de staging do dbt, que só existem durante um --full-refresh)
+tables = [t for t in all_tables if t.startswith("gold_") and "__dbt_" not in t]
 
 # opcional: ordenar
 tables = sorted(tables)
@@ -70,15 +180,15 @@ default_table = next((t for t in preferred if t in tables), tables[0])
 
 table_name = st.sidebar.selectbox("Tabela", options=tables, index=tables.index(default_table))
 
-if st.sidebar.button("🔄 Recarregar"):
-    st.cache_data.clear()
-    st.rerun()
+# sem botão de recarregar: o cache segue a versão da tabela (pipeline_versao)
+if table_name in VERSOES:
+    st.sidebar.caption(f"🔖 Versão dos dados: {VERSOES[table_name]}")
 
-df = load_table(table_name)
+columns = table_columns(table_name, VERSAO_SCHEMA)
 
 st.markdown("---")
 st.subheader(f"📌 Tabela selecionada: `{table_name}`")
-st.write(f"Linhas: **{len(df)}** | Colunas: **{len(df.columns)}**")
+st.write(f"Linhas: **{count_rows(table_name, versao(table_name))}** | Colunas: **{len(columns)}**")
 
 # -----------------------------
 # Tentativa de identificar colunas comuns do seu print
@@ -86,30 +196,45 @@ st.write(f"Linhas: **{len(df)}** | Colunas: **{len(df.columns)}**")
 # -----------------------------
 # Descobrir coluna de data
 date_candidates = ["data_coleta", "data", "dt", "dia", "date"]
-date_col = next((c for c in date_candidates if c in df.columns), None)
+date_col = next((c for c in date_candidates if c in columns), None)
 
 # Descobrir coluna cidade
 city_candidates = ["cidade_id", "cidade", "city", "municipio"]
-city_col = next((c for c in city_candidates if c in df.columns), None)
+city_col = next((c for c in city_candidates if c in columns), None)
 
-# Converter data se existir
-if date_col:
-    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
+# Filtros (montados aqui, aplicados no SQL)
+filtros = ()
 
-# Filtros
 if city_col:
-    cidades = sorted([c for c in df[city_col].dropna().unique()])
+    cidades = distinct_values(table_name, versao(table_name), city_col)
     if cidades:
         cidade_sel = st.sidebar.selectbox("Cidade", cidades)
-        df = df[df[city_col] == cidade_sel]
+        filtros += ((city_col, "=", cidade_sel),)
 
-if date_col and df[date_col].notna().any():
-    dmin = df[date_col].min().date()
-    dmax = df[date_col].max().date()
-    intervalo = st.sidebar.date_input("Período", [dmin, dmax])
-    if isinstance(intervalo, (list, tuple)) and len(intervalo) == 2:
-        ini, fim = intervalo
-        df = df[(df[date_col] >= pd.to_datetime(ini)) & (df[date_col] <= pd.to_datetime(fim))]
+# previsões trazem D+1 ... D+14 por coleta: mostra uma antecedência por vez
+if "lead_time" in columns:
+    leads = [int(l) for l in distinct_values(table_name, versao(table_name), "lead_time", filtros)]
+    if leads:
+        lead_sel = st.sidebar.selectbox("Antecedência", leads, format_func=lambda d: f"D+{d}")
+        filtros += (("lead_time", "=", lead_sel),)
+
+if date_col:
+    dmin, dmax = value_range(table_name, versao(table_name), date_col, filtros)
+    dmin, dmax = pd.to_datetime(dmin, errors="coerce"), pd.to_datetime(dmax, errors="coerce")
+    if pd.notna(dmin) and pd.notna(dmax):
+        intervalo = st.sidebar.date_input("Período", [dmin.date(), dmax.date()])
+        if isinstance(intervalo, (list, tuple)) and len(intervalo) == 2:
+            ini, fim = intervalo
+            filtros += ((date_col, ">=", ini.isoformat()), (date_col, "<=", fim.isoformat()))
+
+# só as colunas que os KPIs/gráficos usam, já filtradas
+kpi_candidates = [date_col, city_col, "temp_min", "temp_max", "chuva_mm", "clima_desc_id"]
+kpi_cols = tuple(dict.fromkeys(c for c in kpi_candidates if c and c in columns))
+df = load_rows(table_name, versao(table_name), kpi_cols, filtros, order_by=date_col) if kpi_cols else pd.DataFrame()
+
+# Converter data se existir
+if date_col:
+    df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
 
 # -----------------------------
 # KPIs (se colunas existirem)
@@ -129,9 +254,10 @@ if "chuva_mm" in df.columns and len(df) > 0:
 else:
     k2.metric("🌧️ Chuva total (mm)", "—")
 
-if "clima_desc" in df.columns and len(df) > 0:
-    top_desc = df["clima_desc"].dropna().value_counts().head(1)
-    descricao = top_desc.index[0] if len(top_desc) else "—"
+if "clima_desc_id" in df.columns and len(df) > 0:
+    top_desc = df["clima_desc_id"].dropna().value_counts().head(1)
+    textos = descricoes_clima(versao(DESC_TABLE))["clima_desc"]
+    descricao = textos.get(top_desc.index[0], "—") if len(top_desc) else "—"
 else:
     descricao = "—"
 
@@ -181,93 +307,60 @@ else:
 # Tabela
 # -----------------------------
 st.subheader("📋 Dados")
-st.dataframe(df, use_container_width=True)
 
-st.markdown("---")
-st.header("🎯 Qualidade da Previsão (D-1 → D)")
-
-# Carrega as duas tabelas GOLD
-df_real = load_table("gold_climatempo_dadosdia").copy()
-df_prev = load_table("gold_climatempo_previsoes").copy()
+# paginação no SQL: st.dataframe recebe só uma página do recorte filtrado
+n_filtrado = count_rows(table_name, versao(table_name), filtros)
+page_size = st.sidebar.selectbox("Linhas por página", [100, 500, 1000, 5000], index=1)
+n_pages = max(1, -(-n_filtrado // page_size))
+page = st.number_input("Página", min_value=1, max_value=n_pages, value=1, step=1)
+st.caption(f"{n_filtrado} linhas no filtro | página {page} de {n_pages}")
 
-# Tipagem de datas
-df_real["data_coleta"] = pd.to_datetime(df_real["data_coleta"], errors="coerce")
-df_prev["data_coleta"] = pd.to_datetime(df_prev["data_coleta"], errors="coerce")      # dia que coletou a previsão
-df_prev["data_previsao"] = pd.to_datetime(df_prev["data_previsao"], errors="coerce")  # dia previsto
+df_page = load_rows(table_name, versao(table_name), tuple(columns), filtros, order_by=date_col,
+                    limit=page_size, offset=(page - 1) * page_size)
+st.dataframe(com_descricao(df_page), use_container_width=True)
 
-# Remove linhas quebradas
-df_real = df_real.dropna(subset=["cidade_id", "data_coleta"])
-df_prev = df_prev.dropna(subset=["cidade_id", "data_coleta", "data_previsao"])
-
-# Normaliza numéricos (pra não dar BO se vier string)
-for col in ["temp_min", "temp_max", "chuva_mm", "amplitude_termica"]:
-    if col in df_real.columns:
-        df_real[col] = pd.to_numeric(df_real[col], errors="coerce")
-    if col in df_prev.columns:
-        df_prev[col] = pd.to_numeric(df_prev[col], errors="coerce")
+st.markdown("---")
+st.header("🎯 Qualidade da Previsão (D-1 → D)")
 
-# ---------------------------------------------------
-# JOIN: previsão (coletada em D-1) para dia D  VS real do dia D
-# Condição:
-#   prev.data_previsao == real.data_coleta
-#   prev.data_coleta   == real.data_coleta - 1 dia
-# ---------------------------------------------------
-df_real_join = df_real.rename(columns={
-    "temp_min": "real_temp_min",
-    "temp_max": "real_temp_max",
-    "chuva_mm": "real_chuva_mm",
-    "amplitude_termica": "real_amplitude_termica",
-    "clima_desc": "real_clima_desc",
-    "data_coleta": "dia_real"
-})
+# Pares previsão x real e agregados por cidade/dia já vêm prontos do dbt
+# (gold_climatempo_verificacao / gold_climatempo_verificacao_cidade_dia).
+# Aqui só somamos linhas pequenas e derivamos as métricas.
+VERIF_TABLE = "gold_climatempo_verificacao"
+VERIF_DIA_TABLE = "gold_climatempo_verificacao_cidade_dia"
+LEAD_D1 = 1  # previsão coletada no dia anterior (D-1 -> D)
 
-df_prev_join = df_prev.rename(columns={
-    "temp_min": "prev_temp_min",
-    "temp_max": "prev_temp_max",
-    "chuva_mm": "prev_chuva_mm",
-    "amplitude_termica": "prev_amplitude_termica",
-    "clima_desc": "prev_clima_desc",
-    "data_coleta": "dia_coleta_prev",
-    "data_previsao": "dia_previsto"
-})
+if VERIF_TABLE not in all_tables or VERIF_DIA_TABLE not in all_tables:
+    st.warning("Não encontrei as tabelas de verificação. Rode `dbt run --select gold` para gerá-las.")
+    st.stop()
 
-df_cmp = df_prev_join.merge(
-    df_real_join,
-    left_on=["cidade_id", "dia_previsto"],
-    right_on=["cidade_id", "dia_real"],
-    how="inner"
-)
+# só as somas aditivas, já agregadas por cidade no SQLite: a sessão recebe
+# uma linha por cidade, não uma por cidade/dia, então a memória não cresce
+# com o histórico da tabela
+verif_cols = table_columns(VERIF_DIA_TABLE, VERSAO_SCHEMA)
+SOMAS = [c for c in verif_cols if c == "n" or c.startswith(("n_", "soma_"))]
+
+@st.cache_data(show_spinner=True, max_entries=256)
+def somas_por_cidade(table_name: str, versao_tabela, somas: tuple, lead_time: int) -> pd.DataFrame:
+    cols_sql = ", ".join(f'SUM("{c}") AS "{c}"' for c in somas)
+    sql = (
+        f'SELECT cidade_id, MIN(dia_real) AS primeiro_dia, MAX(dia_real) AS ultimo_dia, {cols_sql} '
+        f'FROM "{table_name}" WHERE lead_time = ? GROUP BY cidade_id'
+    )
+    with get_connection() as conn:
+        df = pd.read_sql_query(sql, conn, params=(lead_time,))
+    return df.set_index("cidade_id")
 
-# filtra apenas previsões do dia anterior (D-1 -> D)
-df_cmp = df_cmp[df_cmp["dia_coleta_prev"] == (df_cmp["dia_real"] - pd.Timedelta(days=1))]
+df_cidades = somas_por_cidade(VERIF_DIA_TABLE, versao(VERIF_DIA_TABLE), tuple(SOMAS), LEAD_D1)
 
-if df_cmp.empty:
+if df_cidades.empty:
     st.warning("Não encontrei pares (previsão D-1 → real D). Confere se o pipeline está gerando sempre o dia anterior.")
     st.stop()
 
 # ---------------------------------------------------
-# Funções de métricas
+# Métricas a partir das somas aditivas (n_*, soma_*) -> metricas.py
 # ---------------------------------------------------
-def mae(err: pd.Series) -> float:
-    return float(err.abs().mean())
-
-def rmse(err: pd.Series) -> float:
-    return float((err.pow(2).mean()) ** 0.5)
-
-def bias(err: pd.Series) -> float:
-    return float(err.mean())
-
-def mape(prev: pd.Series, real: pd.Series) -> float:
-    denom = real.abs().replace(0, pd.NA)
-    return float(((prev - real).abs() / denom).dropna().mean() * 100)
-
-# ---------------------------------------------------
-# Erros
-# ---------------------------------------------------
-df_cmp["erro_temp_max"] = df_cmp["prev_temp_max"] - df_cmp["real_temp_max"]
-df_cmp["erro_temp_min"] = df_cmp["prev_temp_min"] - df_cmp["real_temp_min"]
-df_cmp["erro_chuva_mm"] = df_cmp["prev_chuva_mm"] - df_cmp["real_chuva_mm"]
-df_cmp["erro_amp_termica"] = df_cmp["prev_amplitude_termica"] - df_cmp["real_amplitude_termica"]
+# somas das cidades = somas da tabela inteira (colunas aditivas)
+tot = metricas_totais(df_cidades[SOMAS])
 
 # ---------------------------------------------------
 # Métricas gerais (por tabela toda filtrada)
@@ -275,72 +368,60 @@ df_cmp["erro_amp_termica"] = df_cmp["prev_amplitude_termica"] - df_cmp["real_amp
 st.subheader("📌 Métricas gerais (D-1 → D)")
 
 c1, c2, c3, c4 = st.columns(4)
-c1.metric("Linhas comparadas", f"{len(df_cmp)}")
-c2.metric("Cidades", f"{df_cmp['cidade_id'].nunique()}")
-c3.metric("Primeira data", f"{df_cmp['dia_real'].min().date()}")
-c4.metric("Última data", f"{df_cmp['dia_real'].max().date()}")
+c1.metric("Linhas comparadas", f"{int(tot['n'])}")
+c2.metric("Cidades", f"{len(df_cidades)}")
+c3.metric("Primeira data", f"{df_cidades['primeiro_dia'].min()}")
+c4.metric("Última data", f"{df_cidades['ultimo_dia'].max()}")
 
 st.markdown("### 🌡️ Temperatura Máx (°C)")
 a, b, c, d = st.columns(4)
-a.metric("Erro Médio Absoluto (MAE)", f"{mae(df_cmp['erro_temp_max']):.2f}")
-b.metric("Raiz do Erro Quadrático Médio (RMSE)", f"{rmse(df_cmp['erro_temp_max']):.2f}")
-c.metric("Tendência (Bias)", f"{bias(df_cmp['erro_temp_max']):.2f}")
-d.metric("Erro Médio Percentual Absoluto (MAPE)", f"{mape(df_cmp['prev_temp_max'], df_cmp['real_temp_max']):.2f}%")
+a.metric("Erro Médio Absoluto (MAE)", f"{tot['mae_temp_max']:.2f}")
+b.metric("Raiz do Erro Quadrático Médio (RMSE)", f"{tot['rmse_temp_max']:.2f}")
+c.metric("Tendência (Bias)", f"{tot['bias_temp_max']:.2f}")
+d.metric("Erro Médio Percentual Absoluto (MAPE)", f"{tot['mape_temp_max']:.2f}%")
 
 st.markdown("### 🌡️ Temperatura Mín (°C)")
 a, b, c, d = st.columns(4)
-a.metric("Erro Médio Absoluto (MAE)", f"{mae(df_cmp['erro_temp_min']):.2f}")
-b.metric("Raiz do Erro Quadrático Médio (RMSE)", f"{rmse(df_cmp['erro_temp_min']):.2f}")
-c.metric("Tendência (Bias)", f"{bias(df_cmp['erro_temp_min']):.2f}")
-d.metric("Erro Médio Percentual Absoluto (MAPE)", f"{mape(df_cmp['prev_temp_min'], df_cmp['real_temp_min']):.2f}%")
+a.metric("Erro Médio Absoluto (MAE)", f"{tot['mae_temp_min']:.2f}")
+b.metric("Raiz do Erro Quadrático Médio (RMSE)", f"{tot['rmse_temp_min']:.2f}")
+c.metric("Tendência (Bias)", f"{tot['bias_temp_min']:.2f}")
+d.metric("Erro Médio Percentual Absoluto (MAPE)", f"{tot['mape_temp_min']:.2f}%")
 
 st.markdown("### 🌧️ Chuva (mm)")
 a, b, c = st.columns(3)
-a.metric("Erro Médio Absoluto (MAE)", f"{mae(df_cmp['erro_chuva_mm']):.2f}")
-b.metric("Raiz do Erro Quadrático Médio (RMSE)", f"{rmse(df_cmp['erro_chuva_mm']):.2f}")
-c.metric("Tendência (Bias)", f"{bias(df_cmp['erro_chuva_mm']):.2f}")
+a.metric("Erro Médio Absoluto (MAE)", f"{tot['mae_chuva']:.2f}")
+b.metric("Raiz do Erro Quadrático Médio (RMSE)", f"{tot['rmse_chuva']:.2f}")
+c.metric("Tendência (Bias)", f"{tot['bias_chuva']:.2f}")
 
 st.markdown("### 📊 Métricas de Classificação e Chuva")
 
-col1, col2, col3 = st.columns(3)
-
-# 1️⃣ Accuracy descrição do clima
-acc_desc = (
-    df_cmp["real_clima_desc"].fillna("") ==
-    df_cmp["prev_clima_desc"].fillna("")
-).mean() * 100
+col1, col2, col3, col4 = st.columns(4)
 
+# 1️⃣ Accuracy descrição do clima (mesma frase)
 col1.metric(
     "✅ Acurácia: Descrição do Clima",
-    f"{acc_desc:.2f}%"
+    f"{tot['acc_desc']:.2f}%"
 )
 
-# 2️⃣ Accuracy chuva binária
-df_cmp["real_choveu"] = df_cmp["real_chuva_mm"].fillna(0) > 0
-df_cmp["prev_choveu"] = df_cmp["prev_chuva_mm"].fillna(0) > 0
-
-acc_chuva_bin = (
-    df_cmp["real_choveu"] == df_cmp["prev_choveu"]
-).mean() * 100
-
+# 2️⃣ Accuracy da condição do tempo (mesma categoria: Sol, Nublado, Pancadas...)
 col2.metric(
-    "🌧️ Acurácia: Choveu vs Não",
-    f"{acc_chuva_bin:.2f}%"
+    "⛅ Acurácia: Condição do Tempo",
+    f"{tot['acc_categoria']:.2f}%"
 )
 
-# 3️⃣ Accuracy percentual da chuva (100 - MAPE)
-real = df_cmp["real_chuva_mm"].fillna(0).astype(float)
-prev = df_cmp["prev_chuva_mm"].fillna(0).astype(float)
-
-mask = real > 0
-mape_chuva = ((prev[mask] - real[mask]).abs() / real[mask]).mean() * 100
-acc_pct_chuva = 100 - mape_chuva
-
+# 3️⃣ Accuracy chuva binária
 col3.metric(
+    "🌧️ Acurácia: Choveu vs Não",
+    f"{tot['acc_chuva']:.2f}%"
+)
+
+# 4️⃣ Accuracy percentual da chuva (100 - MAPE)
+col4.metric(
     "🎯 Acurácia % Volume Chuva",
-    f"{acc_pct_chuva:.2f}%"
+    f"{tot['acc_pct_chuva']:.2f}%"
 )
 
+st.caption("Condição do tempo: descrições agrupadas em categorias (Sol, Nublado, Chuva fraca, Pancadas de chuva, Chuva, Temporal).")
 st.caption("Volume percentual calculado apenas em dias com chuva real > 0.")
 st.caption("Bias > 0 → previsão tende a superestimarr. Bias < 0 → previsão tende a subestimar.")
 
@@ -350,17 +431,15 @@ st.caption("Bias > 0 → previsão tende a superestimarr. Bias < 0 → previsão
 # ---------------------------------------------------
 st.subheader("🏙️ Métricas por cidade")
 
+df_metricas_cidade = metricas(df_cidades[SOMAS]).reset_index()
+
 df_city = (
-    df_cmp.groupby("cidade_id", as_index=False)
-    .agg(
-        #n=("cidade_id", "size"),
-        mae_temp_max=("erro_temp_max", lambda s: float(s.abs().mean())),
-        rmse_temp_max=("erro_temp_max", lambda s: float((s.pow(2).mean()) ** 0.5)),
-        mae_temp_min=("erro_temp_min", lambda s: float(s.abs().mean())),
-        rmse_temp_min=("erro_temp_min", lambda s: float((s.pow(2).mean()) ** 0.5)),
-        mae_chuva=("erro_chuva_mm", lambda s: float(s.abs().mean())),
-        acc_chuva=("real_choveu", lambda s: float((s == df_cmp.loc[s.index, "prev_choveu"]).mean() * 100)),
-    )
+    df_metricas_cidade[[
+        "cidade_id",
+        "mae_temp_max", "rmse_temp_max",
+        "mae_temp_min", "rmse_temp_min",
+        "mae_chuva", "acc_chuva",
+    ]]
     .sort_values(["mae_temp_max", "mae_chuva"], ascending=[False, False])
 )
 
@@ -371,7 +450,26 @@ st.dataframe(df_city, use_container_width=True)
 # ---------------------------------------------------
 st.subheader("📈 Erro ao longo do tempo")
 
-df_plot = df_cmp.sort_values("dia_real")
+cols_pares = [
+    "cidade_id",
+    "dia_coleta_prev", "dia_previsto", "dia_real",
+    "prev_temp_min", "real_temp_min", "erro_temp_min",
+    "prev_temp_max", "real_temp_max", "erro_temp_max",
+    "prev_chuva_mm", "real_chuva_mm", "erro_chuva_mm",
+    "prev_clima_desc_id", "real_clima_desc_id",
+    "prev_categoria_id", "real_categoria_id",
+]
+# os pares (linha a linha) seguem a cidade/período escolhidos na barra lateral
+filtros_pares = (("lead_time", "=", LEAD_D1),)
+if city_col == "cidade_id":
+    filtros_pares += tuple(f for f in filtros if f[0] == "cidade_id")
+if date_col:
+    filtros_pares += tuple(("dia_real", op, valor) for col, op, valor in filtros if col == date_col)
+df_cmp = load_rows(VERIF_TABLE, versao(VERIF_TABLE), tuple(cols_pares), filtros_pares, order_by="dia_real")
+df_cmp["dia_real"] = pd.to_datetime(df_cmp["dia_real"], errors="coerce")
+st.caption("Gráficos e base comparada usam a cidade e o período selecionados na barra lateral.")
+
+df_plot = df_cmp
 
 fig1 = px.line(df_plot, x="dia_real", y="erro_temp_max", color="cidade_id",
                title="Erro Temp. Máx (Previsto - Real) por dia")
@@ -389,73 +487,12 @@ st.plotly_chart(fig3, use_container_width=True)
 # Base comparada (debug/inspeção)
 # ---------------------------------------------------
 with st.expander("🔎 Ver base comparada (D-1 → D)"):
-    cols_show = [
-        "cidade_id",
-        "dia_coleta_prev", "dia_previsto", "dia_real",
-        "prev_temp_min", "real_temp_min", "erro_temp_min",
-        "prev_temp_max", "real_temp_max", "erro_temp_max",
-        "prev_chuva_mm", "real_chuva_mm", "erro_chuva_mm",
-        "prev_clima_desc", "real_clima_desc"
-    ]
-    cols_show = [c for c in cols_show if c in df_cmp.columns]
-    st.dataframe(df_cmp[cols_show], use_container_width=True)
+    st.dataframe(com_descricao(df_cmp), use_container_width=True)
 
 st.subheader("🏆 Ranking de Precisão por Cidade (Score Composto)")
 
-# ---- 1) Componentes por linha ----
-# erro absoluto de temperatura (min e max)
-abs_err_temp_max = df_cmp["erro_temp_max"].abs()
-abs_err_temp_min = df_cmp["erro_temp_min"].abs()
-
-# MAE por linha (média entre min e max)
-df_cmp["abs_err_temp_media"] = (abs_err_temp_max + abs_err_temp_min) / 2
-
-# proximidade da chuva por linha (0..1)
-real = df_cmp["real_chuva_mm"].fillna(0).astype(float)
-prev = df_cmp["prev_chuva_mm"].fillna(0).astype(float)
-den = (pd.concat([real, prev], axis=1).max(axis=1)).replace(0, 1e-9)
-
-df_cmp["chuva_prox"] = (1 - ((prev - real).abs() / den)).clip(lower=0, upper=1)
-
-# match do texto por linha (0/1)
-df_cmp["clima_match"] = (
-    df_cmp["real_clima_desc"].fillna("") ==
-    df_cmp["prev_clima_desc"].fillna("")
-).astype(int)
-
-# ---- 2) Agregação por cidade ----
-df_rank = (
-    df_cmp.groupby("cidade_id", as_index=False)
-    .agg(
-        n=("cidade_id", "size"),
-        mae_temp=("abs_err_temp_media", "mean"),
-        chuva_score=("chuva_prox", "mean"),       # 0..1
-        clima_score=("clima_match", "mean"),      # 0..1
-    )
-)
-
-# ---- 3) Normalização em score 0..100 ----
-# TempScore: 100 * (1 - mae_temp/5), capado entre 0 e 100
-TEMP_CAP = 3.0  # ajuste se quiser mais rígido/mais flexível
-df_rank["temp_score"] = (1 - (df_rank["mae_temp"] / TEMP_CAP)).clip(0, 1) * 100
-
-# ChuvaScore e ClimaScore já estão em 0..1
-df_rank["chuva_score"] = df_rank["chuva_score"] * 100
-df_rank["clima_score"] = df_rank["clima_score"] * 100
-
-# ---- 4) Score final ponderado ----
-W_TEMP = 0.5
-W_CHUVA = 0.4
-W_CLIMA = 0.1
-
-df_rank["score_final"] = (
-    W_TEMP * df_rank["temp_score"] +
-    W_CHUVA * df_rank["chuva_score"] +
-    W_CLIMA * df_rank["clima_score"]
-)
-
-# ---- 5) Ordenação e exibição ----
-df_rank = df_rank.sort_values("score_final", ascending=False)
+# componentes e score já agregados por cidade em metricas()
+df_rank = df_metricas_cidade.sort_values("score_final", ascending=False)
 
 c1, c2, c3 = st.columns(3)
 c1.metric("🥇 Cidade #1", df_rank.iloc[0]["cidade_id"])
@@ -514,3 +551,83 @@ st.caption(
     f"Score Final = {int(W_TEMP*100)}% Temperatura + {int(W_CHUVA*100)}% Chuva + {int(W_CLIMA*100)}% Descrição. \n"
     f"Score Temperatura usa limite de {TEMP_CAP}°C (MAE ≥ {TEMP_CAP} → 0 pontos)."
 )
+
+
+# ---------------------------------------------------
+# Janelas móveis (7/30/90 dias) por antecedência
+# ---------------------------------------------------
+# gold_climatempo_verificacao_janelas: somas de cada janela já prontas por
+# cidade/dia/lead_time; janelas.py lê uma linha por cidade, sem somar o histórico.
+st.markdown("---")
+st.header("📆 Janelas móveis por antecedência")
+
+@st.cache_data(show_spinner=False)
+def janela_ultimo_dia(versao_tabela):
+    with get_connection() as conn:
+        return janelas.ultimo_dia(conn)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def janela_ranking(versao_tabela, lead_time: int, janela: int, dia: str) -> pd.DataFrame:
+    with get_connection() as conn:
+        return janelas.ranking_janela(conn, lead_time, janela, dia)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def janela_por_lead(versao_tabela, cidade_id: str, janela: int, dia: str) -> pd.DataFrame:
+    with get_connection() as conn:
+        return janelas.metricas_por_lead(conn, cidade_id, janela, dia)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def janela_serie(versao_tabela, cidade_id: str, lead_time: int, janela: int) -> pd.DataFrame:
+    with get_connection() as conn:
+        return janelas.serie_janela(conn, cidade_id, lead_time, janela)
+
+if janelas.TABELA not in all_tables:
+    st.info("Não encontrei a tabela de janelas. Rode `dbt run --select gold` para gerá-la.")
+else:
+    versao_janelas = versao(janelas.TABELA)
+    dia_janela = janela_ultimo_dia(versao_janelas)
+
+    j1, j2 = st.columns(2)
+    janela_sel = j1.radio("Janela", janelas.JANELAS, index=1, horizontal=True, format_func=lambda w: f"{w} dias")
+    leads_janela = [int(l) for l in distinct_values(janelas.TABELA, versao_janelas, "lead_time") if int(l) > 0]
+    lead_janela = j2.selectbox("Antecedência da previsão", leads_janela,
+                               index=leads_janela.index(LEAD_D1) if LEAD_D1 in leads_janela else 0,
+                               format_func=lambda d: f"D-{d} → D")
+    st.caption(f"Janela de {janela_sel} dias terminando em {dia_janela}.")
+
+    df_rank_janela = janela_ranking(versao_janelas, lead_janela, janela_sel, dia_janela)
+    # a cidade da barra lateral; sem ela (ou fora do cubo), a primeira do ranking
+    cidade_janela = next((v for col, op, v in filtros if col == "cidade_id"), None)
+    if cidade_janela not in df_rank_janela.index:
+        cidade_janela = df_rank_janela.index[0] if len(df_rank_janela) else None
+
+    if cidade_janela:
+        m = df_rank_janela.loc[cidade_janela]
+        st.markdown(f"### 🏙️ {cidade_janela}")
+        a, b, c, d = st.columns(4)
+        a.metric("MAE Temp. Máx (°C)", f"{m['mae_temp_max']:.2f}")
+        b.metric("RMSE Temp. Máx (°C)", f"{m['rmse_temp_max']:.2f}")
+        c.metric("Bias Temp. Máx (°C)", f"{m['bias_temp_max']:.2f}")
+        d.metric("🌧️ Acurácia: Choveu vs Não", f"{m['acc_chuva']:.2f}%")
+
+        left, right = st.columns(2)
+        df_lead = janela_por_lead(versao_janelas, cidade_janela, janela_sel, dia_janela).reset_index()
+        fig_lead = px.line(df_lead[df_lead["lead_time"] > 0], x="lead_time", y=["mae_temp_max", "mae_temp_min"],
+                           markers=True, title=f"MAE por antecedência ({janela_sel} dias)")
+        left.plotly_chart(fig_lead, use_container_width=True)
+
+        df_serie = janela_serie(versao_janelas, cidade_janela, lead_janela, janela_sel).reset_index()
+        fig_serie = px.line(df_serie, x="dia_real", y=["mae_temp_max", "mae_temp_min", "mae_chuva"],
+                            title=f"MAE móvel de {janela_sel} dias (D-{lead_janela} → D)")
+        right.plotly_chart(fig_serie, use_container_width=True)
+
+    st.subheader(f"🏙️ Cidades na janela de {janela_sel} dias (D-{lead_janela} → D)")
+    st.dataframe(
+        df_rank_janela[[
+            "n",
+            "mae_temp_max", "rmse_temp_max", "bias_temp_max",
+            "mae_temp_min", "rmse_temp_min", "bias_temp_min",
+            "mae_chuva", "rmse_chuva", "bias_chuva", "acc_chuva",
+        ]].sort_values("mae_temp_max", ascending=False),
+        use_container_width=True
+    )
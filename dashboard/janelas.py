@@ -0,0 +1,110 @@
+"""Consultas ao cubo de verificação com janelas móveis (7/30/90 dias).
+
+Lê a gold_climatempo_verificacao_janelas (cidade x dia_real x lead_time),
+que o dbt mantém com as somas de cada janela já prontas e o acumulado acum_*
+desde o primeiro par. Toda consulta de uma cidade é busca pelo índice: uma
+linha para 7/30/90 dias, duas (acum de D e de D-W) para qualquer outra
+janela, sem somar o histórico. As métricas saem de metricas.metricas_erro.
+
+Recebe uma conexão sqlite3 qualquer (a do PoolLeitura no dashboard, uma
+sqlite3.connect em relatórios):
+
+    with sqlite3.connect("dataset_climatempo.db") as conn:
+        metricas_janela(conn, "saopaulo-sp", lead_time=1, janela=30)
+"""
+import pandas as pd
+
+from metricas import metricas_erro
+
+TABELA = "gold_climatempo_verificacao_janelas"
+JANELAS = (7, 30, 90)
+
+# mesmas somas do modelo dbt (colunas <soma>_<W>d e acum_<soma>)
+SOMAS = (
+    "n",
+    "soma_abs_erro_temp_max", "soma_quad_erro_temp_max", "soma_erro_temp_max",
+    "soma_abs_erro_temp_min", "soma_quad_erro_temp_min", "soma_erro_temp_min",
+    "soma_abs_erro_chuva", "soma_quad_erro_chuva", "soma_erro_chuva",
+    "n_acerto_chuva",
+)
+
+
+def _colunas_janela(janela: int) -> str:
+    if janela not in JANELAS:
+        raise ValueError(f"janela pronta só de {JANELAS} dias; para outras use metricas_janela")
+    return ", ".join(f'"{s}_{janela}d" AS "{s}"' for s in SOMAS)
+
+
+def _com_metricas(somas: pd.DataFrame) -> pd.DataFrame:
+    """Chaves do cubo + métricas derivadas das somas."""
+    chaves = [c for c in ("cidade_id", "lead_time", "dia_real") if c in somas.columns]
+    return pd.concat([somas[chaves], metricas_erro(somas[list(SOMAS)])], axis=1)
+
+
+def ultimo_dia(conn) -> str:
+    """Último dia_real do cubo (índice dia_real, lead_time)."""
+    return conn.execute(f'SELECT MAX(dia_real) FROM "{TABELA}"').fetchone()[0]
+
+
+def metricas_janela(conn, cidade_id: str, lead_time: int, janela: int = 30, dia: str = None) -> pd.Series:
+    """Métricas da janela de `janela` dias terminando em `dia` (padrão: o último do cubo)."""
+    dia = dia or ultimo_dia(conn)
+    if janela in JANELAS:
+        colunas = _colunas_janela(janela)
+    else:
+        colunas = ", ".join(f'"acum_{s}" AS "{s}"' for s in SOMAS)
+    somas = pd.read_sql_query(
+        f'SELECT dia_real, {colunas} FROM "{TABELA}" '
+        "WHERE lead_time = ? AND cidade_id = ? AND dia_real <= ? ORDER BY dia_real DESC LIMIT 1",
+        conn, params=(lead_time, cidade_id, dia),
+    )
+    if somas.empty:
+        return pd.Series(dtype=float)
+
+    if janela not in JANELAS:
+        # acum(D) - acum(D-W); sem linha em D-W a série começou depois (acum = 0)
+        antes = conn.execute(
+            f'SELECT {", ".join(f"acum_{s}" for s in SOMAS)} FROM "{TABELA}" '
+            "WHERE lead_time = ? AND cidade_id = ? AND dia_real = DATE(?, ?)",
+            (lead_time, cidade_id, somas.at[0, "dia_real"], f"-{int(janela)} day"),
+        ).fetchone()
+        if antes:
+            somas[list(SOMAS)] = somas[list(SOMAS)].to_numpy() - antes
+
+    out = metricas_erro(somas).iloc[0]
+    out["dia_real"] = somas.at[0, "dia_real"]
+    out["janela"] = janela
+    return out
+
+
+def ranking_janela(conn, lead_time: int, janela: int = 30, dia: str = None) -> pd.DataFrame:
+    """Todas as cidades num dia (padrão: o último), uma linha por cidade."""
+    dia = dia or ultimo_dia(conn)
+    somas = pd.read_sql_query(
+        f'SELECT cidade_id, lead_time, dia_real, {_colunas_janela(janela)} FROM "{TABELA}" '
+        "WHERE dia_real = ? AND lead_time = ?",
+        conn, params=(dia, lead_time),
+    )
+    return _com_metricas(somas).set_index("cidade_id")
+
+
+def metricas_por_lead(conn, cidade_id: str, janela: int = 30, dia: str = None) -> pd.DataFrame:
+    """Uma cidade num dia, uma linha por lead_time: como o erro cresce com a antecedência."""
+    dia = dia or ultimo_dia(conn)
+    somas = pd.read_sql_query(
+        f'SELECT cidade_id, lead_time, dia_real, {_colunas_janela(janela)} FROM "{TABELA}" '
+        "WHERE cidade_id = ? AND dia_real = ? ORDER BY lead_time",
+        conn, params=(cidade_id, dia),
+    )
+    return _com_metricas(somas).set_index("lead_time")
+
+
+def serie_janela(conn, cidade_id: str, lead_time: int, janela: int = 30,
+                 desde: str = None, ate: str = None) -> pd.DataFrame:
+    """Métricas da janela dia a dia (ex: MAE móvel de 30 dias) de uma cidade/lead."""
+    somas = pd.read_sql_query(
+        f'SELECT cidade_id, lead_time, dia_real, {_colunas_janela(janela)} FROM "{TABELA}" '
+        "WHERE lead_time = ? AND cidade_id = ? AND dia_real >= ? AND dia_real <= ? ORDER BY dia_real",
+        conn, params=(lead_time, cidade_id, desde or "0000-01-01", ate or "9999-12-31"),
+    )
+    return _com_metricas(somas).set_index("dia_real")
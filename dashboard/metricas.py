@@ -0,0 +1,126 @@
+"""Métricas de verificação previsão x real, vetorizadas.
+
+Tudo sai de somas aditivas por grupo (as mesmas colunas n_* / soma_* da
+gold_climatempo_verificacao_cidade_dia): um groupby().sum() único sobre
+parcelas calculadas linha a linha, sem lambda por grupo. Serve para o
+dashboard e para jobs em lote.
+
+Denominador zero é tratado sempre do mesmo jeito: a linha fica fora da média
+(MAPE com real = 0, volume % sem chuva real) e um grupo sem nenhuma linha
+válida dá NaN, nunca inf.
+"""
+import numpy as np
+import pandas as pd
+
+# score composto: TempScore = 100 * (1 - mae_temp/TEMP_CAP), capado entre 0 e 100
+TEMP_CAP = 3.0
+W_TEMP = 0.5
+W_CHUVA = 0.4
+W_CLIMA = 0.1
+
+# variável -> (coluna prevista, coluna real) na base de pares
+VARIAVEIS = {
+    "temp_max": ("prev_temp_max", "real_temp_max"),
+    "temp_min": ("prev_temp_min", "real_temp_min"),
+    "chuva": ("prev_chuva_mm", "real_chuva_mm"),
+}
+
+
+def _razao(num, den):
+    den = den.astype(float)
+    return num / den.where(den != 0)
+
+
+def parcelas(pares: pd.DataFrame) -> pd.DataFrame:
+    """Parcelas por linha que, somadas por grupo, viram as colunas n_* / soma_*."""
+    out = pd.DataFrame({"n": np.ones(len(pares), dtype=np.int64)}, index=pares.index)
+
+    erros = {}
+    for var, (prev, real) in VARIAVEIS.items():
+        erro = pares[prev] - pares[real]
+        erros[var] = erro
+        out[f"soma_abs_erro_{var}"] = erro.abs()
+        out[f"soma_quad_erro_{var}"] = erro * erro
+        out[f"soma_erro_{var}"] = erro
+
+    for var in ("temp_max", "temp_min"):
+        real = pares[VARIAVEIS[var][1]]
+        valido = real.notna() & real.ne(0)
+        out[f"soma_ape_{var}"] = (erros[var].abs() / real.abs().where(valido)).fillna(0.0)
+        out[f"n_ape_{var}"] = valido.astype(np.int64)
+
+    real_chuva = pares["real_chuva_mm"].fillna(0).astype(float)
+    prev_chuva = pares["prev_chuva_mm"].fillna(0).astype(float)
+    choveu = real_chuva > 0
+    dif_chuva = (prev_chuva - real_chuva).abs()
+
+    # volume % só em dias com chuva real > 0
+    out["soma_ape_chuva"] = (dif_chuva / real_chuva.where(choveu)).fillna(0.0)
+    out["n_ape_chuva"] = choveu.astype(np.int64)
+    out["n_acerto_chuva"] = (choveu == (prev_chuva > 0)).astype(np.int64)
+
+    # componentes do score: erro médio de temperatura, proximidade da chuva, match da descrição
+    out["soma_abs_err_temp_media"] = (erros["temp_max"].abs() + erros["temp_min"].abs()) / 2
+    den = np.maximum(real_chuva, prev_chuva).replace(0, 1e-9)
+    out["soma_chuva_prox"] = (1 - dif_chuva / den).clip(lower=0, upper=1)
+    # ids da silver_clima_desc (0 = sem descrição): comparação de inteiros
+    for prefixo, coluna in (("clima", "clima_desc_id"), ("categoria", "categoria_id")):
+        out[f"n_{prefixo}_match"] = (
+            pares[f"real_{coluna}"].fillna(0) == pares[f"prev_{coluna}"].fillna(0)
+        ).astype(np.int64)
+    return out
+
+
+def somas_por_grupo(pares: pd.DataFrame, chaves) -> pd.DataFrame:
+    """Um groupby().sum() vetorizado das parcelas por `chaves` (ex: ["cidade_id"])."""
+    chaves = [chaves] if isinstance(chaves, str) else list(chaves)
+    return parcelas(pares).groupby([pares[c] for c in chaves], sort=True).sum()
+
+
+def metricas_erro(somas: pd.DataFrame) -> pd.DataFrame:
+    """MAE, RMSE, Bias e acerto de chuva: só precisa de n, soma_abs/quad/erro_* e n_acerto_chuva."""
+    n = somas["n"]
+    out = pd.DataFrame(index=somas.index)
+    out["n"] = n
+
+    for var in VARIAVEIS:
+        out[f"mae_{var}"] = _razao(somas[f"soma_abs_erro_{var}"], n)
+        out[f"rmse_{var}"] = _razao(somas[f"soma_quad_erro_{var}"], n) ** 0.5
+        out[f"bias_{var}"] = _razao(somas[f"soma_erro_{var}"], n)
+
+    out["acc_chuva"] = _razao(somas["n_acerto_chuva"], n) * 100
+    return out
+
+
+def metricas(somas: pd.DataFrame) -> pd.DataFrame:
+    """Deriva MAE, RMSE, Bias, MAPE, acurácias e score das somas de cada linha."""
+    n = somas["n"]
+    out = metricas_erro(somas)
+
+    for var in ("temp_max", "temp_min"):
+        out[f"mape_{var}"] = _razao(somas[f"soma_ape_{var}"], somas[f"n_ape_{var}"]) * 100
+
+    out["acc_desc"] = _razao(somas["n_clima_match"], n) * 100
+    out["acc_categoria"] = _razao(somas["n_categoria_match"], n) * 100
+    out["acc_pct_chuva"] = 100 - _razao(somas["soma_ape_chuva"], somas["n_ape_chuva"]) * 100
+
+    out["mae_temp"] = _razao(somas["soma_abs_err_temp_media"], n)
+    out["temp_score"] = (1 - (out["mae_temp"] / TEMP_CAP)).clip(0, 1) * 100
+    out["chuva_score"] = _razao(somas["soma_chuva_prox"], n) * 100
+    out["clima_score"] = _razao(somas["n_clima_match"], n) * 100
+    out["score_final"] = (
+        W_TEMP * out["temp_score"] +
+        W_CHUVA * out["chuva_score"] +
+        W_CLIMA * out["clima_score"]
+    )
+    return out
+
+
+def metricas_por_grupo(pares: pd.DataFrame, chaves) -> pd.DataFrame:
+    """Todas as métricas para muitos grupos de uma vez, direto da base de pares."""
+    return metricas(somas_por_grupo(pares, chaves))
+
+
+def metricas_totais(somas: pd.DataFrame) -> pd.Series:
+    """Métricas do conjunto inteiro a partir de linhas de somas (ex: cidade/dia)."""
+    return metricas(somas.sum(numeric_only=True).to_frame().T).iloc[0]
@@ -0,0 +1,200 @@
+import streamlit as st
+import pandas as pd
+import sqlite3
+from pathlib import Path
+import plotly.express as px
+
+from pool_leitura import PoolLeitura
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+st.set_page_config(page_title="Pipeline - Climatempo", page_icon="📈", layout="wide")
+st.title("📈 Pipeline: tempo e vazão por execução")
+
+# dashboard/pages/1_Pipeline.py -> volta 2 níveis -> dataset_climatempo.db
+DB_PATH = (Path(__file__).resolve().parents[2] / "dataset_climatempo.db")
+METRICAS_TABLE = "pipeline_run_metrics"
+
+# como juntar as métricas dos shards (run_scrapy[0..N-1]) numa etapa só:
+# os shards rodam em paralelo, então o tempo é o do mais lento e contagens somam
+AGREGACAO = {
+    "segundos": "max",
+    "latencia_p50_ms": "max",
+    "latencia_p95_ms": "max",
+    "latencia_p99_ms": "max",
+    "latencia_max_ms": "max",
+    "pico_memoria_mb": "max",
+}
+
+if not DB_PATH.exists():
+    st.error("Não achei o arquivo dataset_climatempo.db um nível acima da pasta dashboard.")
+    st.stop()
+
+# -----------------------------
+# Helpers
+# -----------------------------
+@st.cache_resource
+def get_pool():
+    return PoolLeitura(DB_PATH)
+
+def versao_metricas():
+    # incrementada a cada gravação de métricas (instrumentacao.registrar_metricas)
+    with get_pool().conexao() as conn:
+        try:
+            row = conn.execute("SELECT versao FROM pipeline_versao WHERE tabela = ?", (METRICAS_TABLE,)).fetchone()
+        except sqlite3.OperationalError:
+            row = None
+    return row[0] if row else None
+
+@st.cache_data(show_spinner=False)
+def load_metricas(versao, n_runs: int) -> pd.DataFrame:
+    """Métricas de etapa (chave = '') dos últimos `n_runs` runs."""
+    with get_pool().conexao() as conn:
+        return pd.read_sql_query(
+            f"""
+            WITH runs AS (
+                SELECT run_id, MIN(registrado_em) AS inicio
+                FROM {METRICAS_TABLE} GROUP BY run_id
+                ORDER BY inicio DESC LIMIT ?
+            )
+            SELECT m.run_id, runs.inicio, m.etapa, m.metrica, m.valor
+            FROM {METRICAS_TABLE} m JOIN runs USING (run_id)
+            WHERE m.chave = ''
+            ORDER BY runs.inicio
+            """,
+            conn,
+            params=(n_runs,),
+        )
+
+@st.cache_data(show_spinner=False)
+def load_por_chave(versao, run_id: str, etapa_prefixo: str, metrica: str) -> pd.DataFrame:
+    """Métrica por cidade/modelo de um run (todas as etapas com o prefixo, ex. os shards)."""
+    with get_pool().conexao() as conn:
+        return pd.read_sql_query(
+            f"SELECT etapa, chave, valor FROM {METRICAS_TABLE} "
+            "WHERE run_id = ? AND etapa LIKE ? AND metrica = ? AND chave <> '' ORDER BY valor DESC",
+            conn,
+            params=(run_id, f"{etapa_prefixo}%", metrica),
+        )
+
+@st.cache_data(show_spinner=False)
+def load_serie_chave(versao, etapa_prefixo: str, metrica: str, run_ids: tuple) -> pd.DataFrame:
+    marcadores = ", ".join("?" for _ in run_ids)
+    with get_pool().conexao() as conn:
+        return pd.read_sql_query(
+            f"SELECT run_id, MIN(registrado_em) AS inicio, chave, MAX(valor) AS valor FROM {METRICAS_TABLE} "
+            f"WHERE etapa LIKE ? AND metrica = ? AND chave <> '' AND run_id IN ({marcadores}) "
+            "GROUP BY run_id, chave ORDER BY inicio",
+            conn,
+            params=(f"{etapa_prefixo}%", metrica, *run_ids),
+        )
+
+def por_etapa(df: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha por (run, etapa base, métrica), juntando os shards."""
+    df = df.assign(etapa=df["etapa"].str.replace(r"\[\d+\]$", "", regex=True))
+    partes = []
+    for metrica, grupo in df.groupby("metrica"):
+        agg = AGREGACAO.get(metrica, "sum")
+        partes.append(grupo.groupby(["run_id", "inicio", "etapa", "metrica"], as_index=False)["valor"].agg(agg))
+    return pd.concat(partes).sort_values("inicio")
+
+def grafico(df: pd.DataFrame, metrica: str, titulo: str):
+    dados = df[df["metrica"] == metrica]
+    if dados.empty:
+        st.caption(f"Sem dados de `{metrica}`.")
+        return
+    fig = px.line(dados, x="inicio", y="valor", color="etapa", markers=True, title=titulo,
+                  hover_data=["run_id"], labels={"inicio": "execução", "valor": metrica})
+    st.plotly_chart(fig, use_container_width=True)
+
+# -----------------------------
+# Dados
+# -----------------------------
+VERSAO = versao_metricas()
+if VERSAO is None:
+    st.info("Ainda não há métricas: rode a DAG (ou o spider/transform) para preencher pipeline_run_metrics.")
+    st.stop()
+
+st.sidebar.header("⚙️ Controles")
+n_runs = st.sidebar.slider("Últimas execuções", min_value=5, max_value=200, value=30, step=5)
+
+df_raw = load_metricas(VERSAO, n_runs)
+df = por_etapa(df_raw)
+runs = df.drop_duplicates("run_id")[["run_id", "inicio"]]
+ultimo_run = runs["run_id"].iloc[-1]
+st.caption(f"{len(runs)} execuções | última: `{ultimo_run}` | versão das métricas: {VERSAO}")
+
+# -----------------------------
+# Tempo por etapa
+# -----------------------------
+st.subheader("⏱️ Tempo por etapa")
+tempos = df[df["metrica"] == "segundos"]
+fig = px.bar(tempos, x="inicio", y="valor", color="etapa", hover_data=["run_id"],
+             labels={"inicio": "execução", "valor": "segundos"}, title="Segundos por etapa (shards: o mais lento)")
+st.plotly_chart(fig, use_container_width=True)
+
+ultimo = df[df["run_id"] == ultimo_run].pivot_table(index="etapa", columns="metrica", values="valor")
+st.dataframe(ultimo, use_container_width=True)
+
+# -----------------------------
+# Vazão e memória
+# -----------------------------
+st.subheader("🚚 Vazão")
+c1, c2 = st.columns(2)
+with c1:
+    grafico(df, "respostas_por_s", "Respostas/s da coleta (soma dos shards)")
+with c2:
+    grafico(df, "linhas_por_s", "Linhas/s (transform, join dos shards)")
+
+c1, c2 = st.columns(2)
+with c1:
+    grafico(df, "linhas", "Linhas processadas por etapa")
+with c2:
+    grafico(df, "pico_memoria_mb", "Pico de memória (MB)")
+
+# -----------------------------
+# Coleta: latência e erros por cidade
+# -----------------------------
+st.subheader("🌐 Coleta")
+lat = df[df["metrica"].isin(["latencia_p50_ms", "latencia_p95_ms", "latencia_p99_ms"])]
+if not lat.empty:
+    fig = px.line(lat, x="inicio", y="valor", color="metrica", markers=True, hover_data=["run_id"],
+                  labels={"inicio": "execução", "valor": "ms"}, title="Latência de download (percentis)")
+    st.plotly_chart(fig, use_container_width=True)
+
+# tabelas por cidade: a última execução que teve coleta
+coletas = df.loc[df["etapa"] == "run_scrapy", "run_id"]
+if coletas.empty:
+    st.caption("Nenhuma coleta nas execuções selecionadas.")
+else:
+    ultima_coleta = coletas.iloc[-1]
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown(f"**Cidades mais lentas** (`{ultima_coleta}`)")
+        st.dataframe(load_por_chave(VERSAO, ultima_coleta, "run_scrapy", "latencia_ms").head(20),
+                     use_container_width=True)
+    with c2:
+        st.markdown(f"**Erros de parse e itens descartados por cidade** (`{ultima_coleta}`)")
+        erros = pd.concat([
+            load_por_chave(VERSAO, ultima_coleta, "run_scrapy", "erros_parse").assign(tipo="erro de parse"),
+            load_por_chave(VERSAO, ultima_coleta, "run_scrapy", "itens_descartados").assign(tipo="descartado"),
+        ])
+        if erros.empty:
+            st.caption("Nenhum erro nessa coleta.")
+        else:
+            st.dataframe(erros, use_container_width=True)
+
+# -----------------------------
+# dbt: tempo por modelo
+# -----------------------------
+st.subheader("🧱 dbt: tempo por modelo")
+modelos = load_serie_chave(VERSAO, "run_dbt", "segundos", tuple(runs["run_id"]))
+if modelos.empty:
+    st.caption("Sem run_results.json registrado.")
+else:
+    fig = px.line(modelos, x="inicio", y="valor", color="chave", markers=True, hover_data=["run_id"],
+                  labels={"inicio": "execução", "valor": "segundos", "chave": "modelo"})
+    st.plotly_chart(fig, use_container_width=True)
+
+st.caption("Métricas gravadas pela instrumentação da pipeline (bronze/transform/instrumentacao.py).")
@@ -0,0 +1,51 @@
+"""Pool de conexões read-only ao SQLite para o dashboard.
+
+Com o banco em WAL (raw_db.conectar deixa assim), leitores não esperam o
+writer: cada SELECT lê o último snapshot commitado enquanto o spider, o
+transform ou o dbt gravam. As conexões são abertas uma vez e reaproveitadas
+entre consultas e sessões, em vez de um sqlite3.connect por consulta.
+"""
+import queue
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class PoolLeitura:
+    def __init__(self, db_path, tamanho: int = 8, timeout: float = 30):
+        self.db_path = Path(db_path).resolve()
+        self.timeout = timeout
+        self._livres = queue.LifoQueue()
+        for _ in range(tamanho):
+            self._livres.put(self._abrir())
+
+    def _abrir(self) -> sqlite3.Connection:
+        # mode=ro: o dashboard nunca pega o lock de escrita;
+        # check_same_thread=False: o Streamlit roda cada sessão numa thread
+        conn = sqlite3.connect(
+            f"{self.db_path.as_uri()}?mode=ro",
+            uri=True,
+            timeout=self.timeout,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão do pool; espera até `timeout` se todas estiverem em uso."""
+        try:
+            conn = self._livres.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"nenhuma conexão livre em {self.timeout}s") from None
+        try:
+            yield conn
+        finally:
+            self._livres.put(conn)
+
+    def fechar(self):
+        while True:
+            try:
+                self._livres.get_nowait().close()
+            except queue.Empty:
+                break
@@ -0,0 +1,168 @@
+"""Pipeline diária num processo só: coleta, transform e dbt sem abrir shells.
+
+Alternativa ao encadeamento de BashOperators da DAG (MODO_EM_PROCESSO em
+dag_pipeline.py). Cada BashOperator sobe um Python novo e paga de novo a
+importação do Scrapy/dbt, o parse do projeto dbt e a troca de dados por
+arquivo. Aqui um processo só roda:
+
+* a coleta com CrawlerProcess (o RawSQLitePipeline grava direto na raw);
+* com --transform, a coleta vai para JSONL e o transform.main_incremental
+  carrega como uma função Python;
+* o dbt pelo dbtRunner: o projeto é parseado uma vez e o manifest é
+  reaproveitado no run da silver e no da gold.
+
+    python pipeline_em_processo.py
+    python pipeline_em_processo.py --transform
+
+RAW_DB_PATH (-s) muda só onde a coleta/transform gravam a raw e as métricas;
+o dbt lê e escreve no banco do seu profile. Para rodar tudo em outro banco,
+aponte também --dbt-profiles-dir para um profile com esse banco (como faz o
+benchmarks/bench_em_processo.py):
+
+    python pipeline_em_processo.py -s RAW_DB_PATH=/tmp/teste.db --dbt-profiles-dir /tmp/profile_teste
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent
+COLETA_DIR = RAIZ / "bronze" / "coleta"
+TRANSFORM_DIR = RAIZ / "bronze" / "transform"
+DBT_DIR = RAIZ / "silver-gold" / "projeto_clima"
+DBT_PROFILES_DIR = DBT_DIR / ".dbt"
+
+sys.path.insert(0, str(COLETA_DIR))
+sys.path.insert(0, str(TRANSFORM_DIR))
+os.environ.setdefault("SCRAPY_SETTINGS_MODULE", "coleta.settings")
+
+from instrumentacao import registrar_dbt, registrar_metricas  # noqa: E402
+from raw_db import DB_PATH  # noqa: E402
+
+# JSONL da coleta quando o transform roda como etapa separada (--transform)
+JSONL_PATH = COLETA_DIR / "coleta" / "data.jsonl"
+
+
+@contextmanager
+def _na_pasta(pasta: Path):
+    # o Scrapy acha o scrapy.cfg (e a .scrapy/ do cache) a partir da pasta atual
+    anterior = Path.cwd()
+    os.chdir(pasta)
+    try:
+        yield
+    finally:
+        os.chdir(anterior)
+
+
+def coletar(settings_extra: dict = None, catalogo=None) -> dict:
+    """Roda o PrevisaoSpider com CrawlerProcess e devolve as stats do crawl.
+
+    O reactor do Twisted só sobe uma vez por processo: é uma coleta por execução.
+    """
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+
+    from coleta.spiders.previsao import PrevisaoSpider
+
+    with _na_pasta(COLETA_DIR):
+        settings = get_project_settings()
+        for nome, valor in (settings_extra or {}).items():
+            settings.set(nome, valor, priority="cmdline")
+        processo = CrawlerProcess(settings)
+        crawler = processo.create_crawler(PrevisaoSpider)
+        processo.crawl(crawler, catalogo=catalogo)
+        processo.start()
+    return crawler.stats.get_stats()
+
+
+def transformar(jsonl_path=JSONL_PATH, db_path=DB_PATH) -> int:
+    from transform import main_incremental
+
+    return main_incremental(jsonl_path, db_path, salvar_csv=False)
+
+
+def dbt_runner(profiles_dir=DBT_PROFILES_DIR, project_dir=DBT_DIR):
+    """dbtRunner com o manifest já parseado, para os runs seguintes não parsearem de novo."""
+    from dbt.cli.main import dbtRunner
+
+    resultado = dbtRunner().invoke(["parse", "--project-dir", str(project_dir), "--profiles-dir", str(profiles_dir)])
+    if not resultado.success:
+        raise RuntimeError(f"dbt parse falhou: {resultado.exception}")
+    return dbtRunner(manifest=resultado.result)
+
+
+def rodar_dbt(runner, selecao: str, profiles_dir=DBT_PROFILES_DIR, project_dir=DBT_DIR, variaveis: dict = None):
+    argumentos = ["run", "--select", selecao, "--project-dir", str(project_dir), "--profiles-dir", str(profiles_dir)]
+    if variaveis:
+        argumentos += ["--vars", json.dumps(variaveis)]
+    resultado = runner.invoke(argumentos)
+    if not resultado.success:
+        raise RuntimeError(f"dbt run --select {selecao} falhou: {resultado.exception}")
+    return resultado
+
+
+def executar(settings_extra: dict = None, catalogo=None, transform: bool = False, run_id: str = None,
+             profiles_dir=DBT_PROFILES_DIR, project_dir=DBT_DIR) -> dict:
+    """Coleta -> (transform) -> dbt silver -> dbt gold, com o tempo de cada etapa."""
+    if run_id:
+        # a extensão de métricas do Scrapy e o instrumentacao leem daqui
+        os.environ["PIPELINE_RUN_ID"] = run_id
+
+    settings_extra = dict(settings_extra or {})
+    if transform:
+        # a raw passa a ser responsabilidade do transform
+        settings_extra["RAW_DB_ENABLED"] = False
+        settings_extra["FEEDS"] = {str(JSONL_PATH): {"format": "jsonl", "overwrite": True}}
+    # banco da raw e das métricas; o dbt usa o do profile (profiles_dir)
+    db_path = settings_extra.get("RAW_DB_PATH") or DB_PATH
+
+    tempos = {}
+    t0 = time.perf_counter()
+
+    inicio = time.perf_counter()
+    stats = coletar(settings_extra, catalogo)
+    tempos["segundos_coleta"] = time.perf_counter() - inicio
+    print(f"🕷️  Coleta: {stats.get('item_scraped_count', 0)} itens em {tempos['segundos_coleta']:.1f}s")
+
+    if transform:
+        inicio = time.perf_counter()
+        transformar(JSONL_PATH, db_path)
+        tempos["segundos_transform"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    runner = dbt_runner(profiles_dir, project_dir)
+    tempos["segundos_dbt_parse"] = time.perf_counter() - inicio
+
+    for camada in ("silver", "gold"):
+        inicio = time.perf_counter()
+        rodar_dbt(runner, f"climatempo.{camada}", profiles_dir, project_dir)
+        tempos[f"segundos_dbt_{camada}"] = time.perf_counter() - inicio
+        registrar_dbt(f"run_dbt_{camada}", Path(project_dir) / "target" / "run_results.json", db_path=db_path)
+
+    tempos["segundos"] = time.perf_counter() - t0
+    registrar_metricas("pipeline_em_processo", tempos, db_path=db_path)
+    print("⏱️  " + " | ".join(f"{nome.removeprefix('segundos_') or 'total'} {s:.1f}s" for nome, s in tempos.items()))
+    return tempos
+
+
+def _setting(texto: str):
+    nome, _, valor = texto.partition("=")
+    return nome, valor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalogo", help="CSV de cidades (padrão: o do settings.py)")
+    parser.add_argument("--transform", action="store_true", help="coleta em JSONL e carrega com o transform")
+    parser.add_argument("--dbt-profiles-dir", type=Path, default=DBT_PROFILES_DIR,
+                        help="profile do dbt (o banco da silver/gold vem daqui, não do RAW_DB_PATH)")
+    parser.add_argument("--dbt-project-dir", type=Path, default=DBT_DIR)
+    parser.add_argument("-s", dest="settings", action="append", type=_setting, default=[],
+                        help="setting do Scrapy, como no scrapy crawl (NOME=valor)")
+    args = parser.parse_args()
+
+    executar(dict(args.settings), args.catalogo, args.transform,
+             profiles_dir=args.dbt_profiles_dir, project_dir=args.dbt_project_dir)
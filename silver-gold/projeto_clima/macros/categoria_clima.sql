@@ -0,0 +1,58 @@
+{#
+    Normalizador da descrição do Climatempo em categorias de condição do tempo.
+
+        {{ categoria_clima('clima_desc') }}           -> categoria_id (0..6)
+        {{ nome_categoria_clima('categoria_id') }}    -> 'Pancadas de chuva'
+
+    A descrição é uma frase livre ("Sol com muitas nuvens. Pancadas de chuva à
+    tarde e à noite."); a categoria é a condição mais severa citada nela. As
+    categorias vão da menos para a mais severa e são testadas da mais severa
+    para a menos. Antes de testar uma categoria, os termos das mais leves saem
+    do texto: "pancadas de chuva" e "chuva passageira" não contam como
+    "chuva". Trechos negados ("não chove", "sem chuva") saem sempre, senão
+    "Não chove." contaria como chuva.
+
+    O LOWER do SQLite só baixa ASCII, então os termos são escritos em
+    minúsculas e sem depender de maiúscula acentuada.
+
+    Mudou a lista? A categoria fica na silver_clima_desc: rode
+    `dbt run --full-refresh --select silver_clima_desc+`.
+#}
+{% macro categorias_clima() -%}
+    {{ return([
+        {"id": 0, "nome": "Indefinido", "termos": []},
+        {"id": 1, "nome": "Sol", "termos": ["sol", "céu claro", "poucas nuvens", "algumas nuvens"]},
+        {"id": 2, "nome": "Nublado", "termos": ["muitas nuvens", "nublado", "nebulosidade", "encoberto", "nevoeiro", "neblina"]},
+        {"id": 3, "nome": "Chuva fraca", "termos": ["chuva passageira", "chove rápido", "chuvisco", "garoa", "chuva fraca"]},
+        {"id": 4, "nome": "Pancadas de chuva", "termos": ["pancadas de chuva", "pancada de chuva", "pancada"]},
+        {"id": 5, "nome": "Chuva", "termos": ["chuva", "chove", "chuvos"]},
+        {"id": 6, "nome": "Temporal", "termos": ["temporal", "trovoada", "tempestade", "raios"]},
+    ]) }}
+{%- endmacro %}
+
+{% macro categoria_clima(coluna) -%}
+    {%- set categorias = categorias_clima() -%}
+    CASE
+    {%- for categoria in categorias | reverse if categoria.termos %}
+        {%- set remover = ["não chove", "sem chuva"] -%}
+        {%- for mais_leve in categorias if mais_leve.id < categoria.id -%}
+            {%- do remover.extend(mais_leve.termos) -%}
+        {%- endfor -%}
+        {#- na ordem da lista: "pancadas de chuva" sai antes de "pancada" -#}
+        {%- set texto = namespace(sql="LOWER(" ~ coluna ~ ")") -%}
+        {%- for termo in remover -%}
+            {%- set texto.sql = "REPLACE(" ~ texto.sql ~ ", '" ~ termo ~ "', '')" -%}
+        {%- endfor %}
+        WHEN {% for termo in categoria.termos %}{{ texto.sql }} LIKE '%{{ termo }}%'{{ " OR " if not loop.last }}{% endfor %} THEN {{ categoria.id }}
+    {%- endfor %}
+        ELSE 0
+    END
+{%- endmacro %}
+
+{% macro nome_categoria_clima(coluna_id) -%}
+    CASE {{ coluna_id }}
+    {%- for categoria in categorias_clima() %}
+        WHEN {{ categoria.id }} THEN '{{ categoria.nome }}'
+    {%- endfor %}
+    END
+{%- endmacro %}
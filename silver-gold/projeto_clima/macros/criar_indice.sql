@@ -0,0 +1,13 @@
+{#
+    Índice para usar em post_hook dos modelos:
+
+        post_hook=["{{ criar_indice('cidade_data', 'cidade_id, data_coleta') }}"]
+
+    O SQLite não aceita schema no ON, então o schema vai no nome do índice.
+    IF NOT EXISTS deixa o hook idempotente nas execuções incrementais; no
+    --full-refresh a tabela é recriada e o índice volta junto.
+#}
+{% macro criar_indice(sufixo, expressao, unico=false) -%}
+    CREATE {{ 'UNIQUE ' if unico }}INDEX IF NOT EXISTS "{{ this.schema }}"."ix_{{ this.identifier }}__{{ sufixo }}"
+    ON "{{ this.identifier }}" ({{ expressao }})
+{%- endmacro %}
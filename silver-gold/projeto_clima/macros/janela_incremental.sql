@@ -0,0 +1,28 @@
+{#
+    Filtro dos modelos incrementais por dia:
+
+        {% if is_incremental() %}
+        WHERE {{ janela_incremental('DATE(dt_ingest)', 'data_coleta') }}
+        {% endif %}
+
+    Execução normal: os dias a partir do último já carregado em {{ this }}
+    (o último é refeito porque pode ter recebido mais uma coleta).
+
+    Backfill (backfill.py passa --vars backfill_desde/backfill_ate): só os dias
+    do intervalo, mesmo que sejam anteriores ao último carregado. O unique_key
+    do modelo substitui as linhas desses dias, então repetir o intervalo não
+    duplica nada.
+
+    ate=false deixa o intervalo aberto à direita, para as tabelas de
+    verificação: um dia reprocessado muda os pares dos dias que ele previu.
+#}
+{% macro janela_incremental(coluna, coluna_this=none, ate=true) -%}
+    {%- if var('backfill_desde', none) -%}
+        {{ coluna }} >= '{{ var("backfill_desde") }}'
+        {%- if ate %} AND {{ coluna }} <= '{{ var("backfill_ate") }}'{% endif %}
+    {%- else -%}
+        {{ coluna }} >= (
+        SELECT COALESCE(MAX({{ coluna_this or coluna }}), '0000-01-01') FROM {{ this }}
+    )
+    {%- endif -%}
+{%- endmacro %}
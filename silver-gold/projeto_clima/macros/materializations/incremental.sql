@@ -0,0 +1,112 @@
+{#
+    Materialização incremental do projeto (sobrepõe a do dbt-sqlite).
+
+    Incremental: igual à do adapter (tabela temporária + delete/insert pela
+    unique_key numa transação só). Com o banco em WAL o dashboard continua
+    lendo a versão anterior até o COMMIT.
+
+    Primeira carga / --full-refresh: a do adapter faz DROP da tabela e depois
+    CREATE TABLE AS, cada um no seu commit, e quem lê no meio disso recebe
+    "no such table". Aqui a tabela nova é montada em <modelo>__dbt_novo e
+    publicada numa transação só (DROP da antiga + RENAME da nova + post_hooks
+    com os índices): os leitores veem a versão antiga ou a nova, nunca o meio.
+
+    Schema antigo: se as colunas do lote incremental não são as da tabela
+    (ex: silver/gold criadas como table antes do lead_time e do
+    clima_desc_id), o delete/insert falharia. A tabela é reconstruída do
+    zero: a antiga sai do caminho (RENAME para <modelo>__dbt_antigo, ainda
+    sem commit), o modelo é renderizado de novo, agora com is_incremental()
+    falso, e a nova entra no lugar na mesma transação. Acontece uma vez, sem
+    precisar de --full-refresh; a trava de escrita fica com a transação
+    durante a carga completa.
+#}
+{% materialization incremental, adapter='sqlite' -%}
+
+  {% set unique_key = config.get('unique_key') %}
+
+  {% set target_relation = this.incorporate(type='table') %}
+  {% set existing_relation = load_relation(this) %}
+  {% set staging_relation = target_relation.incorporate(path={"identifier": this.identifier ~ "__dbt_novo"}) %}
+
+  {{ run_hooks(pre_hooks, inside_transaction=False) }}
+
+  {% if existing_relation is none or existing_relation.is_view or should_full_refresh() %}
+
+      {# 1) monta a tabela nova em staging (transação própria) #}
+      {% do adapter.drop_relation(staging_relation) %}
+      {% call statement("main") %}
+          {{ create_table_as(False, staging_relation, sql) }}
+      {% endcall %}
+      {% do adapter.commit() %}
+
+      {# 2) publica: troca antiga -> nova e cria os índices no mesmo commit #}
+      {{ run_hooks(pre_hooks, inside_transaction=True) }}
+      {% if existing_relation is not none %}
+          {% call statement("publicar_drop") %}
+              drop {{ existing_relation.type }} if exists {{ existing_relation }}
+          {% endcall %}
+          {% do adapter.cache_dropped(existing_relation) %}
+      {% endif %}
+      {% do adapter.rename_relation(staging_relation, target_relation) %}
+      {% do create_indexes(target_relation) %}
+
+  {% else %}
+
+      -- `BEGIN` happens here:
+      {{ run_hooks(pre_hooks, inside_transaction=True) }}
+
+      {% set tmp_relation = make_temp_relation(target_relation) %}
+      {% do run_query(create_table_as(True, tmp_relation, sql)) %}
+
+      {% set colunas_lote = adapter.get_columns_in_relation(tmp_relation) | map(attribute='name') | map('lower') | list %}
+      {% set colunas_tabela = adapter.get_columns_in_relation(target_relation) | map(attribute='name') | map('lower') | list %}
+      {% set diferentes = (colunas_lote | reject('in', colunas_tabela) | list)
+                          + (colunas_tabela | reject('in', colunas_lote) | list) %}
+
+      {% if diferentes %}
+
+          {{ log("🔁 " ~ target_relation ~ ": schema antigo (colunas " ~ diferentes | join(", ")
+                 ~ "), reconstruindo a tabela do zero", info=True) }}
+          {% do adapter.drop_relation(tmp_relation) %}
+          {% set antiga_relation = target_relation.incorporate(path={"identifier": this.identifier ~ "__dbt_antigo"}) %}
+          {% do adapter.drop_relation(antiga_relation) %}
+          {% do adapter.rename_relation(target_relation, antiga_relation) %}
+
+          {# sem a tabela, is_incremental() é falso: o SQL sai com a carga completa #}
+          {% do adapter.drop_relation(staging_relation) %}
+          {% call statement("main") %}
+              {{ create_table_as(False, staging_relation, render(model.raw_code)) }}
+          {% endcall %}
+          {% call statement("publicar_drop") %}
+              drop table if exists {{ antiga_relation }}
+          {% endcall %}
+          {% do adapter.cache_dropped(antiga_relation) %}
+          {% do adapter.rename_relation(staging_relation, target_relation) %}
+          {% do create_indexes(target_relation) %}
+
+      {% else %}
+
+          {% do adapter.expand_target_column_types(
+                 from_relation=tmp_relation,
+                 to_relation=target_relation) %}
+
+          {% call statement("main") %}
+              {{ sqlite_incremental_upsert(tmp_relation, target_relation, unique_key=unique_key) }}
+          {% endcall %}
+
+      {% endif %}
+
+  {% endif %}
+
+  {% do persist_docs(target_relation, model) %}
+
+  {{ run_hooks(post_hooks, inside_transaction=True) }}
+
+  -- `COMMIT` happens here
+  {% do adapter.commit() %}
+
+  {{ run_hooks(post_hooks, inside_transaction=False) }}
+
+  {{ return({'relations': [target_relation]}) }}
+
+{%- endmaterialization %}
@@ -0,0 +1,25 @@
+{#
+    Versão dos dados por tabela em pipeline_versao (a mesma que o spider e o
+    transform incrementam na raw). O dashboard chaveia o cache nessa versão:
+    quando um modelo roda, só as consultas dessa tabela são relidas.
+
+    criar_tabela_versao roda no on-run-start; registrar_versao é post-hook de
+    todos os modelos (dbt_project.yml) e fica na mesma transação do modelo.
+#}
+{% macro criar_tabela_versao() -%}
+    CREATE TABLE IF NOT EXISTS pipeline_versao (
+        tabela TEXT PRIMARY KEY,
+        versao INTEGER NOT NULL,
+        run_id TEXT,
+        atualizado_em TEXT
+    )
+{%- endmacro %}
+
+{% macro registrar_versao() -%}
+    INSERT INTO pipeline_versao (tabela, versao, run_id, atualizado_em)
+    VALUES ('{{ this.identifier }}', 1, '{{ invocation_id }}', STRFTIME('%Y-%m-%dT%H:%M:%f+00:00', 'now'))
+    ON CONFLICT (tabela) DO UPDATE SET
+        versao = versao + 1,
+        run_id = excluded.run_id,
+        atualizado_em = excluded.atualizado_em
+{%- endmacro %}
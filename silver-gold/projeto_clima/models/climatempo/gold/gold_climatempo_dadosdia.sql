@@ -1,12 +1,23 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key="cidade_id || '|' || data_coleta",
+    post_hook=[
+        "{{ criar_indice('chave', \"cidade_id || '|' || data_coleta\") }}",
+        "{{ criar_indice('data_coleta', 'data_coleta') }}",
+        "{{ criar_indice('cidade_data_coleta', 'cidade_id, data_coleta') }}"
+    ]
+) }}
 
 SELECT
     cidade_id,
     temp_min,
     temp_max,
-    clima_desc,
+    clima_desc_id,
     chuva_mm,
     data_coleta,
     (temp_max - temp_min) as amplitude_termica
 FROM {{ ref('silver_climatempo_previsao') }}
-WHERE tipo_previsao = 'HOJE'
\ No newline at end of file
+WHERE tipo_previsao = 'HOJE'
+{% if is_incremental() %}
+  AND {{ janela_incremental('data_coleta') }}
+{% endif %}
\ No newline at end of file
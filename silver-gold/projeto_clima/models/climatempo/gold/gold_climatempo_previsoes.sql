@@ -1,13 +1,26 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key="cidade_id || '|' || lead_time || '|' || data_coleta",
+    post_hook=[
+        "{{ criar_indice('chave', \"cidade_id || '|' || lead_time || '|' || data_coleta\") }}",
+        "{{ criar_indice('data_coleta', 'data_coleta') }}",
+        "{{ criar_indice('cidade_data_coleta', 'cidade_id, data_coleta') }}",
+        "{{ criar_indice('cidade_data_previsao', 'cidade_id, data_previsao, lead_time') }}"
+    ]
+) }}
 
 SELECT
     cidade_id,
+    lead_time,
     temp_min,
     temp_max,
-    clima_desc,
+    clima_desc_id,
     chuva_mm,
     data_coleta,
-    DATE(data_coleta, '+1 day') as data_previsao,
+    data_previsao,
     (temp_max - temp_min) as amplitude_termica
 FROM {{ ref('silver_climatempo_previsao') }}
-WHERE tipo_previsao = 'AMANHA'
\ No newline at end of file
+WHERE lead_time >= 1
+{% if is_incremental() %}
+  AND {{ janela_incremental('data_coleta') }}
+{% endif %}
\ No newline at end of file
@@ -0,0 +1,68 @@
+{{ config(
+    materialized='incremental',
+    unique_key="cidade_id || '|' || lead_time || '|' || dia_real",
+    post_hook=[
+        "{{ criar_indice('chave', \"cidade_id || '|' || lead_time || '|' || dia_real\") }}",
+        "{{ criar_indice('dia_real', 'dia_real') }}",
+        "{{ criar_indice('lead_cidade_dia', 'lead_time, cidade_id, dia_real') }}"
+    ]
+) }}
+
+-- Pares previsão (coletada em D-lead) x real (dia D), com as colunas de erro
+-- que o dashboard calculava em pandas. lead_time = 1 é o par D-1 -> D.
+
+WITH pares AS (
+    SELECT
+        p.cidade_id,
+        p.lead_time,
+        p.data_coleta as dia_coleta_prev,
+        p.data_previsao as dia_previsto,
+        r.data_coleta as dia_real,
+        p.temp_min as prev_temp_min,
+        r.temp_min as real_temp_min,
+        p.temp_max as prev_temp_max,
+        r.temp_max as real_temp_max,
+        p.chuva_mm as prev_chuva_mm,
+        r.chuva_mm as real_chuva_mm,
+        p.amplitude_termica as prev_amplitude_termica,
+        r.amplitude_termica as real_amplitude_termica,
+        p.clima_desc_id as prev_clima_desc_id,
+        r.clima_desc_id as real_clima_desc_id,
+        dp.categoria_id as prev_categoria_id,
+        dr.categoria_id as real_categoria_id
+    FROM {{ ref('gold_climatempo_previsoes') }} p
+    JOIN {{ ref('gold_climatempo_dadosdia') }} r
+      ON r.cidade_id = p.cidade_id
+     AND r.data_coleta = p.data_previsao
+    LEFT JOIN {{ ref('silver_clima_desc') }} dp ON dp.clima_desc_id = p.clima_desc_id
+    LEFT JOIN {{ ref('silver_clima_desc') }} dr ON dr.clima_desc_id = r.clima_desc_id
+    {% if is_incremental() %}
+    -- um par só fecha quando chega o dado real do dia previsto
+    WHERE {{ janela_incremental('r.data_coleta', 'dia_real', ate=false) }}
+    {% endif %}
+)
+
+SELECT
+    *,
+    prev_temp_max - real_temp_max as erro_temp_max,
+    prev_temp_min - real_temp_min as erro_temp_min,
+    prev_chuva_mm - real_chuva_mm as erro_chuva_mm,
+    prev_amplitude_termica - real_amplitude_termica as erro_amp_termica,
+
+    -- erro absoluto médio de temperatura da linha (média entre mín e máx)
+    (ABS(prev_temp_max - real_temp_max) + ABS(prev_temp_min - real_temp_min)) / 2.0 as abs_err_temp_media,
+
+    COALESCE(real_chuva_mm, 0) > 0 as real_choveu,
+    COALESCE(prev_chuva_mm, 0) > 0 as prev_choveu,
+
+    -- proximidade da chuva (0..1): 1 - |prev - real| / max(prev, real)
+    MAX(0.0, MIN(1.0,
+        1 - ABS(COALESCE(prev_chuva_mm, 0) - COALESCE(real_chuva_mm, 0))
+            / MAX(COALESCE(prev_chuva_mm, 0), COALESCE(real_chuva_mm, 0), 1e-9)
+    )) as chuva_prox,
+
+    -- ids da silver_clima_desc (0 = sem descrição): frase idêntica e mesma
+    -- condição do tempo (Sol, Nublado, Pancadas de chuva, ...)
+    COALESCE(prev_clima_desc_id, 0) = COALESCE(real_clima_desc_id, 0) as clima_match,
+    COALESCE(prev_categoria_id, 0) = COALESCE(real_categoria_id, 0) as categoria_match
+FROM pares
\ No newline at end of file
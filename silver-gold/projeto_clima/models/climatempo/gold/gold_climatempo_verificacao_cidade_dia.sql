@@ -0,0 +1,71 @@
+{{ config(
+    materialized='incremental',
+    unique_key="cidade_id || '|' || lead_time || '|' || dia_real",
+    post_hook=[
+        "{{ criar_indice('chave', \"cidade_id || '|' || lead_time || '|' || dia_real\") }}",
+        "{{ criar_indice('dia_real', 'dia_real') }}",
+        "{{ criar_indice('lead_cidade_dia', 'lead_time, cidade_id, dia_real') }}"
+    ]
+) }}
+
+-- Agregado por cidade, dia e lead_time da gold_climatempo_verificacao.
+-- As colunas n_* / soma_* são aditivas: somando as linhas de qualquer período
+-- dá para tirar MAE, RMSE, bias, MAPE, acerto de chuva e o score composto
+-- sem voltar aos pares. As colunas de métrica são as do próprio dia.
+
+WITH somas AS (
+    SELECT
+        cidade_id,
+        dia_real,
+        lead_time,
+        COUNT(*) as n,
+
+        SUM(ABS(erro_temp_max)) as soma_abs_erro_temp_max,
+        SUM(erro_temp_max * erro_temp_max) as soma_quad_erro_temp_max,
+        SUM(erro_temp_max) as soma_erro_temp_max,
+        SUM(CASE WHEN real_temp_max <> 0 THEN ABS(erro_temp_max) * 1.0 / ABS(real_temp_max) END) as soma_ape_temp_max,
+        SUM(CASE WHEN real_temp_max <> 0 THEN 1 ELSE 0 END) as n_ape_temp_max,
+
+        SUM(ABS(erro_temp_min)) as soma_abs_erro_temp_min,
+        SUM(erro_temp_min * erro_temp_min) as soma_quad_erro_temp_min,
+        SUM(erro_temp_min) as soma_erro_temp_min,
+        SUM(CASE WHEN real_temp_min <> 0 THEN ABS(erro_temp_min) * 1.0 / ABS(real_temp_min) END) as soma_ape_temp_min,
+        SUM(CASE WHEN real_temp_min <> 0 THEN 1 ELSE 0 END) as n_ape_temp_min,
+
+        SUM(ABS(erro_chuva_mm)) as soma_abs_erro_chuva,
+        SUM(erro_chuva_mm * erro_chuva_mm) as soma_quad_erro_chuva,
+        SUM(erro_chuva_mm) as soma_erro_chuva,
+        -- volume % só em dias com chuva real > 0
+        SUM(CASE WHEN COALESCE(real_chuva_mm, 0) > 0
+                 THEN ABS(COALESCE(prev_chuva_mm, 0) - real_chuva_mm) / real_chuva_mm END) as soma_ape_chuva,
+        SUM(CASE WHEN COALESCE(real_chuva_mm, 0) > 0 THEN 1 ELSE 0 END) as n_ape_chuva,
+        SUM(CASE WHEN real_choveu = prev_choveu THEN 1 ELSE 0 END) as n_acerto_chuva,
+
+        SUM(abs_err_temp_media) as soma_abs_err_temp_media,
+        SUM(chuva_prox) as soma_chuva_prox,
+        SUM(clima_match) as n_clima_match,
+        SUM(categoria_match) as n_categoria_match
+    FROM {{ ref('gold_climatempo_verificacao') }}
+    {% if is_incremental() %}
+    WHERE {{ janela_incremental('dia_real', ate=false) }}
+    {% endif %}
+    GROUP BY cidade_id, dia_real, lead_time
+)
+
+SELECT
+    *,
+    -- RMSE = raiz de soma_quad_* / n: SQRT nem sempre vem compilado no SQLite
+    -- (ex: Python no Windows), então a raiz fica para quem lê
+    soma_abs_erro_temp_max * 1.0 / n as mae_temp_max,
+    soma_erro_temp_max * 1.0 / n as bias_temp_max,
+    soma_abs_erro_temp_min * 1.0 / n as mae_temp_min,
+    soma_erro_temp_min * 1.0 / n as bias_temp_min,
+    soma_abs_erro_chuva * 1.0 / n as mae_chuva,
+    n_acerto_chuva * 100.0 / n as acc_chuva,
+    n_categoria_match * 100.0 / n as acc_categoria,
+
+    -- score composto do dia (mesmos pesos/limite do dashboard: 50/40/10, TEMP_CAP = 3°C)
+    0.5 * MAX(0.0, MIN(1.0, 1 - (soma_abs_err_temp_media / n) / 3.0)) * 100
+      + 0.4 * (soma_chuva_prox / n) * 100
+      + 0.1 * (n_clima_match * 1.0 / n) * 100 as score_final
+FROM somas
\ No newline at end of file
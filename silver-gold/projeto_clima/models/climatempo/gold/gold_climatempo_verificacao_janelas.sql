@@ -0,0 +1,117 @@
+{{ config(
+    materialized='incremental',
+    unique_key="cidade_id || '|' || lead_time || '|' || dia_real",
+    post_hook=[
+        "{{ criar_indice('chave', \"cidade_id || '|' || lead_time || '|' || dia_real\") }}",
+        "{{ criar_indice('dia_lead', 'dia_real, lead_time') }}",
+        "{{ criar_indice('lead_cidade_dia', 'lead_time, cidade_id, dia_real') }}",
+        "{{ criar_indice('cidade_dia', 'cidade_id, dia_real') }}"
+    ]
+) }}
+
+-- Cubo de verificação cidade x dia_real x lead_time com janelas móveis de
+-- 7/30/90 dias (MAE, RMSE, bias e acerto de chuva saem das somas / n).
+--
+-- Cada série cidade/lead tem uma linha por dia corrido a partir do primeiro
+-- par, mesmo sem pares no dia (somas 0), com o acumulado acum_* desde o
+-- início. Assim:
+--   * o dia novo é acum do dia anterior + somas do dia (só os pares novos,
+--     nada de varrer o histórico);
+--   * a janela de W dias é acum(D) - acum(D-W): duas linhas achadas pela
+--     chave, qualquer W, e já gravada aqui para 7/30/90;
+--   * ler a janela de uma cidade é uma linha pelo índice.
+--
+-- Backfill (janela_incremental): refaz do dia de início em diante, porque o
+-- acumulado dos dias seguintes muda junto.
+
+{% set somas = [
+    "n",
+    "soma_abs_erro_temp_max", "soma_quad_erro_temp_max", "soma_erro_temp_max",
+    "soma_abs_erro_temp_min", "soma_quad_erro_temp_min", "soma_erro_temp_min",
+    "soma_abs_erro_chuva", "soma_quad_erro_chuva", "soma_erro_chuva",
+    "n_acerto_chuva",
+] %}
+{% set janelas = [7, 30, 90] %}
+
+WITH dia AS (
+    SELECT cidade_id, lead_time, dia_real, {{ somas | join(', ') }}
+    FROM {{ ref('gold_climatempo_verificacao_cidade_dia') }}
+    {% if is_incremental() %}
+    WHERE {{ janela_incremental('dia_real', ate=false) }}
+    {% endif %}
+),
+
+limites AS (
+    SELECT MIN(dia_real) as inicio, MAX(dia_real) as fim FROM dia
+),
+
+calendario(dia_real) AS (
+    SELECT inicio FROM limites WHERE inicio IS NOT NULL
+    UNION ALL
+    SELECT DATE(dia_real, '+1 day') FROM calendario WHERE dia_real < (SELECT fim FROM limites)
+),
+
+{% if is_incremental() %}
+-- acumulado de cada série no dia anterior ao início (linhas densas: é sempre D-1)
+base AS (
+    SELECT cidade_id, lead_time{% for s in somas %}, acum_{{ s }}{% endfor %}
+    FROM {{ this }}
+    WHERE dia_real = (SELECT DATE(inicio, '-1 day') FROM limites)
+),
+{% endif %}
+
+-- séries já existentes seguem desde o início; séries novas, desde o primeiro par
+series AS (
+    SELECT cidade_id, lead_time, MIN(desde) as desde
+    FROM (
+        {% if is_incremental() -%}
+        SELECT cidade_id, lead_time, (SELECT inicio FROM limites) as desde FROM base
+        UNION ALL
+        {% endif -%}
+        SELECT cidade_id, lead_time, dia_real as desde FROM dia
+    )
+    GROUP BY cidade_id, lead_time
+),
+
+acumulado AS (
+    SELECT
+        s.cidade_id,
+        s.lead_time,
+        c.dia_real,
+        {% for s in somas %}
+        {% if is_incremental() %}COALESCE(b.acum_{{ s }}, 0) + {% endif %}SUM(COALESCE(d.{{ s }}, 0)) OVER (
+            PARTITION BY s.cidade_id, s.lead_time ORDER BY c.dia_real
+        ) as acum_{{ s }}{{ "," if not loop.last }}
+        {% endfor %}
+    FROM series s
+    JOIN calendario c ON c.dia_real >= s.desde
+    LEFT JOIN dia d
+      ON d.cidade_id = s.cidade_id AND d.lead_time = s.lead_time AND d.dia_real = c.dia_real
+    {% if is_incremental() -%}
+    LEFT JOIN base b
+      ON b.cidade_id = s.cidade_id AND b.lead_time = s.lead_time
+    {%- endif %}
+)
+
+-- acum de D-W: dentro do lote vem do próprio acumulado (a linha antiga da
+-- tabela, se houver, está sendo refeita), antes dele vem da tabela; antes do
+-- primeiro par da série não existe (0). Só igualdade na chave: uma busca no
+-- índice por janela.
+SELECT
+    a.*,
+    {% for w in janelas %}
+    {% for s in somas %}
+    a.acum_{{ s }} - COALESCE(a{{ w }}.acum_{{ s }}, {% if is_incremental() %}t{{ w }}.acum_{{ s }}, {% endif %}0) as {{ s }}_{{ w }}d{{ "," if not (loop.last and w == janelas[-1]) }}
+    {% endfor %}
+    {% endfor %}
+FROM acumulado a
+{% for w in janelas %}
+{% if is_incremental() %}
+LEFT JOIN {{ this }} t{{ w }}
+  ON t{{ w }}.lead_time = a.lead_time AND t{{ w }}.cidade_id = a.cidade_id
+ AND t{{ w }}.dia_real = DATE(a.dia_real, '-{{ w }} day')
+{% endif %}
+LEFT JOIN acumulado a{{ w }}
+  ON a{{ w }}.lead_time = a.lead_time AND a{{ w }}.cidade_id = a.cidade_id
+ AND a{{ w }}.dia_real = DATE(a.dia_real, '-{{ w }} day')
+{% endfor %}
@@ -0,0 +1,53 @@
+{{ config(
+    materialized='incremental',
+    unique_key='clima_desc',
+    post_hook=[
+        "{{ criar_indice('clima_desc', 'clima_desc', unico=true) }}",
+        "{{ criar_indice('clima_desc_id', 'clima_desc_id', unico=true) }}"
+    ]
+) }}
+
+-- Dimensão das descrições do clima: cada frase distinta da raw vira um
+-- clima_desc_id inteiro, e as tabelas de fatos guardam só o id. O id é dado
+-- na ordem em que a frase apareceu (primeiro_dia, depois o texto), então um
+-- --full-refresh sobre a mesma raw repete os mesmos ids; frases novas de uma
+-- execução incremental entram depois do maior id já existente.
+
+WITH descricoes AS (
+    SELECT
+        TRIM(descricao) as clima_desc,
+        MIN(DATE(dt_ingest)) as primeiro_dia,
+        MAX(DATE(dt_ingest)) as ultimo_dia
+    FROM raw_climatempo_previsao
+    WHERE TRIM(descricao) <> ''
+    {% if is_incremental() %}
+      AND {{ janela_incremental('DATE(dt_ingest)', 'ultimo_dia') }}
+    {% endif %}
+    GROUP BY 1
+)
+
+SELECT
+    {% if is_incremental() -%}
+    COALESCE(
+        d.clima_desc_id,
+        (SELECT COALESCE(MAX(clima_desc_id), 0) FROM {{ this }})
+          + ROW_NUMBER() OVER (PARTITION BY d.clima_desc_id IS NULL ORDER BY n.primeiro_dia, n.clima_desc)
+    ) as clima_desc_id,
+    {%- else -%}
+    ROW_NUMBER() OVER (ORDER BY n.primeiro_dia, n.clima_desc) as clima_desc_id,
+    {%- endif %}
+    n.clima_desc,
+    {{ categoria_clima('n.clima_desc') }} as categoria_id,
+    {{ nome_categoria_clima(categoria_clima('n.clima_desc')) }} as categoria,
+    {% if is_incremental() -%}
+    -- backfill pode trazer dias anteriores ao primeiro_dia já gravado
+    MIN(COALESCE(d.primeiro_dia, n.primeiro_dia), n.primeiro_dia) as primeiro_dia,
+    MAX(COALESCE(d.ultimo_dia, n.ultimo_dia), n.ultimo_dia) as ultimo_dia
+    {%- else -%}
+    n.primeiro_dia,
+    n.ultimo_dia
+    {%- endif %}
+FROM descricoes n
+{% if is_incremental() -%}
+LEFT JOIN {{ this }} d ON d.clima_desc = n.clima_desc
+{%- endif %}
@@ -1,25 +1,56 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key="cidade_id || '|' || tipo_previsao || '|' || data_coleta",
+    post_hook=[
+        "{{ criar_indice('chave', \"cidade_id || '|' || tipo_previsao || '|' || data_coleta\") }}",
+        "{{ criar_indice('data_coleta', 'data_coleta') }}",
+        "{{ criar_indice('cidade_lead_data', 'cidade_id, lead_time, data_coleta') }}"
+    ]
+) }}
 
-WITH deduped_raw AS (
+WITH raw AS (
+    SELECT
+        *,
+        -- linhas anteriores ao lead_time só tinham HOJE (atual) e AMANHA (previsao)
+        COALESCE(
+            CAST(lead_time AS INTEGER),
+            CASE WHEN atualouprevisao = 'atual' THEN 0 ELSE 1 END
+        ) as lead_dias
+    FROM raw_climatempo_previsao
+    {% if is_incremental() %}
+    -- só os dias de coleta novos (ou os do backfill); o último dia já
+    -- carregado é refeito porque pode ter recebido mais uma coleta
+    WHERE {{ janela_incremental('DATE(dt_ingest)', 'data_coleta') }}
+    {% endif %}
+),
+
+deduped_raw AS (
     SELECT 
         *,
         ROW_NUMBER() OVER (
-            PARTITION BY DATE(dt_ingest), atualouprevisao, cidade 
+            PARTITION BY DATE(dt_ingest), lead_dias, cidade 
             ORDER BY dt_ingest DESC -- Mantém o registro mais recente em caso de duplicatas
         ) as rn
-    FROM raw_climatempo_previsao
+    FROM raw
 )
 
 SELECT
     UPPER(cidade) as cidade_id,
     CASE 
-        WHEN atualouprevisao = 'atual' THEN 'HOJE'
-        ELSE 'AMANHA'
+        WHEN lead_dias = 0 THEN 'HOJE'
+        WHEN lead_dias = 1 THEN 'AMANHA'
+        ELSE 'D+' || lead_dias
     END as tipo_previsao,
+    lead_dias as lead_time,
+    -- coletas novas já chegam tipadas pelo pipeline do scrapy (18, 2.4);
+    -- o REPLACE só faz diferença para o histórico com texto cru ("18°", "2.4mm")
     CAST(REPLACE(tmin, '°', '') AS INTEGER) as temp_min,
     CAST(REPLACE(tmax, '°', '') AS INTEGER) as temp_max,
-    TRIM(descricao) as clima_desc,
+    d.clima_desc_id,
     CAST(REPLACE(chuva, 'mm', '') AS FLOAT) as chuva_mm,
-    DATE(dt_ingest) as data_coleta
+    DATE(dt_ingest) as data_coleta,
+    COALESCE(data_previsao, DATE(dt_ingest, '+' || lead_dias || ' day')) as data_previsao
 FROM deduped_raw
+-- o texto da descrição fica só na dimensão; aqui vai o id inteiro
+LEFT JOIN {{ ref('silver_clima_desc') }} d ON d.clima_desc = TRIM(deduped_raw.descricao)
 WHERE rn = 1
\ No newline at end of file
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+# os módulos do dashboard e dos benchmarks são scripts, não pacotes
+sys.path.insert(0, str(RAIZ / "dashboard"))
+sys.path.insert(0, str(RAIZ / "benchmarks"))
@@ -0,0 +1,86 @@
+"""dashboard/metricas.py contra as fórmulas do dashboard antigo (bench_metricas.legado).
+
+Foco nos denominadores zero: a linha sai da média e um grupo sem nenhuma
+linha válida dá NaN, nunca inf nem 0.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_metricas import COLUNAS_PARIDADE, gerar_pares, legado, mape
+from metricas import metricas, metricas_por_grupo, metricas_totais, somas_por_grupo
+
+
+def par(cidade, prev_max, real_max, prev_min=10, real_min=10, prev_chuva=0.0, real_chuva=0.0, desc=1):
+    return {
+        "cidade_id": cidade, "dia_real": "2026-01-01",
+        "prev_temp_max": prev_max, "real_temp_max": real_max,
+        "prev_temp_min": prev_min, "real_temp_min": real_min,
+        "prev_chuva_mm": prev_chuva, "real_chuva_mm": real_chuva,
+        "prev_clima_desc_id": desc, "real_clima_desc_id": 1,
+        "prev_categoria_id": 1, "real_categoria_id": 1,
+    }
+
+
+@pytest.fixture
+def pares():
+    return pd.DataFrame([
+        # real = 0 numa linha: MAPE só com a outra
+        par("A", 2, 0, prev_chuva=3.0, real_chuva=0.0),
+        par("A", 22, 20, prev_chuva=4.0, real_chuva=5.0, desc=2),
+        # cidade toda zerada: temperatura real 0 e nenhum dia de chuva real
+        par("B", 1, 0, prev_min=-1, real_min=0),
+        par("B", 0, 0, prev_min=0, real_min=0),
+    ])
+
+
+def test_real_zero_fica_fora_do_mape(pares):
+    out = metricas_por_grupo(pares, "cidade_id")
+    a = pares[pares["cidade_id"] == "A"]
+    assert out.loc["A", "mape_temp_max"] == pytest.approx(10.0)
+    assert out.loc["A", "mape_temp_max"] == pytest.approx(mape(a["prev_temp_max"], a["real_temp_max"]))
+
+
+def test_cidade_zerada_da_nan(pares):
+    b = metricas_por_grupo(pares, "cidade_id").loc["B"]
+    for coluna in ("mape_temp_max", "mape_temp_min", "acc_pct_chuva"):
+        assert np.isnan(b[coluna]), coluna
+    # o resto continua definido
+    assert b["mae_temp_max"] == pytest.approx(0.5)
+    assert b["acc_chuva"] == pytest.approx(100.0)
+
+
+def test_grupo_vazio_da_nan(pares):
+    somas = somas_por_grupo(pares, "cidade_id")
+    vazio = metricas(somas.iloc[:0].sum().to_frame().T).iloc[0]
+    assert vazio["n"] == 0
+    valores = vazio.drop("n").astype(float)
+    assert valores.isna().all()
+    assert not np.isinf(valores).any()
+
+    assert metricas_totais(somas.iloc[:0]).drop("n").isna().all()
+
+
+def test_sem_inf_em_nenhuma_coluna(pares):
+    out = metricas_por_grupo(pares, "cidade_id")
+    assert not np.isinf(out.to_numpy(dtype=float)).any()
+
+
+def test_mesmo_resultado_que_o_legado(pares):
+    novo = metricas_por_grupo(pares, "cidade_id")
+    pd.testing.assert_frame_equal(
+        novo[COLUNAS_PARIDADE], legado(pares)[COLUNAS_PARIDADE],
+        check_exact=False, rtol=1e-9, check_names=False, check_dtype=False,
+    )
+
+
+def test_somas_cidade_dia_iguais_aos_pares():
+    pares = gerar_pares(20, 30, seed=7)
+    direto = metricas_por_grupo(pares, "cidade_id")
+    por_dia = somas_por_grupo(pares, ["cidade_id", "dia_real"])
+    via_somas = metricas(por_dia.groupby(level="cidade_id").sum())
+    pd.testing.assert_frame_equal(direto, via_somas, check_exact=False, rtol=1e-9)
+    pd.testing.assert_frame_equal(
+        direto[COLUNAS_PARIDADE], legado(pares)[COLUNAS_PARIDADE],
+        check_exact=False, rtol=1e-9, check_names=False, check_dtype=False,
+    )